@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+#-----------------------------------------------------------------------------
+# bench_end_to_end.py
+#------------------------------------------------------------------------
+#
+# Written by SparkFun Electronics, October 2026
+#
+# End-to-end DE2120BarcodeScanner benchmark against de2120_simulator.
+# For each baud rate and payload size it reports:
+#
+#   scans/s     sustained read_barcode() throughput with scans queued
+#               back to back
+#   latency     trigger-to-delivery p50/p95/p99: from presenting a
+#               barcode to the simulator to read_barcode() returning it
+#   cpu/scan    reader thread CPU time per scan
+#   peak KiB    tracemalloc peak above baseline over a pass (includes
+#               the simulator thread)
+#   kept B/scan memory still held by the library after the pass, per
+#               scan; should be ~0
+#
+# and for each baud rate the send_command() round-trip time
+# percentiles.
+#
+# The simulator paces output to the line rate, so numbers at low baud
+# rates are what a real link allows. --no-pace measures host cost
+# alone. Cells where one frame takes longer than --max-frame-seconds on
+# the wire are skipped.
+#
+# Linux/macOS only (needs os.openpty()).
+#
+#   python benchmarks/bench_end_to_end.py
+#   python benchmarks/bench_end_to_end.py --bauds 115200 --payloads 13,4000 --json out.json
+#
+#==================================================================================
+# Copyright (c) 2026 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#==================================================================================
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import de2120_barcode_scanner
+import de2120_simulator
+
+# Payload sizes, from an EAN-13 up to a large QR code
+DEFAULT_PAYLOADS = "13,48,300,1000,4000"
+SUFFIX = b"\r\n"
+
+
+def percentile(sorted_values, pct):
+    index = int(round(pct / 100.0 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def make_payload(size):
+    return ("0123456789" * (size // 10 + 1))[:size]
+
+
+def read_one(scanner, timeout):
+    deadline = time.monotonic() + timeout
+    while True:
+        barcode = scanner.read_barcode()
+        if barcode:
+            return barcode
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise RuntimeError("no barcode within %.1f s" % timeout)
+        scanner._wait_readable(remaining)
+
+
+def open_scanner(simulator, frame_time):
+    # read_barcode() waits up to the port timeout for the rest of a frame
+    port = simulator.port(timeout=max(1.0, frame_time * 2))
+    return de2120_barcode_scanner.DE2120BarcodeScanner(port)
+
+
+def bench_scans(baud, payload_size, args):
+    frame_time = (payload_size + len(SUFFIX)) * 10.0 / baud if args.pace else 0.0
+    if frame_time > args.max_frame_seconds:
+        return None
+
+    scans = args.scans
+    if frame_time:
+        scans = max(3, min(scans, int(args.seconds / frame_time)))
+    timeout = frame_time * 4 + 2
+
+    simulator = de2120_simulator.DE2120Simulator(barcodes=[make_payload(payload_size)],
+                                                 baud=baud, pace=args.pace, suffix=SUFFIX)
+    scanner = open_scanner(simulator, frame_time)
+    try:
+        # Trigger-to-delivery, one scan at a time
+        latencies = []
+        for i in range(max(3, scans // 4)):
+            triggered = time.monotonic()
+            simulator.scan()
+            read_one(scanner, timeout)
+            latencies.append(time.monotonic() - triggered)
+        latencies.sort()
+
+        # Sustained throughput, scans queued back to back
+        start = time.monotonic()
+        cpu_start = time.thread_time()
+        for i in range(scans):
+            simulator.scan()
+        for i in range(scans):
+            read_one(scanner, timeout)
+        cpu = time.thread_time() - cpu_start
+        elapsed = time.monotonic() - start
+
+        # Memory over a shorter pass
+        alloc_scans = min(scans, 200)
+        library = tracemalloc.Filter(True, de2120_barcode_scanner.__file__)
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot().filter_traces([library])
+        baseline = tracemalloc.get_traced_memory()[0]
+        for i in range(alloc_scans):
+            simulator.scan()
+        for i in range(alloc_scans):
+            read_one(scanner, timeout)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        after = tracemalloc.take_snapshot().filter_traces([library])
+        tracemalloc.stop()
+        kept = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    finally:
+        scanner.hard_port.close()
+        simulator.close()
+
+    return {
+        "baud": baud,
+        "payload": payload_size,
+        "scans": scans,
+        "scans_per_s": scans / elapsed,
+        "latency_ms": dict(("p%d" % pct, percentile(latencies, pct) * 1e3) for pct in (50, 95, 99)),
+        "cpu_us_per_scan": cpu / scans * 1e6,
+        "peak_kib": peak / 1024.0,
+        "kept_bytes_per_scan": kept / float(alloc_scans),
+    }
+
+
+def bench_commands(baud, args):
+    simulator = de2120_simulator.DE2120Simulator(baud=baud, pace=args.pace)
+    scanner = open_scanner(simulator, 0)
+    try:
+        rtts = []
+        cpu_start = time.thread_time()
+        for i in range(args.commands):
+            start = time.monotonic()
+            if not scanner.send_command(scanner.PROPERTY_DECODE_BEEP, str(i % 2)):
+                raise RuntimeError("command not acknowledged")
+            rtts.append(time.monotonic() - start)
+        cpu = time.thread_time() - cpu_start
+    finally:
+        scanner.hard_port.close()
+        simulator.close()
+
+    rtts.sort()
+    return {
+        "baud": baud,
+        "commands": args.commands,
+        "rtt_ms": dict(("p%d" % pct, percentile(rtts, pct) * 1e3) for pct in (50, 95, 99)),
+        "cpu_us_per_command": cpu / args.commands * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end DE2120 benchmark against the simulator")
+    parser.add_argument("--bauds", default=",".join(str(rate) for rate in
+                                                    de2120_barcode_scanner.DE2120BarcodeScanner.BAUD_RATES),
+                        help="comma separated baud rates (default: all supported)")
+    parser.add_argument("--payloads", default=DEFAULT_PAYLOADS,
+                        help="comma separated payload sizes in bytes (default %s)" % DEFAULT_PAYLOADS)
+    parser.add_argument("--scans", type=int, default=2000,
+                        help="most scans per throughput pass")
+    parser.add_argument("--seconds", type=float, default=2.0,
+                        help="rough wire time budget per pass at low baud rates")
+    parser.add_argument("--max-frame-seconds", type=float, default=1.0,
+                        help="skip payloads that take longer than this on the wire")
+    parser.add_argument("--commands", type=int, default=200,
+                        help="send_command() calls per baud rate")
+    parser.add_argument("--no-pace", dest="pace", action="store_false",
+                        help="do not hold the simulator to the line rate")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    bauds = [int(x) for x in args.bauds.split(",")]
+    payloads = [int(x) for x in args.payloads.split(",")]
+
+    print("%7s %8s %10s %24s %10s %9s %11s" % (
+        "baud", "payload", "scans/s", "latency p50/p95/p99 ms", "cpu us", "peak KiB", "kept B/scan"))
+    scan_results = []
+    for baud in bauds:
+        for payload_size in payloads:
+            result = bench_scans(baud, payload_size, args)
+            if result is None:
+                print("%7d %8d %10s" % (baud, payload_size, "skipped"))
+                continue
+            scan_results.append(result)
+            latency = result["latency_ms"]
+            print("%7d %8d %10.1f %8.2f/%7.2f/%7.2f %10.1f %9.1f %11.1f" % (
+                baud, payload_size, result["scans_per_s"], latency["p50"], latency["p95"],
+                latency["p99"], result["cpu_us_per_scan"], result["peak_kib"],
+                result["kept_bytes_per_scan"]))
+
+    print()
+    print("%7s %24s %10s" % ("baud", "command rtt p50/p95/p99 ms", "cpu us"))
+    command_results = []
+    for baud in bauds:
+        result = bench_commands(baud, args)
+        command_results.append(result)
+        rtt = result["rtt_ms"]
+        print("%7d %8.2f/%7.2f/%7.2f %10.1f" % (
+            baud, rtt["p50"], rtt["p95"], rtt["p99"], result["cpu_us_per_command"]))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"pace": args.pace, "scans": scan_results, "commands": command_results},
+                      f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+#-----------------------------------------------------------------------------
+# bench_frame_parser.py
+#------------------------------------------------------------------------
+#
+# Written by SparkFun Electronics, October 2026
+#
+# Measures BarcodeFrameParser throughput on synthetic input: a stream of
+# barcodes of a given length, fed in chunks of a given size. Compares it
+# against the naive approach of appending to bytes and splitting, which
+# runs inline with no method call per chunk.
+#
+#   python benchmarks/bench_frame_parser.py --frames 500000
+#
+# The last column is the parser's speed as a multiple of the naive loop.
+# The parser wins when chunks hold whole frames. It loses when most
+# chunks hold only part of a frame (64 B chunks of 128 B or 1 KB
+# barcodes): the fixed cost of each feed() call outweighs appending a
+# few bytes to a short bytes object.
+#
+#==================================================================================
+# Copyright (c) 2026 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy 
+# of this software and associated documentation files (the "Software"), to deal 
+# in the Software without restriction, including without limitation the rights 
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell 
+# copies of the Software, and to permit persons to whom the Software is 
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all 
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, 
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE 
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER 
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, 
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE 
+# SOFTWARE.
+#==================================================================================
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import de2120_barcode_scanner
+
+
+def make_chunks(frames, payload_size, chunk_size):
+    payload = (b"0123456789" * (payload_size // 10 + 1))[:payload_size] + b"\n"
+    stream = payload * frames
+    return [stream[i:i + chunk_size] for i in range(0, len(stream), chunk_size)]
+
+
+def bench_parser(chunks):
+    parser = de2120_barcode_scanner.BarcodeFrameParser()
+    count = 0
+    start = time.perf_counter()
+    for chunk in chunks:
+        count += len(parser.feed(chunk))
+    return count, time.perf_counter() - start
+
+
+def bench_naive(chunks):
+    pending = b""
+    count = 0
+    start = time.perf_counter()
+    for chunk in chunks:
+        pending += chunk
+        while b"\n" in pending:
+            frame, pending = pending.split(b"\n", 1)
+            count += 1
+    return count, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BarcodeFrameParser throughput benchmark")
+    parser.add_argument("--frames", type=int, default=500000,
+                        help="frames per run")
+    parser.add_argument("--payloads", default="13,128,1024",
+                        help="comma separated payload sizes in bytes")
+    parser.add_argument("--chunks", default="64,4096",
+                        help="comma separated feed sizes in bytes")
+    args = parser.parse_args()
+
+    for payload_size in [int(x) for x in args.payloads.split(",")]:
+        # Keep the total stream size reasonable for big payloads
+        frames = max(1000, args.frames * 13 // payload_size)
+        for chunk_size in [int(x) for x in args.chunks.split(",")]:
+            chunks = make_chunks(frames, payload_size, chunk_size)
+            rates = {}
+            for name, bench in (("parser", bench_parser), ("naive", bench_naive)):
+                count, elapsed = bench(chunks)
+                assert count == frames
+                rates[name] = count / elapsed
+                print("payload %5d B  chunk %5d B  %-6s %10.0f frames/s  %8.1f MB/s" % (
+                    payload_size, chunk_size, name, rates[name],
+                    rates[name] * (payload_size + 1) / 1e6), end = "")
+                if name == "naive":
+                    print("  parser x%.2f" % (rates["parser"] / rates["naive"]), end = "")
+                print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+#-----------------------------------------------------------------------------
+# bench_gs1.py
+#------------------------------------------------------------------------
+#
+# Written by SparkFun Electronics, October 2026
+#
+# Payloads per second parsed by de2120_gs1.parse_gs1() for typical GS1
+# DataMatrix, GS1-128 and long payloads, on one core.
+#
+#   python benchmarks/bench_gs1.py --payloads 100000
+#
+#==================================================================================
+# Copyright (c) 2026 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import de2120_gs1
+
+GS = de2120_gs1.GS
+
+PAYLOADS = (
+    ("GTIN + expiry + lot + serial", "]d2010950600013435217261231" "10ABC123" + GS + "21XYZ123456"),
+    ("SSCC", "]C1" "00106141411234567898"),
+    ("GTIN + net weight", GS + "0109506000134352" "3103000150"),
+    ("10 AIs, variable fields", "]Q3" "0109506000134352" "11260101" "17261231" "10LOT-42" + GS +
+     "21SERIAL-0001" + GS + "240ADD-ID" + GS + "400ORDER-9" + GS + "420" "12345" + GS +
+     "7003" "2612311200" + GS + "91" + "X" * 40),
+)
+
+
+def best_of(repeat, func, payloads):
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        for payload in payloads:
+            func(payload)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GS1 element string parser throughput benchmark")
+    parser.add_argument("--payloads", type=int, default=100000,
+                        help="payloads parsed per run")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="runs per measurement; the fastest is reported")
+    args = parser.parse_args()
+
+    for name, payload in PAYLOADS:
+        payloads = [payload] * args.payloads
+        elements = len(de2120_gs1.parse_gs1(payload))
+        elapsed = best_of(args.repeat, de2120_gs1.parse_gs1, payloads)
+        print("%-30s %3d bytes %2d AIs  %10.0f payloads/s  %6.2f us/payload" % (
+            name, len(payload), elements, args.payloads / elapsed, elapsed / args.payloads * 1e6))
+
+
+if __name__ == '__main__':
+    main()
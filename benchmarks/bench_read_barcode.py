@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+#-----------------------------------------------------------------------------
+# bench_read_barcode.py
+#------------------------------------------------------------------------
+#
+# Written by SparkFun Electronics, October 2026
+#
+# Compares read_barcode()'s bulk drain against the read_until() loop it
+# replaced, on a pseudo-terminal. For each payload size it reports the
+# number of serial read() calls and the CPU time per scan. Every pyserial
+# read() is one select() and one read() system call on POSIX.
+#
+# Linux/macOS only (needs os.openpty()).
+#
+#   python benchmarks/bench_read_barcode.py --scans 2000
+#
+#==================================================================================
+# Copyright (c) 2026 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy 
+# of this software and associated documentation files (the "Software"), to deal 
+# in the Software without restriction, including without limitation the rights 
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell 
+# copies of the Software, and to permit persons to whom the Software is 
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all 
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, 
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE 
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER 
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, 
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE 
+# SOFTWARE.
+#==================================================================================
+
+import argparse
+import os
+import sys
+import threading
+import time
+import tty
+
+import serial
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import de2120_barcode_scanner
+
+
+class CountingSerial(serial.Serial):
+    """serial.Serial that counts read() calls."""
+    reads = 0
+
+    def read(self, size=1):
+        self.reads += 1
+        return serial.Serial.read(self, size)
+
+
+def read_until_barcode(scanner):
+    # read_barcode() as it was before the bulk drain
+    if scanner.hard_port.in_waiting == False:
+        return False
+    return scanner.hard_port.read_until().decode()
+
+
+def run(name, read, payload_size, scans):
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    port = CountingSerial(os.ttyname(slave), 115200, timeout=1)
+    os.close(slave)
+    scanner = de2120_barcode_scanner.DE2120BarcodeScanner(port)
+
+    payload = (b"0123456789" * (payload_size // 10 + 1))[:payload_size] + b"\n"
+
+    def writer():
+        for i in range(scans):
+            os.write(master, payload)
+            # Roughly one scan at a time, like a real module
+            time.sleep(0.0002)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+
+    count = 0
+    cpu_start = time.thread_time()
+    while count < scans:
+        barcode = read(scanner)
+        if barcode:
+            count += 1
+        else:
+            scanner._wait_readable(1.0)
+    cpu = time.thread_time() - cpu_start
+
+    thread.join()
+    port.close()
+    os.close(master)
+
+    print("payload %5d B  %-10s %8.1f reads/scan  %8.1f us cpu/scan" % (
+        payload_size, name, port.reads / float(scans), cpu / scans * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="read_barcode() bulk drain benchmark")
+    parser.add_argument("--scans", type=int, default=2000,
+                        help="barcodes read per run")
+    parser.add_argument("--payloads", default="13,300,1000",
+                        help="comma separated payload sizes in bytes")
+    args = parser.parse_args()
+
+    for payload_size in [int(x) for x in args.payloads.split(",")]:
+        run("read_until", read_until_barcode, payload_size, args.scans)
+        run("drain", de2120_barcode_scanner.DE2120BarcodeScanner.read_barcode,
+            payload_size, args.scans)
+
+
+if __name__ == '__main__':
+    main()
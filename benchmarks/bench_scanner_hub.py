@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+#-----------------------------------------------------------------------------
+# bench_scanner_hub.py
+#------------------------------------------------------------------------
+#
+# Written by SparkFun Electronics, October 2026
+#
+# Measures ScannerHub delivery latency and CPU cost as the number of
+# scanners grows. Every scanner is a pseudo-terminal pair: the benchmark
+# writes barcodes into the master side and the hub reads the slave side
+# through serial.Serial, exactly as it would a real DE2120.
+#
+# Linux/macOS only (needs os.openpty()).
+#
+#   python benchmarks/bench_scanner_hub.py --ports 1,10,100 --scans 5000
+#
+#==================================================================================
+# Copyright (c) 2026 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy 
+# of this software and associated documentation files (the "Software"), to deal 
+# in the Software without restriction, including without limitation the rights 
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell 
+# copies of the Software, and to permit persons to whom the Software is 
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all 
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, 
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE 
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER 
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, 
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE 
+# SOFTWARE.
+#==================================================================================
+
+import argparse
+import os
+import sys
+import threading
+import time
+import tty
+
+import serial
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import de2120_barcode_scanner
+
+
+def open_fake_scanners(count):
+    masters = []
+    scanners = []
+    for i in range(count):
+        master, slave = os.openpty()
+        tty.setraw(slave)
+        port = serial.Serial(os.ttyname(slave), 115200, timeout=1)
+        os.close(slave)
+        masters.append(master)
+        scanners.append(de2120_barcode_scanner.DE2120BarcodeScanner(port))
+    return masters, scanners
+
+
+def percentile(sorted_values, pct):
+    index = int(round(pct / 100.0 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def run(port_count, scans, rate):
+    masters, scanners = open_fake_scanners(port_count)
+    hub = de2120_barcode_scanner.ScannerHub()
+    for i, scanner in enumerate(scanners):
+        hub.add(scanner, i)
+
+    # Idle cost: nothing is written, the hub should just sleep in select()
+    cpu_start = time.thread_time()
+    hub.poll(0.5)
+    idle_cpu = time.thread_time() - cpu_start
+
+    def writer():
+        interval = 1.0 / rate
+        next_time = time.perf_counter()
+        for n in range(scans):
+            os.write(masters[n % port_count], b"%d\n" % time.perf_counter_ns())
+            next_time += interval
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    latencies = []
+    thread = threading.Thread(target=writer)
+    cpu_start = time.thread_time()
+    thread.start()
+    while len(latencies) < scans:
+        for scanner_id, barcode in hub.poll(1.0):
+            latencies.append(time.perf_counter_ns() - int(barcode))
+    busy_cpu = time.thread_time() - cpu_start
+    thread.join()
+
+    hub.close()
+    for master, scanner in zip(masters, scanners):
+        scanner.hard_port.close()
+        os.close(master)
+
+    latencies.sort()
+    print("%5d ports  p50 %7.1f us  p99 %7.1f us  max %8.1f us  "
+          "cpu/scan %6.1f us  idle cpu %.4f s" % (
+              port_count,
+              percentile(latencies, 50) / 1000.0,
+              percentile(latencies, 99) / 1000.0,
+              latencies[-1] / 1000.0,
+              busy_cpu / scans * 1e6,
+              idle_cpu))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ScannerHub latency benchmark")
+    parser.add_argument("--ports", default="1,10,50,100,200",
+                        help="comma separated scanner counts to test")
+    parser.add_argument("--scans", type=int, default=5000,
+                        help="barcodes delivered per run")
+    parser.add_argument("--rate", type=float, default=2000.0,
+                        help="aggregate barcodes per second")
+    args = parser.parse_args()
+
+    for count in [int(x) for x in args.ports.split(",")]:
+        run(count, args.scans, args.rate)
+
+
+if __name__ == '__main__':
+    main()
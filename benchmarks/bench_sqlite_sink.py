@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+#-----------------------------------------------------------------------------
+# bench_sqlite_sink.py
+#------------------------------------------------------------------------
+#
+# Written by SparkFun Electronics, October 2026
+#
+# Rows per second written to SQLite by SqliteScanSink, against the usual
+# loop that inserts and commits each scan on its own. Also reports what
+# put() costs the thread delivering scans.
+#
+#   python benchmarks/bench_sqlite_sink.py --rows 20000
+#
+#==================================================================================
+# Copyright (c) 2026 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#==================================================================================
+
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import de2120_sqlite_sink
+
+
+def percentile(sorted_values, pct):
+    index = int(round(pct / 100.0 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def barcodes(count):
+    return ["%013d\r\n" % (4006381333931 + i) for i in range(count)]
+
+
+def naive(path, codes):
+    # One INSERT and one commit per scan, default rollback journal
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE scans (id INTEGER PRIMARY KEY, scanned_at REAL, payload TEXT)")
+    connection.commit()
+
+    start = time.monotonic()
+    for code in codes:
+        connection.execute("INSERT INTO scans (scanned_at, payload) VALUES (?, ?)", (time.time(), code))
+        connection.commit()
+    elapsed = time.monotonic() - start
+    connection.close()
+    return elapsed, None
+
+
+def sink(path, codes, batch_size, flush_interval):
+    puts = []
+    with de2120_sqlite_sink.SqliteScanSink(path, batch_size=batch_size,
+                                           flush_interval=flush_interval) as scan_sink:
+        start = time.monotonic()
+        for code in codes:
+            before = time.monotonic()
+            scan_sink.put(code)
+            puts.append(time.monotonic() - before)
+        scan_sink.flush()
+        elapsed = time.monotonic() - start
+    return elapsed, sorted(puts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SqliteScanSink throughput benchmark")
+    parser.add_argument("--rows", type=int, default=20000,
+                        help="scans written per run")
+    parser.add_argument("--naive-rows", type=int, default=2000,
+                        help="scans written by the per-scan commit loop, which is slow")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--flush-interval", type=float, default=0.1)
+    parser.add_argument("--dir", help="directory for the databases (default: a temporary one)")
+    args = parser.parse_args()
+
+    directory = args.dir or tempfile.mkdtemp(prefix="de2120_bench_")
+    try:
+        elapsed, puts = naive(os.path.join(directory, "naive.db"), barcodes(args.naive_rows))
+        print("per-scan commit  %8d rows  %10.0f rows/s" % (args.naive_rows, args.naive_rows / elapsed))
+
+        elapsed, puts = sink(os.path.join(directory, "sink.db"), barcodes(args.rows),
+                             args.batch_size, args.flush_interval)
+        print("SqliteScanSink   %8d rows  %10.0f rows/s   put() p50 %.1f us  p99 %.1f us" % (
+            args.rows, args.rows / elapsed, percentile(puts, 50) * 1e6, percentile(puts, 99) * 1e6))
+    finally:
+        if args.dir is None:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
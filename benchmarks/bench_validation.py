@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+#-----------------------------------------------------------------------------
+# bench_validation.py
+#------------------------------------------------------------------------
+#
+# Written by SparkFun Electronics, October 2026
+#
+# Codes per second checked by de2120_validation, one at a time with
+# valid_gs1()/valid_mod43() against whole batches with
+# validate_gs1_batch()/validate_mod43_batch(), for EAN-13 and Code 39.
+# Also reports what a CheckDigitFilter adds per scan. Batches use NumPy
+# when it is installed; the report says which path ran.
+#
+#   python benchmarks/bench_validation.py --codes 100000
+#
+#==================================================================================
+# Copyright (c) 2026 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#==================================================================================
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import de2120_validation
+
+
+def ean13_codes(count, rng):
+    codes = []
+    for i in range(count):
+        digits = "%012d" % rng.randrange(10 ** 12)
+        codes.append(digits + str(de2120_validation.gs1_check_digit(digits)))
+    return codes
+
+
+def code39_codes(count, length, rng):
+    charset = de2120_validation.CODE39_CHARSET
+    codes = []
+    for i in range(count):
+        values = [rng.randrange(43) for j in range(length - 1)]
+        codes.append("".join(charset[value] for value in values) + charset[sum(values) % 43])
+    return codes
+
+
+def best_of(repeat, func, *args):
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+
+def single(check, codes):
+    return [check(code) for code in codes]
+
+
+def report(name, codes, elapsed, valid):
+    print("%-30s %9d codes  %12.0f codes/s  %7.3f us/code  %d valid" % (
+        name, len(codes), len(codes) / elapsed, elapsed / len(codes) * 1e6, sum(valid)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check digit validation throughput benchmark")
+    parser.add_argument("--codes", type=int, default=100000,
+                        help="codes per batch")
+    parser.add_argument("--code39-length", type=int, default=10,
+                        help="Code 39 characters per code, including the check character")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="runs per measurement; the fastest is reported")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print("batch path: %s" % ("NumPy %s" % de2120_validation.numpy.__version__
+                               if de2120_validation.numpy is not None else "pure Python"))
+
+    codes = ean13_codes(args.codes, rng)
+    elapsed, valid = best_of(args.repeat, single, de2120_validation.valid_gs1, codes)
+    report("EAN-13 valid_gs1()", codes, elapsed, valid)
+    elapsed, valid = best_of(args.repeat, de2120_validation.validate_gs1_batch, codes)
+    report("EAN-13 validate_gs1_batch()", codes, elapsed, valid)
+
+    scan_filter = de2120_validation.CheckDigitFilter()
+    elapsed, valid = best_of(args.repeat, single, scan_filter, codes)
+    report("EAN-13 CheckDigitFilter", codes, elapsed, valid)
+
+    codes = code39_codes(args.codes, args.code39_length, rng)
+    elapsed, valid = best_of(args.repeat, single, de2120_validation.valid_mod43, codes)
+    report("Code 39 valid_mod43()", codes, elapsed, valid)
+    elapsed, valid = best_of(args.repeat, de2120_validation.validate_mod43_batch, codes)
+    report("Code 39 validate_mod43_batch()", codes, elapsed, valid)
+
+
+if __name__ == '__main__':
+    main()
@@ -42,658 +42,4191 @@ This python package is a port of the exisiting [SparkFun DE2120 Arduino Library]
 
 import serial
 import time
+import collections
+import codecs
+import threading
+import queue
+import asyncio
+import os
+import sys
+import selectors
+import select
+import bisect
+import array
+import http.server
 
 _DEFAULT_NAME = "DE2120 Barcode Scanner"
 
-class DE2120BarcodeScanner(object):
+# Last baud rate each port answered at, tried first by detect_baud()
+_last_known_baud = {}
+
+class CommandBatch(object):
     """
-    DE2120BarcodeScanner 
+    CommandBatch
 
-    Initialize the library with the given port.
+    An ordered list of commands to send with
+    DE2120BarcodeScanner.send_commands(). add() returns the batch so
+    calls can be chained::
 
-    :param hard_port:   The port to use to communicate with the module, this
-                        is a serial port at 9600 baud rate.
+        batch = CommandBatch().add("LAMENA", "1").add("AIMENA", "0")
 
-    :return:            The DE2120BarcodeScanner object.
+    :param commands:    Optional iterable of command names or
+                        (command, argument) tuples to start with.
+
+    :return:            The CommandBatch object.
     :rtype:             Object
     """
-    # Constructor
-    device_name = _DEFAULT_NAME
-    
-    # DE2120 response
-    DE2120_COMMAND_ACK = 0x06
-    DE2120_COMMAND_NACK = 0x15
+    def __init__(self, commands = None):
+        self._commands = []
+        if commands is not None:
+            for command in commands:
+                if isinstance(command, str):
+                    self.add(command)
+                else:
+                    self.add(*command)
 
-    # Send commands
-    # Need to prepend "^_^" and append "."
-    COMMAND_START_SCAN = "SCAN"
-    COMMAND_STOP_SCAN = "SLEEP"
-    COMMAND_SET_DEFAULTS = "DEFALT"
-    COMMAND_GET_VERSION = "DSPYFW"
+    def add(self, cmd, arg = ""):
+        """
+            Append a command to the batch.
 
-    PROPERTY_BUZZER_FREQ = "BEPPWM"
-    # BEPPWM0 - Active Drive
-    # BEPPWM1 - Passive Low Freq
-    # BEPPWM2 - Passive Med Freq (default)
-    # BEPPWM3 - Passive Hi Freq
+            :param cmd: The command name
+            :param arg: The command variation, if there is one
+            :return: this batch
+            :rtype: CommandBatch
+        """
+        self._commands.append((cmd, str(arg)))
+        return self
 
-    PROPERTY_DECODE_BEEP = "BEPSUC"
-    # BEPSUC1 - ON (default)
-    # BEPSUC0 - OFF
+    def __len__(self):
+        return len(self._commands)
 
-    PROPERTY_BOOT_BEEP = "BEPPWR"
-    # BEPPWR1 - ON (default)
-    # BEPPWR0 - OFF
+    def __iter__(self):
+        return iter(self._commands)
 
-    PROPERTY_FLASH_LIGHT = "LAMENA"
-    # LAMENA1 - ON (default)
-    # LAMENA0 - OFF
 
-    PROPERTY_AIM_LIGHT = "AIMENA"
-    # AIMENA1 - ON (default)
-    # AIMENA0 - OFF
+class BarcodeFrameParser(object):
+    """
+    BarcodeFrameParser
 
-    PROPERTY_READING_AREA = "IMGREG"
-    # IMGREG0 - Full Width (default)
-    # IMGREG1 - Center 80%
-    # IMGREG2 - Center 60%
-    # IMGREG3 - Center 40%
-    # IMGREG4 - Center 20%
+    Split a serial byte stream into barcode frames. Bytes are fed in
+    chunks of any size, copied once into a preallocated buffer and
+    searched with bytearray.find(), so there is no per-byte Python
+    work. Bytes after the last terminator are kept for the next
+    feed(). For modules that end barcodes with CR LF, use b"\\r\\n" as
+    the terminator.
 
-    PROPERTY_MIRROR_FLIP = "MIRLRE"
-    # MIRLRE1 - ON
-    # MIRLRE0 - OFF (default)
+    Each feed() has a fixed cost of a few hundred nanoseconds, so feed
+    whole reads rather than single bytes. When most feeds hold only
+    part of a frame, that makes it slower than appending to bytes and
+    calling split(); see benchmarks/bench_frame_parser.py.
 
-    PROPERTY_USB_DATA_FORMAT = "UTFEAN"
-    # UTFEAN0 - GBK (default)
-    # UTFEAN1 - UTF-8
+    :param terminator:  The bytes that end each barcode.
+    :param unit:        Frame boundaries fall on multiples of this many
+                        bytes from the start of a frame, 2 for UTF-16
+                        where a terminator byte can appear inside a
+                        character.
+    :param size:        Initial buffer size in bytes. The buffer grows
+                        if a single frame needs more.
+    :param strip:       Drop the terminator from returned frames.
+    :param max_frame_size: Pending bytes beyond this without a
+                        terminator are discarded and counted in
+                        dropped_bytes.
 
-    PROPERTY_SERIAL_DATA_FORMAT = "232UTF"
-    # 232UTF0 - GBK (default)
-    # 232UTF1 - UTF-8
-    # 232UTF2 - Unicode BIG
-    # 232UTF3 - Unicode little
+    :return:            The BarcodeFrameParser object.
+    :rtype:             Object
+    """
+    def __init__(self, terminator = b"\n", size = 4096, strip = False, max_frame_size = 65536, unit = 1):
+        self.terminator = bytes(terminator)
+        self.unit = unit
+        self.strip = strip
+        self.max_frame_size = max_frame_size
+        self.dropped_bytes = 0
 
-    PROPERTY_INVOICE_MODE = "SPCINV"
-    # SPCINV1 - ON
-    # SPCINV0 - OFF (default)
+        self._buffer = bytearray(max(size, len(self.terminator)))
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+        self._search = 0
 
-    PROPERTY_VIRTUAL_KEYBOARD = "KBDVIR"
-    # KBDVIR1 - ON (default)
-    # KBDVIR0 - OFF
+    # --------------------------------------------------------
+    # feed(data)
+    #
+    # Add bytes and return the frames they complete.
+    def feed(self, data):
+        """
+            Add received bytes and pull out every complete frame.
 
-    PROPERTY_COMM_MODE = "POR"
-    # PORKBD - USB-KBW Mode
-    # PORHID - USB-HID Mode
-    # PORVIC - USB-COM Mode
-    # POR232 - TTL/RS232
+            :param data: bytes, bytearray or memoryview
+            :return: the complete frames, as bytes
+            :rtype: list
+        """
+        end = self._end
+        new_end = end + len(data)
+        if new_end > len(self._buffer):
+            self._make_room(len(data))
+            end = self._end
+            new_end = end + len(data)
 
-    PROPERTY_BAUD_RATE = "232BAD"
-    # 232BAD2 - 1200 bps
-    # 232BAD3 - 2400 bps
-    # 232BAD4 - 4800 bps
-    # 232BAD5 - 9600 bps
-    # 232BAD6 - 19200 bps
-    # 232BAD7 - 38400 bps
-    # 232BAD8 - 57600 bps
-    # 232BAD9 - 115200 bps (default)
+        # A plain copy; bytearray slice assignment also handles resizing
+        # and costs about three times as much
+        self._view[end:new_end] = data
+        self._end = new_end
 
-    PROPERTY_READING_MODE = "SCM"
-    # SCMMAN - Manual (default)
-    # SCMCNT - Continuous
-    # SCMMDH - Motion Mode
+        if self.unit > 1:
+            return self._split_units(new_end)
 
-    PROPERTY_CONTINUOUS_MODE_INTERVAL = "CNTALW"
-    # CNTALW0 - Output Once
-    # CNTALW1 - Output Continuous No Interval
-    # CNTALW2 - Output Continuous 0.5s Interval
-    # CNTALW3 - Output Continuous 1s Interval
+        buffer = self._buffer
+        terminator = self.terminator
+        start = self._start
+        index = buffer.find(terminator, self._search, new_end)
+        size = len(terminator)
+        if index < 0:
+            # Partial frame, the common case for long barcodes
+            if new_end - start > self.max_frame_size:
+                self.dropped_bytes += new_end - start
+                self.reset()
+            else:
+                # A terminator split across feeds starts in the old bytes
+                search = new_end - size + 1
+                self._search = search if search > start else start
+            return []
 
-    PROPERTY_MOTION_SENSITIVITY = "MDTTHR"
-    # MDTTHR15 - Extremely High Sensitivity
-    # MDTTHR20 - High Sensitivity (default)
-    # MDTTHR30 - Highish Sensitivity
-    # MDTTHR50 - Mid Sensitivity
-    # MDTTHR100 - Low Sensitivity
+        view = self._view
+        keep = 0 if self.strip else size
+        if buffer.find(terminator, index + size, new_end) < 0:
+            # One frame, the common case for a scanner
+            frames = [bytes(view[start:index + keep])]
+            start = index + size
+        elif keep and index - start >= 256:
+            # Long frames: one copy each
+            frames = []
+            while index >= 0:
+                frames.append(bytes(view[start:index + size]))
+                start = index + size
+                index = buffer.find(terminator, start, new_end)
+        else:
+            # Short frames: one copy and one split() for all of them
+            frames = bytes(view[start:new_end]).split(terminator)
+            start = new_end - len(frames.pop())
+            if keep:
+                frames = [frame + terminator for frame in frames]
 
-    PROPERTY_TRANSFER_CODE_ID = "CIDENA"
-    # CIDENA1 - Transfer Code ID
-    # CIDENA0 - Do Not Transfer Code ID (default)
+        if start == new_end:
+            self._start = self._end = self._search = 0
+        else:
+            self._start = start
+            search = new_end - size + 1
+            self._search = search if search > start else start
+        return frames
 
-    PROPERTY_KBD_CASE_CONVERSION = "KBDCNV"
-    # KBDCNV0 - No conversion (default)
-    # KBDCNV1 - ALL CAPS
-    # KBDCNV2 - all lowercase
-    # KBDCNV3 - case-to-case
+    # --------------------------------------------------------
+    # _split_units(new_end)
+    #
+    # feed() for frames whose terminators must fall on unit boundaries.
+    def _split_units(self, new_end):
+        buffer = self._buffer
+        terminator = self.terminator
+        unit = self.unit
+        start = self._start
+        index = buffer.find(terminator, self._search, new_end)
+        while index >= 0 and (index - start) % unit:
+            index = buffer.find(terminator, index + 1, new_end)
 
-    # Barcode Style Enable/Disable
-    PROPERTY_ENABLE_ALL_1D = "ODCENA"
-    PROPERTY_DISABLE_ALL_1D = "ODCDIS"
-    PROPERTY_ENABLE_ALL_2D = "AQRENA"
-    PROPERTY_DISABLE_ALL_2D = "AQRDIS"
+        if index < 0:
+            if new_end - start > self.max_frame_size:
+                self.dropped_bytes += new_end - start
+                self.reset()
+            else:
+                self._search = max(start, new_end - len(terminator) + 1)
+            return []
 
-    # Constructor
-    def __init__(self, hard_port = None):
-        if hard_port is None:
-            self.hard_port = serial.Serial("/dev/ttyACM0", 115200, timeout=1)
+        view = self._view
+        size = len(terminator)
+        keep = 0 if self.strip else size
+
+        frames = []
+        while index >= 0:
+            frames.append(bytes(view[start:index + keep]))
+            start = index + size
+            index = buffer.find(terminator, start, new_end)
+            while index >= 0 and (index - start) % unit:
+                index = buffer.find(terminator, index + 1, new_end)
+
+        if start == new_end:
+            self._start = self._end = self._search = 0
         else:
-            self.hard_port = hard_port
-    
+            self._start = start
+            self._search = max(start, new_end - size + 1)
+        return frames
+
     # --------------------------------------------------------
-    # begin()
+    # iter_frames(chunks)
     #
-    # Initializes the device with basic settings. Returns false
-    # if the device is not detected
-    def begin(self):
+    # Generator over the frames in an iterable of chunks.
+    def iter_frames(self, chunks):
         """
-            Initializes the device with basic settings. Calls the 
-            is_connected() function
+            Feed each chunk in turn and yield every complete frame.
+
+            :param chunks: an iterable of bytes-like objects
+        """
+        for chunk in chunks:
+            for frame in self.feed(chunk):
+                yield frame
+
+    # --------------------------------------------------------
+    # take_prefix(values, limit)
+    #
+    # Remove leading bytes of the pending partial frame.
+    def take_prefix(self, values, limit = None):
+        """
+            Remove the bytes at the start of the pending partial frame
+            that are in values, for out of band bytes that must not
+            wait for a terminator. With a unit above 1, removing an odd
+            number of bytes moves the frame's unit boundaries; call
+            feed(b"") afterwards for frames that are now complete.
+
+            :param values: bytes listing the byte values to remove
+            :param limit: the most bytes to remove, or None for no
+                limit
+            :return: the removed bytes
+            :rtype: bytes
+        """
+        start = self._start
+        end = self._end if limit is None else min(self._end, start + limit)
+        while start < end and self._buffer[start] in values:
+            start += 1
+
+        taken = bytes(self._view[self._start:start])
+        self._start = start
+        if self.unit > 1:
+            # Terminators skipped as misaligned may be aligned now
+            self._search = start
+        else:
+            self._search = max(self._search, start)
+        if start == self._end:
+            self.reset()
+        return taken
+
+    # --------------------------------------------------------
+    # peek()
+    #
+    # The pending partial frame.
+    def peek(self):
+        """
+            :return: the bytes received since the last complete frame,
+                which are kept
+            :rtype: bytes
+        """
+        return bytes(self._view[self._start:self._end])
+
+    # --------------------------------------------------------
+    # flush()
+    #
+    # Return and forget the pending partial frame.
+    def flush(self):
+        """
+            :return: the bytes received since the last complete frame
+            :rtype: bytes
+        """
+        pending = bytes(self._view[self._start:self._end])
+        self.reset()
+        return pending
+
+    # --------------------------------------------------------
+    # reset()
+    #
+    # Forget the pending partial frame.
+    def reset(self):
+        """
+            Discard any bytes received since the last complete frame.
+        """
+        self._start = self._end = self._search = 0
+
+    def __len__(self):
+        return self._end - self._start
+
+    # --------------------------------------------------------
+    # _make_room(size)
+    #
+    # Make space for size more bytes after the pending ones.
+    def _make_room(self, size):
+        pending = self._end - self._start
+        if pending + size <= len(self._buffer):
+            # Move the partial frame to the front of the buffer
+            self._buffer[:pending] = self._buffer[self._start:self._end]
+        else:
+            buffer = bytearray(max(2 * len(self._buffer), pending + size))
+            buffer[:pending] = self._view[self._start:self._end]
+            self._view.release()
+            self._buffer = buffer
+            self._view = memoryview(buffer)
+
+        self._search -= self._start
+        self._start = 0
+        self._end = pending
+
+class DuplicateFilter(object):
+    """
+    DuplicateFilter
+
+    Suppress repeats of the same barcode within a time window, for
+    continuous read mode where the module sends a code many times a
+    second while it is in view. Recent codes are kept in an
+    OrderedDict in least recently seen order, so lookup, refresh and
+    eviction are all O(1) and memory is capped at max_entries codes.
+
+    The window slides: each repeat restarts it, so a code held in
+    front of the scanner is delivered once, and again only after it
+    has been out of view for a full window.
+
+    :param window_ms:   How long a code is remembered, in milliseconds.
+    :param max_entries: The most codes remembered at once. The least
+                        recently seen code is forgotten first.
+
+    :return:            The DuplicateFilter object.
+    :rtype:             Object
+    """
+    def __init__(self, window_ms = 1000, max_entries = 1024):
+        self.window_ms = window_ms
+        self.max_entries = max_entries
+        self.passed = 0
+        self.suppressed = 0
+        self._seen = collections.OrderedDict()
+
+    # --------------------------------------------------------
+    # accept(code)
+    #
+    # Check a code against the recently seen ones.
+    def accept(self, code):
+        """
+            :param code: the barcode, as bytes or str
+            :return: true if the code should be delivered, false if it
+                is a duplicate
+            :rtype: bool
+        """
+        now = time.monotonic()
+        seen = self._seen
+        expired = now - self.window_ms / 1000.0
+
+        # Oldest first, so stop at the first one still in the window
+        while seen:
+            oldest = next(iter(seen))
+            if seen[oldest] > expired:
+                break
+            del seen[oldest]
+
+        duplicate = code in seen
+        seen[code] = now
+        if duplicate:
+            seen.move_to_end(code)
+            self.suppressed += 1
+            return False
+
+        if len(seen) > self.max_entries:
+            seen.popitem(last=False)
+        self.passed += 1
+        return True
+
+    # --------------------------------------------------------
+    # stats()
+    #
+    # Counters for monitoring.
+    def stats(self):
+        """
+            :return: the number of codes passed and suppressed, and
+                how many are currently remembered
+            :rtype: dict
+        """
+        return {
+            "passed": self.passed,
+            "suppressed": self.suppressed,
+            "tracked": len(self._seen),
+        }
+
+    # --------------------------------------------------------
+    # reset()
+    #
+    # Forget every code and zero the counters.
+    def reset(self):
+        """
+            Forget every remembered code and zero the counters.
+        """
+        self._seen.clear()
+        self.passed = 0
+        self.suppressed = 0
+
+class ScanQueue(object):
+    """
+    ScanQueue
+
+    A bounded queue between a scanner's reader and the code consuming
+    its barcodes. Pass it to DE2120BarcodeScanner.start_listening()
+    as the queue, or put() ScannerHub events into it. When the
+    consumer falls behind and maxsize barcodes are waiting, policy
+    decides what happens to the next one:
+
+    * BLOCK: put() waits for room. The reader stops reading and bytes
+      back up in the operating system's serial buffer.
+    * DROP_OLDEST: the oldest waiting barcode is dropped, so the
+      consumer always sees the latest scans.
+    * DROP_NEWEST: the new barcode is dropped.
+    * PAUSE: stop_scan() is sent to the module when high_water
+      barcodes are waiting, and start_scan() once the consumer has
+      brought the queue down to low_water. Barcodes the module sends
+      before it stops are kept while there is room and dropped after
+      that. The commands are sent from a helper thread, so the reader
+      keeps routing their ACKs.
+
+    Every drop is counted in stats(), and on_drop, if given, is called
+    with each dropped barcode from the thread that called put().
+
+    :param maxsize:     The most barcodes held.
+    :param policy:      BLOCK, DROP_OLDEST, DROP_NEWEST or PAUSE.
+    :param scanner:     The DE2120BarcodeScanner to pause. Required
+                        for PAUSE; an AsyncDE2120BarcodeScanner is not
+                        supported.
+    :param high_water:  Pause at this many waiting barcodes. Defaults
+                        to 80% of maxsize.
+    :param low_water:   Resume at this many. Defaults to 25% of
+                        maxsize.
+    :param on_drop:     Called with each dropped barcode.
+
+    :return:            The ScanQueue object.
+    :rtype:             Object
+    """
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    PAUSE = "pause"
+
+    def __init__(self, maxsize = 1000, policy = BLOCK, scanner = None, high_water = None,
+                 low_water = None, on_drop = None):
+        if policy not in (self.BLOCK, self.DROP_OLDEST, self.DROP_NEWEST, self.PAUSE):
+            raise ValueError("unknown overflow policy: %r" % (policy,))
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        if policy == self.PAUSE and scanner is None:
+            raise ValueError("the pause policy needs the scanner to pause")
+        if policy == self.PAUSE and isinstance(scanner, AsyncDE2120BarcodeScanner):
+            # Its stop_scan() and start_scan() are coroutines
+            raise ValueError("the pause policy can't send commands to an AsyncDE2120BarcodeScanner")
+
+        if high_water is None:
+            high_water = max(1, maxsize * 4 // 5)
+        if low_water is None:
+            low_water = maxsize // 4
+        if not 0 <= low_water < high_water <= maxsize:
+            raise ValueError("need 0 <= low_water < high_water <= maxsize")
+
+        self.maxsize = maxsize
+        self.policy = policy
+        self.scanner = scanner
+        self.high_water = high_water
+        self.low_water = low_water
+        self.on_drop = on_drop
+
+        self.put_count = 0
+        self.dropped_oldest = 0
+        self.dropped_newest = 0
+        self.blocked_puts = 0
+        self.pauses = 0
+        self.resumes = 0
+        self.max_depth = 0
+
+        self._items = collections.deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+        # PAUSE: what the queue wants and the helper thread that
+        # brings the module into line
+        self._want_paused = False
+        self._flow = threading.Condition(threading.Lock())
+        self._flow_thread = None
+        self._closed = False
+
+    # --------------------------------------------------------
+    # put(barcode, block, timeout)
+    #
+    # Add a barcode, applying the overflow policy.
+    def put(self, barcode, block = True, timeout = None):
+        """
+            Add a barcode. Only BLOCK waits; the other policies make
+            room or drop at once.
+
+            :param barcode: the barcode to queue
+            :param block: for BLOCK, wait for room. If false, or the
+                timeout passes, raise queue.Full.
+            :param timeout: for BLOCK, the longest to wait, in seconds
+            :return: true if the barcode was queued, false if it was
+                dropped
+            :rtype: bool
+        """
+        accepted = True
+        dropped = None
+        with self._lock:
+            items = self._items
+            if len(items) >= self.maxsize:
+                if self.policy == self.BLOCK:
+                    self.blocked_puts += 1
+                    if not block:
+                        raise queue.Full
+                    if not self._not_full.wait_for(lambda: len(items) < self.maxsize, timeout):
+                        raise queue.Full
+                elif self.policy == self.DROP_OLDEST:
+                    dropped = items.popleft()
+                    self.dropped_oldest += 1
+                else:
+                    accepted = False
+                    dropped = barcode
+                    self.dropped_newest += 1
+
+            if accepted:
+                items.append(barcode)
+                self.put_count += 1
+                depth = len(items)
+                if depth > self.max_depth:
+                    self.max_depth = depth
+                self._not_empty.notify()
+                if self.policy == self.PAUSE and depth >= self.high_water and not self._want_paused:
+                    self._set_paused(True)
+
+        if dropped is not None and self.on_drop is not None:
+            self.on_drop(dropped)
+        return accepted
+
+    # --------------------------------------------------------
+    # get(block, timeout)
+    #
+    # Take the oldest barcode.
+    def get(self, block = True, timeout = None):
+        """
+            :param block: wait for a barcode if none is queued
+            :param timeout: the longest to wait, in seconds
+            :return: the oldest barcode
+            :raises queue.Empty: if no barcode is queued, or none
+                arrived before the timeout
+        """
+        with self._lock:
+            items = self._items
+            if not items:
+                if not block or not self._not_empty.wait_for(lambda: items, timeout):
+                    raise queue.Empty
+            barcode = items.popleft()
+            self._not_full.notify()
+            if self._want_paused and len(items) <= self.low_water:
+                self._set_paused(False)
+            return barcode
+
+    def get_nowait(self):
+        return self.get(False)
+
+    def put_nowait(self, barcode):
+        return self.put(barcode, False)
+
+    def qsize(self):
+        return len(self._items)
+
+    def empty(self):
+        return not self._items
+
+    def full(self):
+        return len(self._items) >= self.maxsize
+
+    def __len__(self):
+        return len(self._items)
+
+    # --------------------------------------------------------
+    # stats()
+    #
+    # Counters for monitoring.
+    def stats(self):
+        """
+            :return: barcodes queued in total, drops by policy, puts
+                that found the queue full under BLOCK, pauses and
+                resumes, the current and largest depth, and whether
+                the module is meant to be paused
+            :rtype: dict
+        """
+        return {
+            "queued": self.put_count,
+            "dropped_oldest": self.dropped_oldest,
+            "dropped_newest": self.dropped_newest,
+            "dropped": self.dropped_oldest + self.dropped_newest,
+            "blocked_puts": self.blocked_puts,
+            "pauses": self.pauses,
+            "resumes": self.resumes,
+            "depth": len(self._items),
+            "max_depth": self.max_depth,
+            "paused": self._want_paused,
+        }
+
+    # --------------------------------------------------------
+    # close()
+    #
+    # Stop the PAUSE helper thread.
+    def close(self):
+        """
+            Stop the helper thread used by the PAUSE policy. The
+            module is left as it is.
+        """
+        with self._flow:
+            self._closed = True
+            self._flow.notify()
+        if self._flow_thread is not None:
+            self._flow_thread.join()
+            self._flow_thread = None
+
+    # --------------------------------------------------------
+    # _set_paused(paused)
+    #
+    # Ask the helper thread to pause or resume the module. Called
+    # with the queue lock held.
+    def _set_paused(self, paused):
+        self._want_paused = paused
+        if paused:
+            self.pauses += 1
+        else:
+            self.resumes += 1
+
+        with self._flow:
+            if self._flow_thread is None and not self._closed:
+                self._flow_thread = threading.Thread(target=self._flow_loop, name="ScanQueue flow control")
+                self._flow_thread.daemon = True
+                self._flow_thread.start()
+            self._flow.notify()
+
+    # --------------------------------------------------------
+    # _flow_loop()
+    #
+    # Helper thread: send stop_scan()/start_scan() until the module
+    # matches what the queue wants.
+    def _flow_loop(self):
+        paused = False
+        while True:
+            with self._flow:
+                while not self._closed and self._want_paused == paused:
+                    self._flow.wait()
+                if self._closed:
+                    return
+                want = self._want_paused
+
+            if want:
+                result = self.scanner.stop_scan()
+            else:
+                result = self.scanner.start_scan()
+            if result:
+                paused = want
+            else:
+                # Not acknowledged; try again shortly
+                time.sleep(0.05)
+
+class ScanResult(object):
+    """
+    ScanResult
+
+    One barcode read from the module, returned in place of a string
+    once DE2120BarcodeScanner.enable_scan_results() is called.
+
+    SYMBOLOGIES, the Code ID to symbology table, is provisional: it
+    follows the common single character Code ID convention and has
+    not been checked against the DE2120 Scan Setting Manual. A
+    firmware may use other characters, so treat symbology as a hint
+    and fall back on code_id. Add or correct entries by updating
+    ScanResult.SYMBOLOGIES.
+
+    :ivar payload:      The barcode text, without Code ID or line ending.
+                        bytes in bytes-only mode, where str() decodes
+                        it as latin-1.
+    :ivar symbology:    The symbology name, such as "EAN-13", or None if
+                        no Code ID was sent or it is not in SYMBOLOGIES.
+    :ivar code_id:      The Code ID character, or None.
+    :ivar raw:          The bytes as received, terminator included.
+    :ivar received_at:  time.monotonic() when the bytes were read.
+    :ivar gs1:          GS1 Application Identifier to value, when
+                        enable_scan_results(gs1=True) is on and the
+                        scan is marked as GS1; otherwise None.
+    """
+    __slots__ = ("payload", "symbology", "code_id", "raw", "received_at", "gs1")
+
+    # Code ID character to symbology; provisional, see above
+    SYMBOLOGIES = {
+        "a": "Codabar",
+        "b": "Code 39",
+        "c": "UPC-A",
+        "E": "UPC-E",
+        "d": "EAN-13",
+        "D": "EAN-8",
+        "e": "Interleaved 2 of 5",
+        "f": "Industrial 2 of 5",
+        "g": "MSI",
+        "h": "Code 11",
+        "i": "Code 93",
+        "j": "Code 128",
+        "I": "GS1-128",
+        "m": "Matrix 2 of 5",
+        "y": "GS1 DataBar",
+        "r": "PDF417",
+        "R": "MicroPDF417",
+        "s": "QR Code",
+        "w": "Data Matrix",
+        "z": "Aztec",
+        "H": "Han Xin",
+    }
+
+    def __init__(self, payload, symbology = None, code_id = None, raw = b"", received_at = None,
+                 gs1 = None):
+        self.payload = payload
+        self.symbology = symbology
+        self.code_id = code_id
+        self.raw = raw
+        self.received_at = received_at
+        self.gs1 = gs1
+
+    # --------------------------------------------------------
+    # from_frame(frame, text, code_id, received_at)
+    #
+    # Build a result from a received frame.
+    @classmethod
+    def from_frame(cls, frame, text, code_id = False, received_at = None):
+        """
+            :param frame: the frame bytes as received
+            :param text: the frame decoded to a string, or the frame
+                bytes in bytes-only mode
+            :param code_id: true if the first character is a Code ID
+            :param received_at: time.monotonic() when it was read
+            :return: the ScanResult
+            :rtype: ScanResult
+        """
+        if isinstance(text, bytes):
+            text = text.rstrip(b"\r\n")
+            code = chr(text[0]) if code_id and text else None
+        else:
+            text = text.rstrip("\r\n")
+            code = text[0] if code_id and text else None
+
+        if code is not None:
+            return cls(text[1:], cls.SYMBOLOGIES.get(code), code, frame, received_at)
+        return cls(text, None, None, frame, received_at)
+
+    def __str__(self):
+        if isinstance(self.payload, bytes):
+            # Bytes-only mode; latin-1 maps every byte to a character
+            return self.payload.decode("latin-1")
+        return self.payload
+
+    def __repr__(self):
+        return "ScanResult(payload=%r, symbology=%r, code_id=%r)" % (
+            self.payload, self.symbology, self.code_id)
+
+    def __eq__(self, other):
+        if not isinstance(other, ScanResult):
+            return NotImplemented
+        return (self.payload, self.code_id, self.raw) == (other.payload, other.code_id, other.raw)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+class ScannerProfile(dict):
+    """
+    ScannerProfile
+
+    A set of module settings: a dict of PROPERTY_* code to argument,
+    applied with DE2120BarcodeScanner.apply_profile(). Arguments are
+    stored as strings. Properties that take no argument, such as
+    PROPERTY_DISABLE_ALL_1D, map to "". ::
+
+        profile = ScannerProfile({
+            DE2120BarcodeScanner.PROPERTY_DECODE_BEEP: 0,
+            DE2120BarcodeScanner.PROPERTY_FLASH_LIGHT: 1,
+            DE2120BarcodeScanner.PROPERTY_READING_AREA: 2,
+            DE2120BarcodeScanner.PROPERTY_READING_MODE: "CNT",
+            DE2120BarcodeScanner.PROPERTY_CONTINUOUS_MODE_INTERVAL: 1,
+        })
+
+    Settings are applied in insertion order, so put the reading mode
+    before its interval or sensitivity.
+
+    :return:            The ScannerProfile object.
+    :rtype:             Object
+    """
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self)
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, str(value))
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def copy(self):
+        return ScannerProfile(self)
+
+class ScannerMetrics(object):
+    """
+    ScannerMetrics
+
+    Counters and a round trip time histogram for one scanner, filled
+    in by DE2120BarcodeScanner once enable_metrics() is called:
+    commands sent and their ACK/NACK/timeout results per command
+    code, ACK round trip times, barcodes delivered, bytes read and
+    frames that did not decode cleanly. The read path only adds to
+    plain integers; command results take a lock.
+
+    :param buckets:     Upper bounds of the round trip time histogram
+                        buckets, in seconds.
+    :param labels:      Labels added to every exported sample, as a
+                        dict of name to value.
+
+    :return:            The ScannerMetrics object.
+    :rtype:             Object
+    """
+    DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+    # Index of each result in a command's counts
+    _SENT, _ACK, _NACK, _TIMEOUT = range(4)
+
+    def __init__(self, buckets = DEFAULT_BUCKETS, labels = None):
+        self.buckets = tuple(sorted(buckets))
+        self.labels = dict(labels or {})
+        self.scans = 0
+        self.bytes_read = 0
+        self.decode_errors = 0
+        self.queue_depth = 0
+        self._commands = {}
+        self._rtt_counts = [0] * (len(self.buckets) + 1)
+        self._rtt_sum = 0.0
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------
+    # record_command(cmd, result, rtt)
+    #
+    # Count one command and its response.
+    def record_command(self, cmd, result, rtt):
+        """
+            :param cmd: the command code
+            :param result: True for ACK, False for NACK, None for a
+                timeout
+            :param rtt: seconds from writing the command to its
+                response; not recorded for timeouts
+        """
+        with self._lock:
+            counts = self._commands.get(cmd)
+            if counts is None:
+                counts = self._commands[cmd] = [0, 0, 0, 0]
+            counts[self._SENT] += 1
+            if result is None:
+                counts[self._TIMEOUT] += 1
+                return
+
+            counts[self._ACK if result else self._NACK] += 1
+            self._rtt_counts[bisect.bisect_left(self.buckets, rtt)] += 1
+            self._rtt_sum += rtt
+
+    # --------------------------------------------------------
+    # snapshot()
+    #
+    # Copy out every metric.
+    def snapshot(self):
+        """
+            :return: the metrics as a dict. "commands" maps each
+                command code to its sent/ack/nack/timeout counts.
+                "rtt" holds the histogram as cumulative (upper bound,
+                count) pairs, ending with float("inf"), plus its sum
+                and count.
+            :rtype: dict
+        """
+        with self._lock:
+            commands = dict((cmd, dict(zip(("sent", "ack", "nack", "timeout"), counts)))
+                            for cmd, counts in self._commands.items())
+            rtt_counts = list(self._rtt_counts)
+            rtt_sum = self._rtt_sum
+
+        cumulative = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), rtt_counts):
+            total += count
+            cumulative.append((bound, total))
+
+        return {
+            "commands": commands,
+            "rtt": {"buckets": cumulative, "sum": rtt_sum, "count": total},
+            "scans": self.scans,
+            "bytes_read": self.bytes_read,
+            "decode_errors": self.decode_errors,
+            "queue_depth": self.queue_depth,
+        }
+
+    # --------------------------------------------------------
+    # text(prefix)
+    #
+    # The metrics in the Prometheus text exposition format.
+    def text(self, prefix = "de2120_"):
+        """
+            :param prefix: prepended to every metric name
+            :return: the metrics as Prometheus text format, version
+                0.0.4
+            :rtype: str
+        """
+        snapshot = self.snapshot()
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append("# HELP %s%s %s" % (prefix, name, help_text))
+            lines.append("# TYPE %s%s %s" % (prefix, name, kind))
+
+        def sample(name, value, **labels):
+            lines.append("%s%s%s %s" % (prefix, name, self._label_text(labels), self._number(value)))
+
+        family("commands_total", "counter", "Commands sent to the module.")
+        for cmd, counts in sorted(snapshot["commands"].items()):
+            sample("commands_total", counts["sent"], command=cmd)
+
+        family("command_responses_total", "counter", "Command results by type.")
+        for cmd, counts in sorted(snapshot["commands"].items()):
+            for result in ("ack", "nack", "timeout"):
+                sample("command_responses_total", counts[result], command=cmd, result=result)
+
+        family("command_rtt_seconds", "histogram", "Time from sending a command to its ACK or NACK.")
+        for bound, count in snapshot["rtt"]["buckets"]:
+            sample("command_rtt_seconds_bucket", count, le=self._number(bound))
+        sample("command_rtt_seconds_sum", snapshot["rtt"]["sum"])
+        sample("command_rtt_seconds_count", snapshot["rtt"]["count"])
+
+        family("scans_total", "counter", "Barcodes delivered.")
+        sample("scans_total", snapshot["scans"])
+        family("bytes_read_total", "counter", "Bytes read from the serial port.")
+        sample("bytes_read_total", snapshot["bytes_read"])
+        family("decode_errors_total", "counter", "Barcodes with bytes that did not decode.")
+        sample("decode_errors_total", snapshot["decode_errors"])
+        family("reader_queue_depth", "gauge", "Barcodes received but not yet taken.")
+        sample("reader_queue_depth", snapshot["queue_depth"])
+
+        return "\n".join(lines) + "\n"
+
+    # --------------------------------------------------------
+    # reset()
+    #
+    # Zero every metric.
+    def reset(self):
+        with self._lock:
+            self._commands.clear()
+            self._rtt_counts = [0] * (len(self.buckets) + 1)
+            self._rtt_sum = 0.0
+        self.scans = 0
+        self.bytes_read = 0
+        self.decode_errors = 0
+
+    def _label_text(self, extra):
+        labels = dict(self.labels)
+        labels.update(extra)
+        if not labels:
+            return ""
+        return "{" + ",".join('%s="%s"' % (name, self._escape(value))
+                              for name, value in sorted(labels.items())) + "}"
+
+    @staticmethod
+    def _escape(value):
+        return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+    @staticmethod
+    def _number(value):
+        if value == float("inf"):
+            return "+Inf"
+        return repr(value)
+
+class WireTrace(object):
+    """
+    WireTrace
+
+    A ring buffer of the bytes written to and read from a scanner's
+    serial port, for finding out after the fact whether the module
+    stopped sending, NACKed a command or a barcode was mis-framed.
+    Each write() or read chunk is one event: direction, time.monotonic()
+    timestamp, length and the bytes themselves. Event fields live in
+    preallocated arrays and the bytes in one preallocated bytearray,
+    so recording copies into existing storage and builds no objects
+    per event. Old events and bytes are overwritten once the buffer
+    is full.
+
+    :param events:      How many events to keep.
+    :param data_bytes:  How many bytes of event data to keep.
+
+    :return:            The WireTrace object.
+    :rtype:             Object
+    """
+    TX = 0
+    RX = 1
+
+    _DIRECTION_NAMES = ("TX", "RX")
+
+    def __init__(self, events = 1024, data_bytes = 65536):
+        if events < 1 or data_bytes < 1:
+            raise ValueError("events and data_bytes must be at least 1")
+
+        self.events = events
+        self.data_bytes = data_bytes
+        self._times = array.array("d", [0.0]) * events
+        self._directions = array.array("B", [0]) * events
+        self._lengths = array.array("q", [0]) * events
+        self._offsets = array.array("q", [0]) * events
+        self._data = bytearray(data_bytes)
+        self._view = memoryview(self._data)
+        self._count = 0
+        self._data_end = 0
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------
+    # record(direction, data)
+    #
+    # Add one chunk to the trace.
+    def record(self, direction, data):
+        """
+            :param direction: WireTrace.TX or WireTrace.RX
+            :param data: the bytes written or read. Only the first
+                data_bytes of a larger chunk are kept.
+        """
+        length = len(data)
+        stored = min(length, self.data_bytes)
+        with self._lock:
+            index = self._count % self.events
+            self._times[index] = time.monotonic()
+            self._directions[index] = direction
+            self._lengths[index] = length
+            self._offsets[index] = self._data_end
+
+            start = self._data_end % self.data_bytes
+            split = self.data_bytes - start
+            if stored <= split:
+                self._view[start:start + stored] = data[:stored] if stored < length else data
+            else:
+                self._view[start:] = data[:split]
+                self._view[:stored - split] = data[split:stored]
+
+            self._data_end += stored
+            self._count += 1
+
+    # --------------------------------------------------------
+    # entries()
+    #
+    # The events still in the buffer, oldest first.
+    def entries(self):
+        """
+            :return: a list of (sequence, timestamp, direction, length,
+                data) tuples, oldest first. direction is "TX" or "RX".
+                data is the stored bytes, or None once they have been
+                overwritten.
+            :rtype: list
+        """
+        with self._lock:
+            first = max(0, self._count - self.events)
+            oldest_byte = self._data_end - self.data_bytes
+            entries = []
+            for sequence in range(first, self._count):
+                index = sequence % self.events
+                length = self._lengths[index]
+                offset = self._offsets[index]
+                data = None
+                if offset >= oldest_byte:
+                    stored = min(length, self.data_bytes)
+                    start = offset % self.data_bytes
+                    data = bytes(self._data[start:start + stored])
+                    if len(data) < stored:
+                        data += bytes(self._data[:stored - len(data)])
+                entries.append((sequence, self._times[index], self._DIRECTION_NAMES[self._directions[index]],
+                                length, data))
+            return entries
+
+    # --------------------------------------------------------
+    # dump()
+    #
+    # The trace as hex dump text.
+    def dump(self):
+        """
+            Format the trace as text: a header line per event with its
+            sequence number, direction, length, timestamp and time
+            since the previous event, followed by offset/hex/ASCII
+            lines in the style of hexdump -C, which text2pcap also
+            reads.
+
+            :return: the trace, oldest event first
+            :rtype: str
+        """
+        entries = self.entries()
+        lines = ["# DE2120 wire trace: %d events, oldest first" % len(entries)]
+        previous = None
+        for sequence, timestamp, direction, length, data in entries:
+            delta = 0.0 if previous is None else timestamp - previous
+            previous = timestamp
+            lines.append("#%d %s %d bytes at %.6f (+%.6f)" % (sequence, direction, length, timestamp, delta))
+            if data is None:
+                lines.append("      (bytes overwritten)")
+                continue
+
+            for offset in range(0, len(data), 16):
+                chunk = data[offset:offset + 16]
+                hex_text = " ".join("%02x" % byte for byte in chunk)
+                text = "".join(chr(byte) if 32 <= byte < 127 else "." for byte in chunk)
+                lines.append("%04x  %-47s  |%s|" % (offset, hex_text, text))
+            if len(data) < length:
+                lines.append("      (%d more bytes not kept)" % (length - len(data)))
+
+        return "\n".join(lines) + "\n"
+
+    # --------------------------------------------------------
+    # clear()
+    #
+    # Forget every event.
+    def clear(self):
+        with self._lock:
+            self._count = 0
+            self._data_end = 0
+
+    def __len__(self):
+        return min(self._count, self.events)
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Serve a scanner's metrics_text() for serve_metrics().
+    """
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+
+        body = self.server.scanner.metrics_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class DE2120BarcodeScanner(object):
+    """
+    DE2120BarcodeScanner 
+
+    Initialize the library with the given port.
+
+    :param hard_port:   The port to use to communicate with the module, this
+                        is a serial port at 9600 baud rate.
+    :param command_timeout_ms:  How long to wait for the module to ACK
+                        a command, in milliseconds. This is separate from
+                        the port's read timeout, which still applies to
+                        reading barcodes.
+
+    :return:            The DE2120BarcodeScanner object.
+    :rtype:             Object
+    """
+    # Constructor
+    device_name = _DEFAULT_NAME
+    
+    # DE2120 response
+    DE2120_COMMAND_ACK = 0x06
+    DE2120_COMMAND_NACK = 0x15
+
+    # Send commands
+    # Need to prepend "^_^" and append "."
+    COMMAND_START_SCAN = "SCAN"
+    COMMAND_STOP_SCAN = "SLEEP"
+    COMMAND_SET_DEFAULTS = "DEFALT"
+    COMMAND_GET_VERSION = "DSPYFW"
+
+    PROPERTY_BUZZER_FREQ = "BEPPWM"
+    # BEPPWM0 - Active Drive
+    # BEPPWM1 - Passive Low Freq
+    # BEPPWM2 - Passive Med Freq (default)
+    # BEPPWM3 - Passive Hi Freq
+
+    PROPERTY_DECODE_BEEP = "BEPSUC"
+    # BEPSUC1 - ON (default)
+    # BEPSUC0 - OFF
+
+    PROPERTY_BOOT_BEEP = "BEPPWR"
+    # BEPPWR1 - ON (default)
+    # BEPPWR0 - OFF
+
+    PROPERTY_FLASH_LIGHT = "LAMENA"
+    # LAMENA1 - ON (default)
+    # LAMENA0 - OFF
+
+    PROPERTY_AIM_LIGHT = "AIMENA"
+    # AIMENA1 - ON (default)
+    # AIMENA0 - OFF
+
+    PROPERTY_READING_AREA = "IMGREG"
+    # IMGREG0 - Full Width (default)
+    # IMGREG1 - Center 80%
+    # IMGREG2 - Center 60%
+    # IMGREG3 - Center 40%
+    # IMGREG4 - Center 20%
+
+    PROPERTY_MIRROR_FLIP = "MIRLRE"
+    # MIRLRE1 - ON
+    # MIRLRE0 - OFF (default)
+
+    PROPERTY_USB_DATA_FORMAT = "UTFEAN"
+    # UTFEAN0 - GBK (default)
+    # UTFEAN1 - UTF-8
+
+    PROPERTY_SERIAL_DATA_FORMAT = "232UTF"
+    # 232UTF0 - GBK (default)
+    # 232UTF1 - UTF-8
+    # 232UTF2 - Unicode BIG
+    # 232UTF3 - Unicode little
+
+    PROPERTY_INVOICE_MODE = "SPCINV"
+    # SPCINV1 - ON
+    # SPCINV0 - OFF (default)
+
+    PROPERTY_VIRTUAL_KEYBOARD = "KBDVIR"
+    # KBDVIR1 - ON (default)
+    # KBDVIR0 - OFF
+
+    PROPERTY_COMM_MODE = "POR"
+    # PORKBD - USB-KBW Mode
+    # PORHID - USB-HID Mode
+    # PORVIC - USB-COM Mode
+    # POR232 - TTL/RS232
+
+    PROPERTY_BAUD_RATE = "232BAD"
+    # 232BAD2 - 1200 bps
+    # 232BAD3 - 2400 bps
+    # 232BAD4 - 4800 bps
+    # 232BAD5 - 9600 bps
+    # 232BAD6 - 19200 bps
+    # 232BAD7 - 38400 bps
+    # 232BAD8 - 57600 bps
+    # 232BAD9 - 115200 bps (default)
+
+    PROPERTY_READING_MODE = "SCM"
+    # SCMMAN - Manual (default)
+    # SCMCNT - Continuous
+    # SCMMDH - Motion Mode
+
+    PROPERTY_CONTINUOUS_MODE_INTERVAL = "CNTALW"
+    # CNTALW0 - Output Once
+    # CNTALW1 - Output Continuous No Interval
+    # CNTALW2 - Output Continuous 0.5s Interval
+    # CNTALW3 - Output Continuous 1s Interval
+
+    PROPERTY_MOTION_SENSITIVITY = "MDTTHR"
+    # MDTTHR15 - Extremely High Sensitivity
+    # MDTTHR20 - High Sensitivity (default)
+    # MDTTHR30 - Highish Sensitivity
+    # MDTTHR50 - Mid Sensitivity
+    # MDTTHR100 - Low Sensitivity
+
+    PROPERTY_TRANSFER_CODE_ID = "CIDENA"
+    # CIDENA1 - Transfer Code ID
+    # CIDENA0 - Do Not Transfer Code ID (default)
+
+    PROPERTY_KBD_CASE_CONVERSION = "KBDCNV"
+    # KBDCNV0 - No conversion (default)
+    # KBDCNV1 - ALL CAPS
+    # KBDCNV2 - all lowercase
+    # KBDCNV3 - case-to-case
+
+    # Barcode Style Enable/Disable
+    PROPERTY_ENABLE_ALL_1D = "ODCENA"
+    PROPERTY_DISABLE_ALL_1D = "ODCDIS"
+    PROPERTY_ENABLE_ALL_2D = "AQRENA"
+    PROPERTY_DISABLE_ALL_2D = "AQRDIS"
+
+    # Serial data formats, see set_data_format()
+    DATA_FORMAT_GBK = "0"
+    DATA_FORMAT_UTF8 = "1"
+    DATA_FORMAT_UTF16_BE = "2"
+    DATA_FORMAT_UTF16_LE = "3"
+    DATA_FORMAT_BYTES = "bytes"
+
+    # Codec for each PROPERTY_SERIAL_DATA_FORMAT argument
+    _DATA_FORMAT_CODECS = {
+        DATA_FORMAT_GBK: "gbk",
+        DATA_FORMAT_UTF8: "utf-8",
+        DATA_FORMAT_UTF16_BE: "utf-16-be",
+        DATA_FORMAT_UTF16_LE: "utf-16-le",
+        DATA_FORMAT_BYTES: None,
+    }
+
+    # PROPERTY_BAUD_RATE argument for each supported rate
+    _BAUD_RATE_ARGS = {
+        1200: "2",
+        2400: "3",
+        4800: "4",
+        9600: "5",
+        19200: "6",
+        38400: "7",
+        57600: "8",
+        115200: "9",
+    }
+    BAUD_RATES = tuple(sorted(_BAUD_RATE_ARGS))
+
+    # Setting one of these clears the other
+    _EXCLUSIVE_PROPERTIES = {
+        PROPERTY_ENABLE_ALL_1D: PROPERTY_DISABLE_ALL_1D,
+        PROPERTY_DISABLE_ALL_1D: PROPERTY_ENABLE_ALL_1D,
+        PROPERTY_ENABLE_ALL_2D: PROPERTY_DISABLE_ALL_2D,
+        PROPERTY_DISABLE_ALL_2D: PROPERTY_ENABLE_ALL_2D,
+    }
+
+    # Properties that cut the link when changed, applied last
+    _LINK_PROPERTIES = (PROPERTY_COMM_MODE, PROPERTY_BAUD_RATE)
+
+    # Seconds the module needs after these commands before it
+    # accepts the next one
+    _SETTLE_TIMES = {
+        PROPERTY_READING_MODE: 0.01,
+    }
+
+    DEFAULT_COMMAND_TIMEOUT_MS = 1000
+
+    # First wait between reconnect attempts, in seconds
+    _INITIAL_BACKOFF = 0.1
+
+    _RESPONSE_BYTES = bytes([DE2120_COMMAND_ACK, DE2120_COMMAND_NACK])
+
+    # Constructor
+    def __init__(self, hard_port = None, command_timeout_ms = DEFAULT_COMMAND_TIMEOUT_MS):
+        if hard_port is None:
+            self.hard_port = serial.Serial("/dev/ttyACM0", 115200, timeout=1)
+        else:
+            self.hard_port = hard_port
+
+        self.command_timeout_ms = command_timeout_ms
+
+        # Last ACKed argument of every property, see apply_profile()
+        self._state = {}
+
+        # Received bytes are split into barcodes by frame_parser
+        self.frame_parser = BarcodeFrameParser()
+        self._rx_barcodes = collections.deque()
+        self._responses = queue.Queue()
+        self.duplicate_filter = None
+
+        # Responses still due for the last command write. In UTF-16
+        # mode a label can start with an ACK or NACK byte, so leading
+        # bytes are only taken as responses while some are due.
+        self._expected_responses = 0
+
+        # When leading bytes of a UTF-16 frame were left in the parser
+        # because nothing followed them yet, see _take_utf16_responses()
+        self._responses_deferred_at = None
+
+        # See add_scan_filter()
+        self._scan_filters = []
+
+        # Background reader state, see start_listening()
+        self._rx_owner = None
+        self._listen_stop = None
+        self._listen_callback = None
+        self._listen_queue = None
+        self._listen_error_callback = None
+        self._listen_exception = None
+
+        # See enable_scan_results()
+        self._scan_results = False
+        self._code_id = None
+        self._gs1 = None
+
+        # See set_data_format()
+        self._data_format = None
+        self._codec = None
+        self._decoder = None
+        self._configure_decoding()
+
+        # See enable_metrics()
+        self._metrics = None
+
+        # See enable_wire_trace()
+        self._trace = None
+        self._trace_dump = None
+
+        # See enable_auto_reconnect()
+        self._auto_reconnect = False
+        self._max_backoff = 5.0
+        self._max_reconnect_attempts = None
+        self._reconnect_path = None
+        self._reconnecting = False
+    
+    # --------------------------------------------------------
+    # begin()
+    #
+    # Initializes the device with basic settings. Returns false
+    # if the device is not detected
+    def begin(self):
+        """
+            Initializes the device with basic settings. Calls the 
+            is_connected() function
+
+            :return: Returns true if initialization was successful
+            :rtype: bool
+        """
+        if self.is_connected() == False:
+            return False
+        
+        # Clear any remaining incoming chars. This prevents a mis-read
+        # of the first barcode
+        self.hard_port.flush()
+
+        # We're all setup
+        return True
+    
+    # ---------------------------------------------------------
+    # is_connected()
+    #
+    # Try to retrieve the firmware verison number as a test to 
+    # determine whether the module is connected.
+    def is_connected(self, timeout_ms = None):
+        """
+            Ask the DE2120 for the firmware version.
+
+            :param timeout_ms: how long to wait for the response, in
+                milliseconds. Defaults to command_timeout_ms.
+            :return: Returns true if the DE2120 responds with an ACK.
+            Retruns false otherwise.
+            :rtype: bool
+        """     
+        # Try sending the firmware version command
+        write_string = "^_^" + chr(4) + "SPYFW."
+        self._write_command(write_string.encode())
+        
+        # Now, look for module response
+        # If it's an ACK, return true
+        # Otherwise, return false
+        incoming = self._read_response(timeout_ms)
+        if incoming == self.DE2120_COMMAND_ACK:
+            return True
+        elif incoming == self.DE2120_COMMAND_NACK:
+            return False
+        else:
+            return False
+    
+    # ---------------------------------------------------------
+    # detect_baud(baud_rates, probe_timeout_ms)
+    #
+    # Find the baud rate the module is set to.
+    def detect_baud(self, baud_rates = None, probe_timeout_ms = 50):
+        """
+            Find the module's baud rate by sending the connection probe
+            at each rate until it ACKs. The rate this port last
+            answered at is tried first, then the port's current rate,
+            then 115200 (the default) and 9600, then the rest from
+            fastest to slowest. The port is left at the detected rate.
+
+            :param baud_rates: the rates to try. Defaults to every rate
+                listed under PROPERTY_BAUD_RATE.
+            :param probe_timeout_ms: how long to wait for each ACK, in
+                milliseconds, on top of the time the probe takes to
+                send at that rate
+            :return: the detected baud rate, or None if the module did
+                not answer at any of them. The port's rate is then
+                left unchanged.
+            :rtype: int
+        """
+        if self._rx_owner is not None:
+            raise RuntimeError("stop the reader before detecting the baud rate")
+
+        port = self.hard_port
+        original = port.baudrate
+        for rate in self._probe_order(baud_rates):
+            if self._probe(rate, probe_timeout_ms):
+                return rate
+
+        port.baudrate = original
+        self._reset_input()
+        return None
+
+    # ---------------------------------------------------------
+    # _probe_order(baud_rates)
+    #
+    # The order detect_baud() tries rates in.
+    def _probe_order(self, baud_rates = None):
+        port = self.hard_port
+        if baud_rates is None:
+            baud_rates = self.BAUD_RATES
+        baud_rates = sorted(baud_rates, reverse=True)
+        for rate in (9600, 115200, port.baudrate, _last_known_baud.get(getattr(port, "port", None))):
+            if rate in baud_rates:
+                baud_rates.remove(rate)
+                baud_rates.insert(0, rate)
+        return baud_rates
+
+    # ---------------------------------------------------------
+    # upgrade_baud(target, probe_timeout_ms)
+    #
+    # Move both the module and the port to a new baud rate.
+    def upgrade_baud(self, target = 115200, probe_timeout_ms = 50):
+        """
+            Switch the module and this end of the link to a new baud
+            rate together. The module is told to change rate, and once
+            it ACKs the port follows, stale bytes are flushed and the
+            link is checked with the connection probe. If the check
+            fails, both ends are put back at the old rate.
+
+            :param target: the baud rate to switch to, one of
+                BAUD_RATES
+            :param probe_timeout_ms: how long to wait for each probe's
+                ACK, in milliseconds
+            :return: true if the link works at the target rate, false
+                if the change was refused or rolled back
+            :rtype: bool
+        """
+        if target not in self._BAUD_RATE_ARGS:
+            raise ValueError("unsupported baud rate: %r" % (target,))
+        if self._rx_owner is not None:
+            raise RuntimeError("stop the reader before changing the baud rate")
+
+        port = self.hard_port
+        old = port.baudrate
+        if old == target:
+            return self._probe(target, probe_timeout_ms)
+
+        # The module answers at the old rate, then switches
+        if not self.change_baud_rate(target):
+            return False
+
+        if self._probe(target, probe_timeout_ms):
+            return True
+
+        # Roll back. The module either never switched...
+        if self._probe(old, probe_timeout_ms):
+            self._remember(self.PROPERTY_BAUD_RATE, self._BAUD_RATE_ARGS.get(old, ""))
+            return False
+
+        # ...or switched but missed the probe, so ask it to go back
+        port.baudrate = target
+        self._reset_input()
+        if old in self._BAUD_RATE_ARGS:
+            self.change_baud_rate(old)
+        if not self._probe(old, probe_timeout_ms):
+            self.detect_baud(probe_timeout_ms=probe_timeout_ms)
+        return False
+
+    # ---------------------------------------------------------
+    # _probe(rate, probe_timeout_ms)
+    #
+    # Check whether the module answers at a baud rate.
+    def _probe(self, rate, probe_timeout_ms):
+        """
+            Set the port to rate, flush stale input and send the
+            connection probe.
+
+            :return: true if the module ACKed
+            :rtype: bool
+        """
+        port = self.hard_port
+        if port.baudrate != rate:
+            port.baudrate = rate
+        self._reset_input()
+
+        if not self.is_connected(self._probe_timeout(rate, probe_timeout_ms)):
+            return False
+
+        _last_known_baud[getattr(port, "port", None)] = rate
+        self._reset_input()
+        return True
+
+    # ---------------------------------------------------------
+    # _probe_timeout(rate, probe_timeout_ms)
+    #
+    # How long a probe at a baud rate waits for its ACK.
+    def _probe_timeout(self, rate, probe_timeout_ms):
+        # Allow for sending the probe and its ACK, 10 bits per byte
+        probe_bits = (len("^_^" + chr(4) + "SPYFW.") + 1) * 10
+        return probe_timeout_ms + probe_bits * 1000.0 / rate
+
+    # ---------------------------------------------------------
+    # open_auto(port, baud_rates, probe_timeout_ms, timeout)
+    #
+    # Open a port at whatever baud rate the module is set to.
+    @classmethod
+    def open_auto(cls, port = "/dev/ttyACM0", baud_rates = None, probe_timeout_ms = 50, timeout = 1, **kwargs):
+        """
+            Open a serial port, detect the module's baud rate with
+            detect_baud() and return a scanner ready to use.
+
+            :param port: the serial port name
+            :param baud_rates: the rates to try, see detect_baud()
+            :param probe_timeout_ms: how long to wait for each ACK, in
+                milliseconds
+            :param timeout: the port's read timeout in seconds
+            :return: the scanner, or None if the module did not answer
+                at any rate
+            :rtype: DE2120BarcodeScanner
+        """
+        hard_port = serial.Serial(port, _last_known_baud.get(port, 115200), timeout=timeout)
+        scanner = cls(hard_port, **kwargs)
+        if scanner.detect_baud(baud_rates, probe_timeout_ms) is None:
+            hard_port.close()
+            return None
+        return scanner
+
+    # ---------------------------------------------------------
+    # _reset_input()
+    #
+    # Drop everything received so far.
+    def _reset_input(self):
+        self.hard_port.reset_input_buffer()
+        self.frame_parser.reset()
+        self._rx_barcodes.clear()
+        self._responses_deferred_at = None
+
+    # ---------------------------------------------------------
+    # factory_default()
+    # 
+    # Returns the DE2120 to factory default settings. This will 
+    # disconnect the module from the serial port
+    def factory_default(self):
+        """
+            Send command to put the module back into facory default
+            settings. This will disconnect the module from the serial
+            port.
+
+            :return: True if command successfully received, false
+            otherwise.
+            :rtype: bool
+        """
+        return self.send_command(self.COMMAND_SET_DEFAULTS)
+    
+    # --------------------------------------------------------
+    # available()
+    #
+    # Returns the number of bytes in the serial receive buffer
+    def available(self):
+        """
+            :return: the number of bytes in the serial receive buffer
+            :rtype: int
+        """
+        return self.hard_port.in_waiting
+
+    # --------------------------------------------------------
+    # read()
+    # 
+    # Read byte from the serial port
+    def read(self):
+        """
+            :return: the first byte on the serial port
+            :rtype: int
+        """
+        incoming = self.hard_port.read()
+        if self._trace is not None:
+            self._trace.record(WireTrace.RX, incoming)
+        return incoming
+    
+    # --------------------------------------------------------
+    # send_command(cmd, arg, timeout_ms)
+    #
+    # Construct a command/parameter and send it to the module.
+    def send_command(self, cmd, arg = "", timeout_ms = None):
+        """
+            Create command string and send to DE2120 over serial 
+            port. Check serial buffer for a response
+
+            :param cmd: The command name
+            :param arg: The command variation, if there is one
+            :param timeout_ms: how long to wait for the response, in
+                milliseconds. Defaults to command_timeout_ms.
+            :return: True if the response from DE2120 contains the 
+            ACK character, false otherwise. None if there was no
+            response before the timeout.
+            :rtype: bool
+        """
+        try:
+            return self._send_command(cmd, arg, timeout_ms)
+        except (serial.SerialException, OSError) as exc:
+            # With auto reconnect on, retry once on the new connection
+            self._recover(exc)
+        return self._send_command(cmd, arg, timeout_ms)
+
+    # --------------------------------------------------------
+    # _send_command(cmd, arg, timeout_ms)
+    #
+    # send_command() without reconnect handling.
+    def _send_command(self, cmd, arg, timeout_ms):
+        self._write_command(self._command_frame(cmd, arg))
+        sent_at = time.monotonic()
+        result = self._command_result(self._read_response(timeout_ms))
+
+        self._command_done(cmd, result, sent_at)
+        if result:
+            self._remember(cmd, arg)
+        return result
+
+    # --------------------------------------------------------
+    # send_commands(commands)
+    #
+    # Send several commands back to back and collect the responses.
+    def send_commands(self, commands, timeout_ms = None):
+        """
+            Send a batch of commands with as few waits as possible.
+            Commands are written back to back in a single write and
+            the ACK/NACK responses are matched to them in order. The
+            batch is only split where the module needs time to
+            settle, such as after a reading mode change.
+
+            :param commands: a CommandBatch, or an iterable of command
+                names or (command, argument) tuples
+            :param timeout_ms: how long to wait for each response, in
+                milliseconds. Defaults to command_timeout_ms. Once a
+                response times out the rest of the batch is not sent.
+            :return: one result per command, in order: True if the
+                module ACKed it, false otherwise, None if it timed out
+                or was not sent
+            :rtype: list
+        """
+        if not isinstance(commands, CommandBatch):
+            commands = CommandBatch(commands)
+
+        try:
+            return self._send_commands(commands, timeout_ms)
+        except (serial.SerialException, OSError) as exc:
+            # With auto reconnect on, resend the batch once on the new
+            # connection
+            self._recover(exc)
+        return self._send_commands(commands, timeout_ms)
+
+    # --------------------------------------------------------
+    # _send_commands(commands, timeout_ms)
+    #
+    # send_commands() without reconnect handling.
+    def _send_commands(self, commands, timeout_ms):
+        results = []
+        for data, segment, settle in self._batch_segments(commands):
+            if None in results:
+                results.extend([None] * len(segment))
+                continue
+
+            self._write_command(data)
+            sent_at = time.monotonic()
+            for cmd, arg in segment:
+                result = None
+                if None not in results:
+                    result = self._command_result(self._read_response(timeout_ms))
+                self._command_done(cmd, result, sent_at)
+                if result:
+                    self._remember(cmd, arg)
+                results.append(result)
+            if settle:
+                time.sleep(settle)
+        return results
+
+    # --------------------------------------------------------
+    # _batch_segments(commands)
+    #
+    # Split a batch where the module needs to settle.
+    def _batch_segments(self, commands):
+        """
+            Group a batch into runs that can be written back to back.
+
+            :param commands: a CommandBatch or an iterable accepted by
+                CommandBatch()
+            :return: yields (frames, commands, settle seconds) tuples,
+                where commands are the (command, argument) tuples in
+                the frames. The settle time is 0 for the last run.
+        """
+        if not isinstance(commands, CommandBatch):
+            commands = CommandBatch(commands)
+        commands = list(commands)
+
+        segment = []
+        for i, (cmd, arg) in enumerate(commands):
+            segment.append((cmd, arg))
+            settle = self._SETTLE_TIMES.get(cmd, 0)
+            last = i == len(commands) - 1
+            if last or settle:
+                data = b"".join([self._command_frame(c, a) for c, a in segment])
+                yield data, segment, 0 if last else settle
+                segment = []
+
+    # --------------------------------------------------------
+    # apply_profile(profile, force)
+    #
+    # Bring the module's settings in line with a profile, sending
+    # only the settings that changed.
+    def apply_profile(self, profile, force = False):
+        """
+            Apply a ScannerProfile. Settings whose value matches the
+            last value the module ACKed are skipped, so re-applying
+            the same profile costs no round trips. The remaining
+            commands go out as one send_commands() batch, with baud
+            rate and communication mode changes sent last.
+
+            :param profile: a ScannerProfile or a dict of property
+                code to argument
+            :param force: send every setting even if the state cache
+                says it is already applied
+            :return: the result of each command sent, keyed by
+                property code. Empty if nothing needed sending.
+            :rtype: dict
+        """
+        commands = self._profile_changes(profile, force)
+        if not commands:
+            return {}
+
+        results = self.send_commands(commands)
+        return dict(zip([cmd for cmd, arg in commands], results))
+
+    # --------------------------------------------------------
+    # device_state()
+    #
+    # The settings this object has seen the module ACK.
+    def device_state(self):
+        """
+            :return: the last ACKed argument of every property set
+                through this object
+            :rtype: ScannerProfile
+        """
+        return ScannerProfile(self._state)
+
+    # --------------------------------------------------------
+    # seed_state_cache(profile)
+    #
+    # Tell the cache which settings are already on the module.
+    def seed_state_cache(self, profile):
+        """
+            Record settings as already applied without sending them,
+            for example a device_state() saved before a restart. The
+            module keeps its settings across power cycles, so the next
+            apply_profile() only sends what differs.
+
+            :param profile: a ScannerProfile or dict of property code
+                to argument
+        """
+        for cmd, arg in ScannerProfile(profile).items():
+            self._remember(cmd, arg)
+
+    # --------------------------------------------------------
+    # clear_state_cache()
+    #
+    # Forget every cached setting.
+    def clear_state_cache(self):
+        """
+            Forget the cached settings, so the next apply_profile()
+            sends every setting in the profile.
+        """
+        self._state.clear()
+
+    # --------------------------------------------------------
+    # _profile_changes(profile, force)
+    #
+    # The commands needed to apply a profile.
+    def _profile_changes(self, profile, force = False):
+        profile = ScannerProfile(profile)
+        changes = [(cmd, arg) for cmd, arg in profile.items()
+                   if force or self._state.get(cmd) != arg]
+
+        # Anything that drops the link has to go out after the rest
+        changes.sort(key=lambda change: change[0] in self._LINK_PROPERTIES)
+        return changes
+
+    # --------------------------------------------------------
+    # _remember(cmd, arg)
+    #
+    # Update the state cache after the module ACKs a command.
+    def _remember(self, cmd, arg):
+        if cmd == self.COMMAND_SET_DEFAULTS:
+            self._state.clear()
+        elif cmd in (self.COMMAND_START_SCAN, self.COMMAND_STOP_SCAN, self.COMMAND_GET_VERSION):
+            return
+        else:
+            self._state.pop(self._EXCLUSIVE_PROPERTIES.get(cmd), None)
+            self._state[cmd] = arg
+
+        if cmd in (self.COMMAND_SET_DEFAULTS, self.PROPERTY_SERIAL_DATA_FORMAT):
+            self._configure_decoding()
+
+    # --------------------------------------------------------
+    # _command_frame(cmd, arg)
+    #
+    # Encode a command for the module.
+    def _command_frame(self, cmd, arg = ""):
+        # Need to prepend "^_^" and append "."
+        return ("^_^" + cmd + arg + ".").encode()
+
+    # --------------------------------------------------------
+    # _write_command(data)
+    #
+    # Write a command frame, dropping any response left over from
+    # an earlier command first.
+    def _write_command(self, data):
+        while not self._responses.empty():
+            try:
+                self._responses.get_nowait()
+            except queue.Empty:
+                break
+
+        self._expected_responses = data.count(b"^_^")
+        self.hard_port.write(data)
+        if self._trace is not None:
+            self._trace.record(WireTrace.TX, data)
+
+    # --------------------------------------------------------
+    # _read_response(timeout_ms)
+    #
+    # Wait for the ACK/NACK byte that follows a command. While a
+    # background reader owns the port it hands us the byte instead.
+    def _read_response(self, timeout_ms = None):
+        """
+            Wait for the module's response to a command.
+
+            :param timeout_ms: how long to wait, in milliseconds.
+                Defaults to command_timeout_ms.
+            :return: the response byte, or None if nothing arrived
+                before the timeout
+            :rtype: int
+        """
+        timeout = self._command_timeout(timeout_ms)
+
+        # While reconnecting, the reader is waiting on us, so read directly
+        if self._rx_owner is not None and not self._reconnecting:
+            try:
+                return self._responses.get(timeout=timeout)
+            except queue.Empty:
+                self._expected_responses = 0
+                return None
+
+        # Barcode bytes that arrive first are kept for read_barcode()
+        deadline = time.monotonic() + timeout
+        while self._responses.empty():
+            remaining = deadline - time.monotonic()
+            settle = self._settle_wait()
+            if settle is not None and settle < remaining:
+                # Take the deferred ACK/NACK bytes if nothing follows
+                data = self._drain() if self._wait_readable(settle) else b""
+                self._rx_barcodes.extend(self._feed(data))
+                continue
+            if not self._wait_readable(remaining):
+                self._expected_responses = 0
+                return None
+            self._rx_barcodes.extend(self._feed(self._drain()))
+
+        return self._responses.get_nowait()
+
+    # --------------------------------------------------------
+    # _command_timeout(timeout_ms)
+    #
+    # Command timeout in seconds.
+    def _command_timeout(self, timeout_ms = None):
+        if timeout_ms is None:
+            timeout_ms = self.command_timeout_ms
+        return timeout_ms / 1000.0
+
+    # --------------------------------------------------------
+    # _command_result(incoming)
+    #
+    # Map a response byte to the value send_command() returns.
+    def _command_result(self, incoming):
+        if incoming is None:
+            return None
+        return incoming == self.DE2120_COMMAND_ACK
+
+    # --------------------------------------------------------
+    # _command_done(cmd, result, sent_at)
+    #
+    # Record a command's result in the metrics and wire trace.
+    def _command_done(self, cmd, result, sent_at):
+        if self._metrics is not None:
+            self._metrics.record_command(cmd, result, time.monotonic() - sent_at)
+        if not result and self._trace_dump is not None:
+            self._dump_trace("%r %s" % (cmd, "timed out" if result is None else "NACKed"))
+
+    # --------------------------------------------------------
+    # _wait_readable(timeout)
+    #
+    # Block until the port has data to read.
+    def _wait_readable(self, timeout):
+        """
+            Wait until the port has data or the timeout passes. Uses
+            select() on the port's file descriptor where there is one
+            and polls in_waiting otherwise.
+
+            :param timeout: seconds to wait, or None to wait forever
+            :return: true if data is waiting
+            :rtype: bool
+        """
+        port = self.hard_port
+        if port.in_waiting:
+            return True
+
+        try:
+            fd = port.fileno()
+        except (AttributeError, OSError, ValueError):
+            fd = None
+
+        if fd is not None:
+            if timeout is not None:
+                timeout = max(timeout, 0)
+            return bool(select.select([fd], [], [], timeout)[0])
+
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+        while not port.in_waiting:
+            if timeout is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                time.sleep(min(remaining, 0.001))
+            else:
+                time.sleep(0.001)
+        return True
+
+    # --------------------------------------------------------
+    # _drain()
+    #
+    # Read everything waiting on the port in one call.
+    def _drain(self):
+        port = self.hard_port
+        return port.read(port.in_waiting or 1)
+    
+    # --------------------------------------------------------
+    # read_barcode()
+    #
+    # Check the receive buffer for serial data from the barcode 
+    # scanner.
+    def read_barcode(self):
+        """
+            Read from the serial buffer until we hit a new line character
+
+            Everything waiting on the port is read in one call and
+            split by frame_parser. Extra barcodes from the same read are
+            returned by the next calls. If a barcode is incomplete, this
+            waits up to the port's read timeout for the rest, then
+            returns what it has.
+
+            :return: the string in the serial buffer, or false if there
+                is no barcode waiting
+            :rtype: str
+        """
+        try:
+            return self._read_barcode()
+        except (serial.SerialException, OSError) as exc:
+            self._recover(exc)
+            return False
+
+    # --------------------------------------------------------
+    # iter_barcodes(timeout, idle_timeout, max_count)
+    #
+    # Yield barcodes as they arrive.
+    def iter_barcodes(self, timeout = None, idle_timeout = None, max_count = None):
+        """
+            Generator over barcodes as they arrive. Between barcodes it
+            sleeps in select() on the port, so waiting costs no CPU.
+            Each barcode is what read_barcode() would return::
+
+                for barcode in my_scanner.iter_barcodes(idle_timeout=30):
+                    print(barcode)
+
+            With no limits it runs until the caller stops iterating.
+            Do not use it while start_listening() or a ScannerHub is
+            reading the port; the first next() raises RuntimeError.
+
+            :param timeout: stop after this many seconds in total
+            :param idle_timeout: stop once no barcode has arrived for
+                this many seconds. Time spent by the caller between
+                barcodes does not count.
+            :param max_count: stop after this many barcodes
+        """
+        if self._rx_owner is not None:
+            raise RuntimeError("the port is being read by another reader")
+
+        now = time.monotonic()
+        deadline = None if timeout is None else now + timeout
+        last_barcode = now
+        count = 0
+        while max_count is None or count < max_count:
+            barcode = self.read_barcode()
+            if barcode is not False:
+                yield barcode
+                count += 1
+                last_barcode = time.monotonic()
+                continue
+
+            now = time.monotonic()
+            wait = None
+            if deadline is not None:
+                wait = deadline - now
+            if idle_timeout is not None:
+                idle_wait = last_barcode + idle_timeout - now
+                wait = idle_wait if wait is None else min(wait, idle_wait)
+            if wait is not None and wait <= 0:
+                return
+
+            try:
+                self._wait_readable(wait)
+            except (serial.SerialException, OSError) as exc:
+                self._recover(exc)
+
+    # --------------------------------------------------------
+    # _read_barcode()
+    #
+    # read_barcode() without reconnect handling.
+    def _read_barcode(self):
+        if self._rx_barcodes:
+            return self._rx_barcodes.popleft()
+
+        # Check if there's data available
+        if self.hard_port.in_waiting == False:
+            return False
+
+        timeout = self.hard_port.timeout
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+
+        while True:
+            barcodes = self._feed(self._drain())
+            if barcodes:
+                self._rx_barcodes.extend(barcodes[1:])
+                return barcodes[0]
+
+            remaining = None
+            if timeout is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+            if not self._wait_readable(remaining):
+                break
+
+        # Timed out part way through a barcode, like read_until() would
+        incoming = self.frame_parser.flush()
+        if not incoming:
+            return False
+        return self._decode_frame(incoming, time.monotonic())
+
+    # --------------------------------------------------------
+    # set_data_format(data_format)
+    #
+    # Tell the library how the module encodes barcodes.
+    def set_data_format(self, data_format = None):
+        """
+            Set how received barcodes are decoded. This does not send
+            anything to the module; use change_serial_data_format()
+            for that.
+
+            :param data_format: one of DATA_FORMAT_GBK,
+                DATA_FORMAT_UTF8, DATA_FORMAT_UTF16_BE,
+                DATA_FORMAT_UTF16_LE, or DATA_FORMAT_BYTES to skip
+                decoding and deliver bytes. None (default) follows the
+                last PROPERTY_SERIAL_DATA_FORMAT setting sent through
+                this object, or GBK, the module's default.
+        """
+        if data_format is not None and data_format not in self._DATA_FORMAT_CODECS:
+            raise ValueError("unknown data format: %r" % (data_format,))
+
+        self._data_format = data_format
+        self._configure_decoding()
+
+    # --------------------------------------------------------
+    # enable_auto_reconnect(max_backoff, max_attempts)
+    #
+    # Reopen the port when the module goes away.
+    def enable_auto_reconnect(self, max_backoff = 5.0, max_attempts = None):
+        """
+            Supervise the connection. When reading or sending fails
+            because the port went away, for example when a USB scanner
+            re-enumerates, the port is reopened with exponential
+            backoff. Then the settings in the state cache are sent
+            again and the call carries on: read_barcode() returns
+            false, send_command() is retried once, and the background
+            listener keeps delivering.
+
+            The port is reopened through its /dev/serial/by-id link
+            where there is one, so the scanner is found again even if
+            it comes back under a different /dev/ttyACM number.
+
+            :param max_backoff: the longest wait between attempts, in
+                seconds
+            :param max_attempts: give up and raise the original error
+                after this many attempts. None (default) keeps trying.
+        """
+        self._auto_reconnect = True
+        self._max_backoff = max_backoff
+        self._max_reconnect_attempts = max_attempts
+        self._reconnect_path = self._stable_port_path(getattr(self.hard_port, "port", None))
+
+    # --------------------------------------------------------
+    # disable_auto_reconnect()
+    #
+    # Let port errors reach the caller again.
+    def disable_auto_reconnect(self):
+        """
+            Stop supervising the connection; port errors are raised
+            to the caller.
+        """
+        self._auto_reconnect = False
+
+    # --------------------------------------------------------
+    # reconnect(max_attempts)
+    #
+    # Reopen the port and restore the module's settings.
+    def reconnect(self, max_attempts = None, stop_event = None):
+        """
+            Close and reopen the port, retrying with exponential
+            backoff, then send the cached settings again.
+
+            :param max_attempts: give up after this many attempts, or
+                None to keep trying
+            :param stop_event: a threading.Event that, once set, ends
+                the retries
+            :return: true once reconnected, false if every attempt
+                failed or stop_event was set
+            :rtype: bool
+        """
+        backoff = self._INITIAL_BACKOFF
+        attempts = 0
+        while True:
+            attempts += 1
+            if self._reopen():
+                return True
+            if max_attempts is not None and attempts >= max_attempts:
+                return False
+
+            if stop_event is None:
+                time.sleep(backoff)
+            elif stop_event.wait(backoff):
+                return False
+            backoff = min(backoff * 2, self._max_backoff)
+
+    # --------------------------------------------------------
+    # _reopen()
+    #
+    # One reconnect attempt.
+    def _reopen(self):
+        """
+            Reopen the port once, check the module answers and send
+            the cached settings, except baud rate and communication
+            mode, which the reopened port already matches.
+
+            :return: true if the module is back
+            :rtype: bool
+        """
+        port = self.hard_port
+        self._reconnecting = True
+        try:
+            port.close()
+            if self._reconnect_path is not None:
+                port.port = self._reconnect_path
+            port.open()
+            self._reset_input()
+
+            if not self.is_connected():
+                port.close()
+                return False
+
+            profile = ScannerProfile([(cmd, arg) for cmd, arg in self._state.items()
+                                      if cmd not in self._LINK_PROPERTIES])
+            if profile:
+                self.apply_profile(profile, force=True)
+            return True
+        except (serial.SerialException, OSError):
+            port.close()
+            return False
+        finally:
+            self._reconnecting = False
+
+    # --------------------------------------------------------
+    # _recover(exc)
+    #
+    # Handle a port error: reconnect if supervised, else raise. A set
+    # stop_event ends the retries without raising.
+    def _recover(self, exc, stop_event = None):
+        if self._trace_dump is not None:
+            self._dump_trace("port error: %s" % (exc,))
+        if not self._auto_reconnect or self._reconnecting:
+            raise exc
+        if self.reconnect(self._max_reconnect_attempts, stop_event):
+            return
+        if stop_event is None or not stop_event.is_set():
+            raise exc
+
+    # --------------------------------------------------------
+    # _stable_port_path(name)
+    #
+    # The /dev/serial/by-id link for a port, if it has one.
+    def _stable_port_path(self, name):
+        by_id = "/dev/serial/by-id"
+        if name is None or not os.path.isdir(by_id):
+            return name
+
+        device = os.path.realpath(name)
+        for entry in sorted(os.listdir(by_id)):
+            path = os.path.join(by_id, entry)
+            if os.path.realpath(path) == device:
+                return path
+        return name
+
+    # --------------------------------------------------------
+    # enable_scan_results(code_id)
+    #
+    # Return ScanResult objects instead of strings.
+    def enable_scan_results(self, code_id = None, gs1 = False):
+        """
+            Make read_barcode(), the background listener and
+            ScannerHub deliver ScanResult objects instead of strings.
+            The Code ID prefix is split off and resolved to a
+            symbology name.
+
+            :param code_id: true if the module sends Code IDs, false
+                if not. None (default) follows the last
+                PROPERTY_TRANSFER_CODE_ID setting sent through this
+                object.
+            :param gs1: true to parse the element strings of scans
+                marked as GS1 into ScanResult.gs1, see
+                de2120_gs1.parse_scan(). A de2120_gs1.GS1Parser uses
+                that parser's AI table instead.
+        """
+        if gs1 is True:
+            import de2120_gs1
+            gs1 = de2120_gs1.parse_scan
+        elif gs1:
+            gs1 = gs1.parse_scan
+        else:
+            gs1 = None
+
+        self._scan_results = True
+        self._code_id = code_id
+        self._gs1 = gs1
+
+    # --------------------------------------------------------
+    # disable_scan_results()
+    #
+    # Return plain strings again.
+    def disable_scan_results(self):
+        """
+            Deliver barcodes as plain strings, as read from the port.
+        """
+        self._scan_results = False
+
+    # --------------------------------------------------------
+    # enable_duplicate_filter(window_ms, max_entries)
+    #
+    # Drop repeats of the same barcode within a time window.
+    def enable_duplicate_filter(self, window_ms = 1000, max_entries = 1024):
+        """
+            Suppress repeats of a barcode seen within window_ms, so
+            continuous read mode can run at full speed without
+            flooding consumers. Applies to read_barcode(), the
+            background listener and ScannerHub.
+
+            :param window_ms: how long a code is remembered, in
+                milliseconds
+            :param max_entries: the most codes remembered at once
+            :return: the DuplicateFilter, whose stats() counts the
+                suppressed duplicates
+            :rtype: DuplicateFilter
+        """
+        self.duplicate_filter = DuplicateFilter(window_ms, max_entries)
+        return self.duplicate_filter
+
+    # --------------------------------------------------------
+    # disable_duplicate_filter()
+    #
+    # Deliver every barcode again.
+    def disable_duplicate_filter(self):
+        """
+            Stop suppressing duplicate barcodes.
+        """
+        self.duplicate_filter = None
+
+    # --------------------------------------------------------
+    # add_scan_filter(scan_filter)
+    #
+    # Drop barcodes a function rejects.
+    def add_scan_filter(self, scan_filter):
+        """
+            Pass every decoded barcode to scan_filter before it is
+            delivered, and drop it if scan_filter returns false. Like
+            the duplicate filter, this applies to read_barcode(), the
+            background listener and ScannerHub. Filters run in the
+            order they were added, on the thread reading the port, so
+            keep them fast. de2120_validation.CheckDigitFilter drops
+            barcodes with a wrong check digit.
+
+            :param scan_filter: called with each barcode, as a str or
+                ScanResult; returns true to keep it
+            :return: scan_filter, for remove_scan_filter()
+        """
+        self._scan_filters = self._scan_filters + [scan_filter]
+        return scan_filter
+
+    # --------------------------------------------------------
+    # remove_scan_filter(scan_filter)
+    #
+    # Stop applying a filter added with add_scan_filter().
+    def remove_scan_filter(self, scan_filter):
+        """
+            :param scan_filter: a filter passed to add_scan_filter()
+            :raises ValueError: if it was not added
+        """
+        scan_filters = list(self._scan_filters)
+        scan_filters.remove(scan_filter)
+        self._scan_filters = scan_filters
+
+    # --------------------------------------------------------
+    # enable_metrics(buckets, labels)
+    #
+    # Start counting commands, responses and scans.
+    def enable_metrics(self, buckets = ScannerMetrics.DEFAULT_BUCKETS, labels = None):
+        """
+            Record command results, ACK round trip times, barcodes,
+            bytes read and decode errors. See metrics(),
+            metrics_text(), write_metrics() and serve_metrics().
+
+            :param buckets: upper bounds of the round trip time
+                histogram buckets, in seconds
+            :param labels: labels added to every exported sample.
+                Defaults to the port name, as "port".
+            :return: the ScannerMetrics
+            :rtype: ScannerMetrics
+        """
+        if labels is None:
+            labels = {"port": getattr(self.hard_port, "port", None) or ""}
+        self._metrics = ScannerMetrics(buckets, labels)
+        return self._metrics
+
+    # --------------------------------------------------------
+    # disable_metrics()
+    #
+    # Stop counting.
+    def disable_metrics(self):
+        """
+            Stop recording metrics. The hot path goes back to a single
+            None check.
+        """
+        self._metrics = None
+
+    # --------------------------------------------------------
+    # metrics()
+    #
+    # A snapshot of the metrics.
+    def metrics(self):
+        """
+            :return: the metrics as a dict (see
+                ScannerMetrics.snapshot()), or None if metrics are not
+                enabled
+            :rtype: dict
+        """
+        if self._metrics is None:
+            return None
+        self._metrics.queue_depth = self._queue_depth()
+        return self._metrics.snapshot()
+
+    # --------------------------------------------------------
+    # metrics_text()
+    #
+    # The metrics in the Prometheus text format.
+    def metrics_text(self):
+        """
+            :return: the metrics in Prometheus text exposition format,
+                or "" if metrics are not enabled
+            :rtype: str
+        """
+        if self._metrics is None:
+            return ""
+        self._metrics.queue_depth = self._queue_depth()
+        return self._metrics.text()
+
+    # --------------------------------------------------------
+    # write_metrics(path)
+    #
+    # Write the metrics to a file for a textfile collector.
+    def write_metrics(self, path):
+        """
+            Write metrics_text() to a file, such as one read by the
+            node_exporter textfile collector. The file is replaced in
+            one step, so readers never see it half written.
+
+            :param path: the file to write
+        """
+        temp_path = "%s.%d.tmp" % (path, os.getpid())
+        with open(temp_path, "w") as f:
+            f.write(self.metrics_text())
+        os.replace(temp_path, path)
+
+    # --------------------------------------------------------
+    # serve_metrics(port, address)
+    #
+    # Serve the metrics over HTTP for Prometheus to scrape.
+    def serve_metrics(self, port, address = "127.0.0.1"):
+        """
+            Serve metrics_text() at /metrics from a background
+            thread. Only this machine can connect unless another
+            address is given.
+
+            :param port: the TCP port to listen on, or 0 for any free
+                port; see the server's server_address
+            :param address: the address to bind. Pass "" to listen on
+                every interface, so a remote Prometheus can scrape it
+            :return: the server; call its shutdown() to stop it
+            :rtype: http.server.ThreadingHTTPServer
+        """
+        server = http.server.ThreadingHTTPServer((address, port), _MetricsHandler)
+        server.daemon_threads = True
+        server.scanner = self
+        thread = threading.Thread(target=server.serve_forever, name="DE2120 metrics")
+        thread.daemon = True
+        thread.start()
+        return server
+
+    # --------------------------------------------------------
+    # enable_wire_trace(events, data_bytes, dump_on_error)
+    #
+    # Record the serial traffic in a ring buffer.
+    def enable_wire_trace(self, events = 1024, data_bytes = 65536, dump_on_error = None):
+        """
+            Record every chunk written to and read from the port in a
+            WireTrace ring buffer. Cheap enough to leave on: each
+            chunk is copied into preallocated storage.
+
+            :param events: how many writes and reads to keep
+            :param data_bytes: how many bytes of traffic to keep
+            :param dump_on_error: a file object, such as sys.stderr,
+                that the trace is written to when a command is NACKed
+                or times out, or the port fails
+            :return: the WireTrace
+            :rtype: WireTrace
+        """
+        self._trace = WireTrace(events, data_bytes)
+        self._trace_dump = dump_on_error
+        return self._trace
+
+    # --------------------------------------------------------
+    # disable_wire_trace()
+    #
+    # Stop recording the serial traffic.
+    def disable_wire_trace(self):
+        """
+            Stop recording serial traffic and drop the trace.
+        """
+        self._trace = None
+        self._trace_dump = None
+
+    # --------------------------------------------------------
+    # dump_wire_trace()
+    #
+    # The recorded serial traffic as text.
+    def dump_wire_trace(self):
+        """
+            :return: the trace as hex dump text (see WireTrace.dump()),
+                or "" if tracing is not enabled
+            :rtype: str
+        """
+        if self._trace is None:
+            return ""
+        return self._trace.dump()
+
+    # --------------------------------------------------------
+    # _dump_trace(reason)
+    #
+    # Write the trace to the dump_on_error file.
+    def _dump_trace(self, reason):
+        stream = self._trace_dump
+        if stream is None or self._trace is None:
+            return
+        stream.write("# %s: %s\n" % (getattr(self.hard_port, "port", None) or self.device_name, reason))
+        stream.write(self._trace.dump())
+        if hasattr(stream, "flush"):
+            stream.flush()
+
+    # --------------------------------------------------------
+    # _queue_depth()
+    #
+    # Barcodes received but not yet taken by the application.
+    def _queue_depth(self):
+        depth = len(self._rx_barcodes)
+        if self._listen_queue is not None:
+            depth += self._listen_queue.qsize()
+        return depth
+
+    # --------------------------------------------------------
+    # start_listening(callback, queue)
+    #
+    # Start a background thread that reads barcodes as they arrive.
+    def start_listening(self, callback = None, queue = None, error_callback = None):
+        """
+            Start a background reader thread that blocks on the serial
+            port and delivers each barcode as soon as its terminator
+            arrives. Barcodes are the same strings read_barcode()
+            returns. While listening, do not call read_barcode();
+            send_command() and the setters keep working.
+
+            An exception from callback or queue.put() does not stop
+            the reader. If a port error stops it, is_listening()
+            turns false and listener_error() returns the error.
+
+            :param callback: function called with each barcode from
+                the reader thread
+            :param queue: object with a put() method, such as a
+                queue.Queue or a ScanQueue, that each barcode is put
+                into
+            :param error_callback: function called from the reader
+                thread with (barcode, exception) when callback or
+                queue.put() raises, and with (None, exception) when
+                an error stops the reader. Without one, the exception
+                is printed through sys.excepthook.
+            :return: true if the reader was started, false if it was
+                already running
+            :rtype: bool
+        """
+        if self._rx_owner is not None:
+            return False
+
+        self._listen_callback = callback
+        self._listen_queue = queue
+        self._listen_error_callback = error_callback
+        self._listen_exception = None
+        self._listen_stop = threading.Event()
+
+        self._rx_owner = threading.Thread(target=self._listen_loop,
+                                          args=(self._listen_stop,),
+                                          name="DE2120 reader")
+        self._rx_owner.daemon = True
+        self._rx_owner.start()
+        return True
+
+    # --------------------------------------------------------
+    # stop_listening()
+    #
+    # Stop the background reader thread.
+    def stop_listening(self):
+        """
+            Stop the background reader thread started by
+            start_listening() and wait for it to exit.
+
+            :return: true if a reader was stopped, false otherwise
+            :rtype: bool
+        """
+        reader = self._rx_owner
+        if not isinstance(reader, threading.Thread):
+            return False
+
+        self._listen_stop.set()
+
+        # Wake the reader if it is blocked in read()
+        cancel_read = getattr(self.hard_port, "cancel_read", None)
+        if cancel_read is not None:
+            cancel_read()
+
+        reader.join()
+        self._rx_owner = None
+        return True
+
+    # --------------------------------------------------------
+    # is_listening()
+    #
+    # Check whether the background reader thread is running.
+    def is_listening(self):
+        """
+            :return: true if the background reader thread is running
+            :rtype: bool
+        """
+        return isinstance(self._rx_owner, threading.Thread)
+
+    # --------------------------------------------------------
+    # listener_error()
+    #
+    # Why the background reader thread stopped.
+    def listener_error(self):
+        """
+            :return: the exception that stopped the last background
+                reader, or None if it is running or was stopped with
+                stop_listening()
+            :rtype: Exception
+        """
+        return self._listen_exception
+
+    # --------------------------------------------------------
+    # _listen_loop(stop_event)
+    #
+    # Body of the background reader thread.
+    def _listen_loop(self, stop_event):
+        try:
+            # Barcodes read while waiting for an ACK before we started
+            while self._rx_barcodes:
+                self._deliver(self._rx_barcodes.popleft())
+
+            port = self.hard_port
+            while not stop_event.is_set():
+                try:
+                    # Blocks for the first byte, then takes everything
+                    # queued. Deferred ACK/NACK bytes are decided by
+                    # feeding nothing once their time is up.
+                    settle = self._settle_wait()
+                    data = b""
+                    if settle is None or self._wait_readable(settle):
+                        data = port.read(port.in_waiting or 1)
+                except (serial.SerialException, OSError) as exc:
+                    if stop_event.is_set():
+                        break
+                    self._recover(exc, stop_event)
+
+                    # Barcodes read while the settings were restored
+                    while self._rx_barcodes:
+                        self._deliver(self._rx_barcodes.popleft())
+                    continue
+
+                if not data and self._responses_deferred_at is None:
+                    continue
+
+                for barcode in self._feed(data):
+                    self._deliver(barcode)
+        except Exception as exc:
+            self._listen_exception = exc
+            self._listen_failed(None, exc)
+        finally:
+            # Commands read responses themselves again, and
+            # is_listening() shows the reader is gone
+            if self._rx_owner is threading.current_thread():
+                self._rx_owner = None
+
+    # --------------------------------------------------------
+    # _deliver(barcode)
+    #
+    # Hand a barcode to the listener's callback and queue.
+    def _deliver(self, barcode):
+        # A failing consumer must not stop the reader
+        if self._listen_callback is not None:
+            try:
+                self._listen_callback(barcode)
+            except Exception as exc:
+                self._listen_failed(barcode, exc)
+        if self._listen_queue is not None:
+            try:
+                self._listen_queue.put(barcode)
+            except Exception as exc:
+                self._listen_failed(barcode, exc)
+
+    # --------------------------------------------------------
+    # _listen_failed(barcode, exc)
+    #
+    # Report an error in the background reader thread.
+    def _listen_failed(self, barcode, exc):
+        if self._listen_error_callback is None:
+            sys.excepthook(type(exc), exc, exc.__traceback__)
+            return
+        try:
+            self._listen_error_callback(barcode, exc)
+        except Exception:
+            sys.excepthook(*sys.exc_info())
+
+    # --------------------------------------------------------
+    # _feed(data)
+    #
+    # Split received bytes into barcodes, routing ACK/NACK bytes
+    # that arrive between barcodes to _read_response().
+    def _feed(self, data):
+        """
+            Add received bytes to the receive buffer and pull out
+            every complete barcode.
+
+            :param data: bytes read from the serial port
+            :return: the complete barcodes, decoded
+            :rtype: list
+        """
+        if self._trace is not None and data:
+            self._trace.record(WireTrace.RX, data)
+
+        duplicate_filter = self.duplicate_filter
+        parser = self.frame_parser
+        received_at = time.monotonic()
+        barcodes = []
+        frames = parser.feed(data)
+        while True:
+            for frame in frames:
+                # UTF-16 responses are taken between frames, below
+                if frame[:1] in self._RESPONSE_BYTES and parser.unit == 1:
+                    payload = frame.lstrip(self._RESPONSE_BYTES)
+                    self._route_responses(frame[:len(frame) - len(payload)])
+                    frame = payload
+                if duplicate_filter is not None and not duplicate_filter.accept(frame):
+                    continue
+                barcodes.append(self._decode_frame(frame, received_at))
+
+            # A response can't wait for the next barcode's terminator
+            if parser.unit == 1:
+                self._route_responses(parser.take_prefix(self._RESPONSE_BYTES))
+                break
+
+            taken = self._take_utf16_responses()
+            if not taken:
+                break
+            self._route_responses(taken)
+            frames = parser.feed(b"")
+
+        # The list is replaced, not changed, when filters are added
+        for scan_filter in self._scan_filters:
+            barcodes = [barcode for barcode in barcodes if scan_filter(barcode)]
+
+        metrics = self._metrics
+        if metrics is not None:
+            metrics.bytes_read += len(data)
+            metrics.scans += len(barcodes)
+        return barcodes
+
+    # --------------------------------------------------------
+    # _take_utf16_responses()
+    #
+    # Take ACK/NACK bytes from the front of a pending UTF-16 frame.
+    def _take_utf16_responses(self):
+        """
+            A UTF-16 label can start with an ACK or NACK byte value,
+            such as Cyrillic U+0415 in little endian order. Leading
+            bytes are only taken as responses while a command is
+            waiting for them, and never more than are due. When more
+            bytes follow, they are only taken once the next terminator
+            shows that they sit outside the frame's code units: a
+            response shifts the frame by one byte. When nothing else
+            is pending, the next byte of a label that starts with one
+            would follow within a couple of character times. The bytes
+            are left in the parser until then; whoever reads the port
+            calls _feed() again once _settle_wait() says they are due.
+
+            This never waits on the port, since it runs on the event
+            loop for AsyncDE2120BarcodeScanner and ScannerHub.
+
+            :return: the response bytes taken
+            :rtype: bytes
+        """
+        deferred_at, self._responses_deferred_at = self._responses_deferred_at, None
+        if self._expected_responses <= 0:
+            return b""
+
+        parser = self.frame_parser
+        pending = parser.peek()
+        count = len(pending) - len(pending.lstrip(self._RESPONSE_BYTES))
+        count = min(count, self._expected_responses)
+        if count and count < len(pending):
+            terminator = parser.terminator
+            index = pending.find(terminator, 1)
+            while index >= 0 and index % 2 == 0:
+                index = pending.find(terminator, index + 1)
+            if index < 0:
+                # Too early to tell a response from the start of a label
+                return b""
+            count -= 1 - count % 2
+        elif count:
+            now = time.monotonic()
+            if deferred_at is None:
+                deferred_at = now
+            if now - deferred_at < self._char_time(2):
+                # Decide on the next feed, once more bytes or time passed
+                self._responses_deferred_at = deferred_at
+                return b""
+        if not count:
+            return b""
+        return parser.take_prefix(self._RESPONSE_BYTES, count)
+
+    # --------------------------------------------------------
+    # _settle_wait()
+    #
+    # How long until deferred ACK/NACK bytes can be decided.
+    def _settle_wait(self):
+        """
+            :return: seconds until _feed() can take the ACK/NACK bytes
+                left in the parser by _take_utf16_responses(), 0 if it
+                can now, or None if there are none
+            :rtype: float
+        """
+        deferred_at = self._responses_deferred_at
+        if deferred_at is None:
+            return None
+        return max(deferred_at + self._char_time(2) - time.monotonic(), 0)
+
+    # --------------------------------------------------------
+    # _char_time(chars)
+    #
+    # How long some characters take on the wire.
+    def _char_time(self, chars):
+        baud = getattr(self.hard_port, "baudrate", None) or 115200
+        return max(chars * 10.0 / baud, 0.002)
+
+    # --------------------------------------------------------
+    # _decode_frame(frame, received_at)
+    #
+    # Turn a received frame into what read_barcode() returns.
+    def _decode_frame(self, frame, received_at):
+        if self._decoder is None:
+            text = frame
+        else:
+            text = self._decoder.decode(frame, True)
+            if self._metrics is not None and "\ufffd" in text:
+                self._metrics.decode_errors += 1
+        if not self._scan_results:
+            return text
+
+        code_id = self._code_id
+        if code_id is None:
+            code_id = self._state.get(self.PROPERTY_TRANSFER_CODE_ID) == "1"
+        result = ScanResult.from_frame(frame, text, code_id, received_at)
+        if self._gs1 is not None:
+            result.gs1 = self._gs1(result)
+        return result
+
+    # --------------------------------------------------------
+    # _configure_decoding()
+    #
+    # Match the decoder and framing to the serial data format.
+    def _configure_decoding(self):
+        data_format = self._data_format
+        if data_format is None:
+            data_format = self._state.get(self.PROPERTY_SERIAL_DATA_FORMAT, self.DATA_FORMAT_GBK)
+        codec = self._DATA_FORMAT_CODECS.get(data_format, "gbk")
+
+        # Re-encode the line terminator; UTF-16 frames on 2 byte units
+        parser = self.frame_parser
+        terminator = parser.terminator.decode(self._codec or "latin-1")
+        parser.terminator = terminator.encode(codec or "latin-1")
+        parser.unit = 2 if codec in ("utf-16-be", "utf-16-le") else 1
+
+        self._codec = codec
+        self._decoder = None
+        if codec is not None:
+            self._decoder = codecs.getincrementaldecoder(codec)(errors="replace")
+
+    # --------------------------------------------------------
+    # _route_responses(data)
+    #
+    # Hand ACK/NACK bytes to _read_response().
+    def _route_responses(self, data):
+        for incoming in data:
+            self._responses.put(incoming)
+        if data:
+            self._expected_responses = max(0, self._expected_responses - len(data))
+    
+    # -------------------------------------------------------
+    # change_baud_rate(baud)
+    #
+    # Change the serial baud rate for the barcode module
+    def change_baud_rate(self, baud):
+        """
+            Change the serial baud rate for the barcode module.
+            Default 115200. The port is left at its current rate; use
+            upgrade_baud() to move both ends of the link together.
+
+            :param baud: baud rate to change to
+            :return: true if command is successfully sent, false otherwise
+            :rtype: bool
+        """
+        # Default at 115200 bps
+        arg = self._BAUD_RATE_ARGS.get(baud, '9')
+
+        return self.send_command(self.PROPERTY_BAUD_RATE, arg)
+    
+    # --------------------------------------------------------
+    # change_serial_data_format(data_format)
+    #
+    # Change the character encoding the module uses on the serial port
+    def change_serial_data_format(self, data_format):
+        """
+            Change the character encoding of barcodes sent on the
+            serial port. Once the module ACKs, received barcodes are
+            decoded to match.
+
+            :param data_format: int that's 0 = GBK (default),
+                1 = UTF-8, 2 = UTF-16 big endian, 3 = UTF-16 little endian
+            :return: true if command is successfully sent, false otherwise
+            :rtype: bool
+        """
+        if data_format >= 0 and data_format < 4:
+            return self.send_command(self.PROPERTY_SERIAL_DATA_FORMAT, str(data_format))
+        return False
+
+    # --------------------------------------------------------
+    # change_buzzer_tone(tone)
+    #
+    # Change the beep frequency between low, med, and high
+    def change_buzzer_tone(self, tone):
+        """
+            Change the buzzer frequency between low, med, and high
+
+            :param tone: int that's 1 = low, 2 = med, 3 = high frequency
+            :return: true if command is successfully sent, false otherwise
+            :rtype: bool
+        """
+        # Only change the frequency if a valid value is passes
+        if tone > 0 and tone < 4:
+            return self.send_command(self.PROPERTY_BUZZER_FREQ, str(tone))
+        return False
+    
+    # --------------------------------------------------------
+    # enable_decode_beep()
+    #
+    # Enable buzzer beep on successful read
+    def enable_decode_beep(self):
+        """
+            Enable beep on successful read
+
+            :return: true if command is successfully sent, false otherwise
+            :rtype: bool
+        """
+        return self.send_command(self.PROPERTY_DECODE_BEEP, "1")
+    
+    # ---------------------------------------------------------
+    # disable_decode_beep()
+    #
+    # Disable buzzer beep on successful read
+    def disable_decode_beep(self):
+        """
+            Disable beep on successful read
+
+            :return: true if command is successfully sent, false otherwise
+            :rtype: bool
+        """
+        return self.send_command(self.PROPERTY_DECODE_BEEP, "0")
+
+    # --------------------------------------------------------
+    # enable_boot_beep
+    #
+    # Enable buzzer beep on module startup
+    def enable_boot_beep(self):
+        """
+            Enable beep on module startup
+
+            :return: true if command is successfully sent, false otherwise
+            :rtype: bool
+        """
+        return self.send_command(self.PROPERTY_BOOT_BEEP, "1")
+    
+    # --------------------------------------------------------
+    # disable_boot_beep
+    #
+    # Disable buzzer beep on module  startup
+    def disable_boot_beep(self):
+        """
+            Disable beep on module startup
+
+            :return: true if command successfully sent, false otherwise
+            :rtype: bool
+        """
+        return self.send_command(self.PROPERTY_BOOT_BEEP, "0")
+    
+    # ---------------------------------------------------------
+    # light_on()
+    #
+    # Turn white illumination LED on
+    def light_on(self):
+        """
+            Turn white illumination LED on
+
+            :return: true if command successfully sent, false otherwise
+            :rtype: bool
+        """
+        return self.send_command(self.PROPERTY_FLASH_LIGHT, "1")
+    
+    # ---------------------------------------------------------
+    # light_off()
+    #
+    # Turn white illumination LED off
+    def light_off(self):
+        """
+            Turn white illumination LED off
+
+            :return: true if command successfully sent, false otherwise
+            :rtype: bool
+        """
+        return self.send_command(self.PROPERTY_FLASH_LIGHT, "0")
+        
+    # ---------------------------------------------------------
+    # reticle_on()
+    #
+    # Turn red scan line on
+    def reticle_on(self):
+        """
+            Turn red scan line on
+
+            :return: true if command successfully sent, false otherwise
+            :rtype: bool
+        """
+        return self.send_command(self.PROPERTY_AIM_LIGHT, "1")
+    
+    # ---------------------------------------------------------
+    # reticle_off()
+    #
+    # Turn red scan line off
+    def reticle_off(self):
+        """
+            Turn red scan line off
+
+            :return true if command successfully sent, false otherwise
+            :rtype: bool
+        """
+        return self.send_command(self.PROPERTY_AIM_LIGHT, "0")
+    
+    # ---------------------------------------------------------
+    # change_reading_area()
+    #
+    # Change the percentage of the frame to scan for barcodes
+    def change_reading_area(self, percent):
+        """
+            Change the percentage of the frame to scan for barcodes
+
+            :param percent: Percentage of frame to scan. Valid values
+                are 100, 80, 60, 40, 20 as stated in the DE2120 Scan
+                Setting Manual
+            :return: true if command successfully sent, false otherwise
+            :rtype: bool
+        """
+        if percent == 80:
+            arg = '1'
+        elif percent == 60:
+            arg = '2'
+        elif percent == 40:
+            arg = '3'
+        elif percent == 20:
+            arg = '4'
+        else:   # Default to scanning 100% of the area
+            arg = '0'
+            
+        return self.send_command(self.PROPERTY_READING_AREA, arg)
+    
+    # ---------------------------------------------------------
+    # enable_image_flipping()
+    #
+    # Enable mirror image reading as defined in the DE2120 Settings Manual
+    def enable_image_flipping(self):
+        """
+            Enable mirror image reading
+
+            :return: true if the command successfully sent, false otherwise
+            :rtype: bool
+        """
+        return self.send_command(self.PROPERTY_MIRROR_FLIP, "1")
+    
+    # --------------------------------------------------------
+    # disable_image_flipping()
+    #
+    # Disable mirror image reading as defined in the DE2120 Settings Manual
+    def disable_image_flipping(self):
+        """
+            Disable mirror image reading
+
+            :return: true if the command is successfully sent, false otherwise
+            :rtype: bool
+        """
+        return self.send_command(self.PROPERTY_MIRROR_FLIP, "0")
+    
+    # ---------------------------------------------------------
+    # USB_mode(mode)
+    #
+    # Enable USB communication and set the mode
+    # THIS WILL MAKE THE MODULE UNRESPONSIVE ON TTL
+    def USB_mode(self, mode):
+        """
+            Enable USB communication and set the mode. THIS WILL
+            MAKE THE MODULE UNRESPONSIVE ON COM PORT
+
+            :param mode: string defining what USB mode to set the 
+                module in. Valid arguments are "KBD", "HID", "232".
+            :return: true if the command is successfully sent, false otherwise
+            :rtype: bool
+        """
+        if mode == "KBD" or mode == "HID" or mode == "232":
+            return self.send_command(self.PROPERTY_COMM_MODE, mode)
+        
+        return False
+    
+    # ----------------------------------------------------------
+    # enable_continuous_read(repeat_interval)
+    #
+    # Enable continuous reading mode and set the interval for same-code reads
+    def enable_continuous_read(self, repeat_interval = 2):
+        """
+            Enable continuous reading of barcodes and set the time
+            interval for same-code reads
+
+            :param repeat_interval: int parameter.
+                0: same code output 1 times
+                1: continuous output with same code without interval
+                2: continuous output with same code, 0.5 second interval (default)
+                3: continuous output with same code, 1 second interval
+            :return: true if the command is successfully sent, false otherwise
+            :rtype: bool
+        """
+        if repeat_interval < 4 and repeat_interval >= 0:
+            # send_commands() waits for the reading mode to take effect
+            return self.send_commands([
+                (self.PROPERTY_READING_MODE, "CNT"),
+                (self.PROPERTY_CONTINUOUS_MODE_INTERVAL, str(repeat_interval)),
+            ])[-1]
+        
+        return False
+    
+    # ---------------------------------------------------------
+    # enable_motion_sense(sensitivity)
+    #
+    # Enable the motion sensitive read mode.
+    def enable_motion_sense(self, sensitivity = 20):
+        """
+            Enable the motion sensitive read mode and set sensitivity level
+
+            :param sensitivity: int value. The smaller the sensitivity, the
+                more sensitive. Values are taken from the DE2120 settings manual.
+                Valid arguments are: 15 (very high), 20 (high/default), 30 (little high), 
+                50 (general), 100 (low sensitivity)
+            :return: true if command is successfully sent, false otherwise
+            :rtype: bool
+        """
+        # Reject invalid sensitivity values
+        if sensitivity == 15 or sensitivity == 20 or sensitivity == 30 or sensitivity == 50 or sensitivity == 100:
+            sense = str(sensitivity)
+
+            # send_commands() waits for the reading mode to take effect
+            return self.send_commands([
+                (self.PROPERTY_READING_MODE, "MDH"),
+                (self.PROPERTY_MOTION_SENSITIVITY, sense),
+            ])[-1]
+
+        return False
+
+    # ---------------------------------------------------------
+    # enable_manual_trigger()
+    # 
+    # Disable the motion sensitive and continuous read mode.
+    # Return to the default trigger mode.
+    def enable_manual_trigger(self):
+        """
+            Disable the motioin sensitive and continuous read mode.
+            Return to the default trigger mode.
+
+            :return: true if the command is successfully sent, false otherwise
+            :rtype: bool
+        """
+        return self.send_command(self.PROPERTY_READING_MODE, "MAN")
+
+    # ---------------------------------------------------------
+    # enable_all_1D()
+    # 
+    # Enable decoding of all 1D symbologies
+    def enable_all_1D(self):
+        """
+            Enable decoding of all 1D symbologies
 
-            :return: Returns true if initialization was successful
+            :return: true if the command is successfully sent, false otherwise
             :rtype: bool
         """
-        if self.is_connected() == False:
-            return False
-        
-        # Clear any remaining incoming chars. This prevents a mis-read
-        # of the first barcode
-        self.hard_port.flush()
-
-        # We're all setup
-        return True
+        return self.send_command(self.PROPERTY_ENABLE_ALL_1D)
     
     # ---------------------------------------------------------
-    # is_connected()
+    # disable_all_1D()
     #
-    # Try to retrieve the firmware verison number as a test to 
-    # determine whether the module is connected.
-    def is_connected(self):
+    # Disable decoding of all 1D symbologies
+    def disable_all_1D(self):
         """
-            Ask the DE2120 for the firmware version.
+            Disable decoding of all 1D symbologies
 
-            :return: Returns true if the DE2120 responds with an ACK.
-            Retruns false otherwise.
+            :return: true if the command is successfully sent, false otherwise
             :rtype: bool
-        """     
-        # Try sending the firmware version command
-        write_string = "^_^" + chr(4) + "SPYFW."
-        self.hard_port.write(write_string.encode())
-        
-        # Now, look for module response
-        # If it's an ACK, return true
-        # Otherwise, return false
-        incoming = self.hard_port.read()
-        if ord(incoming) == 0x06:   # ACK
-            return True
-        elif ord(incoming) == 0x15:  # NACK
-            return False
-        else:
-            return False
-    
+        """
+        return self.send_command(self.PROPERTY_DISABLE_ALL_1D)
+
     # ---------------------------------------------------------
-    # factory_default()
-    # 
-    # Returns the DE2120 to factory default settings. This will 
-    # disconnect the module from the serial port
-    def factory_default(self):
+    # enable_all_2D()
+    #
+    # Enable decoding of all 2D symbologies
+    def enable_all_2D(self):
         """
-            Send command to put the module back into facory default
-            settings. This will disconnect the module from the serial
-            port.
+            Enable decoding of all 2D symbologies
 
-            :return: True if command successfully received, false
-            otherwise.
+            :return: true if the command is successfully sent, false otherwise
             :rtype: bool
         """
-        return self.send_command(self.COMMAND_SET_DEFAULTS)
+        return self.send_command(self.PROPERTY_ENABLE_ALL_2D)
     
     # --------------------------------------------------------
-    # available()
+    # disable_all_2D()
     #
-    # Returns the number of bytes in the serial receive buffer
-    def available(self):
-        """
-            :return: the number of bytes in the serial receive buffer
-            :rtype: int
+    # Disable decoding of all 2D symbologies
+    def disable_all_2D(self):
         """
-        return self.hard_port.in_waiting
+            Disable decoding of all 2D symbologies
 
-    # --------------------------------------------------------
-    # read()
+            :return: true if the command is successfully sent, false otherwise
+            :rtype: bool
+        """
+        return self.send_command(self.PROPERTY_DISABLE_ALL_2D)
+    
+    # ---------------------------------------------------------
+    # start_scan()
     # 
-    # Read byte from the serial port
-    def read(self):
+    # Start reading when in trigger mode (default)
+    def start_scan(self):
         """
-            :return: the first byte on the serial port
-            :rtype: int
+            Start reading when in trigger mode (default)
+
+            :return: true if the command is successfully sent, false otherwise
+            :rtype: bool
         """
-        return self.hard_port.read()
+        return self.send_command(self.COMMAND_START_SCAN)
     
-    # --------------------------------------------------------
-    # send_command(cmd, arg, max_wait_in_ms)
+    # ----------------------------------------------------------
+    # stop_scan()
     #
-    # Construct a command/parameter and send it to the module.
-    def send_command(self, cmd, arg = ""):
+    # Stop reading when in trigger mode. Module will automatically
+    # stop reading after a few seconds
+    def stop_scan(self):
         """
-            Create command string and send to DE2120 over serial 
-            port. Check serial buffer for a response
+            Stop reading when in trigger mode. Module will
+            automatically stop reading after a few seconds
 
-            :param cmd: The command name
-            :param arg: The command variation, if there is one
-            :return: True if the response from DE2120 contains the 
-            ACK character, false otherwise.
+            :return: true if the command is successfully sent, false otherwise
             :rtype: bool
         """
-        start = '^_^'
-        end = '.'
+        return self.send_command(self.COMMAND_STOP_SCAN)
 
-        command_string = start + cmd + arg + end
-        
-        # Use encode() to turn string into bytes
-        self.hard_port.write(command_string.encode())
-        
-        incoming = self.hard_port.read()
-	
-        if ord(incoming) == 0x06:
-            return True
-        elif ord(incoming) == 0x15:
-            return False
+class AsyncDE2120BarcodeScanner(DE2120BarcodeScanner):
+    """
+    AsyncDE2120BarcodeScanner
+
+    asyncio version of DE2120BarcodeScanner. The serial port's file
+    descriptor is registered with the running event loop, so no
+    thread is blocked waiting on the port. send_command(), the
+    configuration setters (light_on(), change_reading_area(), ...),
+    begin(), is_connected(), detect_baud(), upgrade_baud(),
+    open_auto() and read_barcode() are coroutines and must be
+    awaited. The PROPERTY_* and COMMAND_* constants are shared
+    with DE2120BarcodeScanner.
+
+    :param hard_port:   The port to use to communicate with the module.
+                        It must provide fileno(), as serial.Serial does
+                        on POSIX systems.
+    :param command_timeout_ms:  How long to wait for the module to ACK
+                        a command, in milliseconds.
+
+    :return:            The AsyncDE2120BarcodeScanner object.
+    :rtype:             Object
+    """
+    def __init__(self, hard_port = None, command_timeout_ms = DE2120BarcodeScanner.DEFAULT_COMMAND_TIMEOUT_MS):
+        DE2120BarcodeScanner.__init__(self, hard_port, command_timeout_ms)
+
+        self._loop = None
+        self._fd = None
+        self._barcodes = None
+        self._async_responses = None
+        self._command_lock = None
+        self._settle_handle = None
 
-        return False
-    
     # --------------------------------------------------------
-    # read_barcode()
+    # _attach()
     #
-    # Check the receive buffer for serial data from the barcode 
-    # scanner.
-    def read_barcode(self):
-        """
-            Read from the serial buffer until we hit a new line character
+    # Register the port with the running event loop on first use.
+    def _attach(self):
+        if self._loop is not None:
+            return
 
-            :return: the string in the serial buffer
-            :rtype: bool
+        self._loop = asyncio.get_running_loop()
+        self._fd = self.hard_port.fileno()
+        self._barcodes = asyncio.Queue()
+        self._async_responses = asyncio.Queue()
+        self._command_lock = asyncio.Lock()
+        self._rx_owner = self
+        self._loop.add_reader(self._fd, self._on_readable)
+
+    # --------------------------------------------------------
+    # close()
+    #
+    # Unregister the port from the event loop.
+    def close(self):
         """
-        # Check if there's data available
-        if self.hard_port.in_waiting == False:
-            return False
-        
-        # Read from serial port
-        incoming = self.hard_port.read_until()
-        
-        return incoming.decode()
-    
-    # -------------------------------------------------------
-    # change_baud_rate(baud)
+            Stop watching the serial port. The port itself is left
+            open.
+        """
+        if self._loop is None:
+            return
+
+        self._loop.remove_reader(self._fd)
+        if self._settle_handle is not None:
+            self._settle_handle.cancel()
+            self._settle_handle = None
+        self._loop = None
+        self._rx_owner = None
+
+    # --------------------------------------------------------
+    # _on_readable()
     #
-    # Change the serial baud rate for the barcode module
-    def change_baud_rate(self, baud):
+    # Event loop callback, called when the port has data.
+    def _on_readable(self):
+        try:
+            data = os.read(self._fd, 4096)
+            if not data:
+                raise serial.SerialException("device disconnected")
+        except BlockingIOError:
+            return
+        except (OSError, serial.SerialException) as exc:
+            # The port is gone; stop watching it and fail the waiters
+            if self._trace_dump is not None:
+                self._dump_trace("port error: %s" % (exc,))
+            self.close()
+            self._async_responses.put_nowait(exc)
+            self._barcodes.put_nowait(exc)
+            return
+
+        self._dispatch(self._feed(data))
+
+    # --------------------------------------------------------
+    # _settle()
+    #
+    # Timer callback, see _settle_wait().
+    def _settle(self):
+        self._settle_handle = None
+        if self._loop is not None:
+            self._dispatch(self._feed(b""))
+
+    # --------------------------------------------------------
+    # _dispatch(barcodes)
+    #
+    # Hand what _feed() found to read_barcode() and _command().
+    def _dispatch(self, barcodes):
+        for barcode in barcodes:
+            self._barcodes.put_nowait(barcode)
+
+        # _feed() queued any ACK/NACK bytes; hand them to _command()
+        while not self._responses.empty():
+            self._async_responses.put_nowait(self._responses.get_nowait())
+
+        # Bytes left undecided are taken by a timer, not by waiting
+        settle = self._settle_wait()
+        if settle is not None and self._settle_handle is None:
+            self._settle_handle = self._loop.call_later(settle, self._settle)
+
+    # --------------------------------------------------------
+    # _queue_depth()
+    #
+    # Include barcodes waiting for read_barcode().
+    def _queue_depth(self):
+        depth = DE2120BarcodeScanner._queue_depth(self)
+        if self._barcodes is not None:
+            depth += self._barcodes.qsize()
+        return depth
+
+    # --------------------------------------------------------
+    # _command(data, count, timeout_ms, codes)
+    #
+    # Write command frames and wait for the module's responses.
+    async def _command(self, data, count = 1, timeout_ms = None, codes = None):
         """
-            Change the serial baud rate for the barcode module.
-            Default 115200
+            Write one or more command frames and wait for one
+            response per frame.
 
-            :param baud: baud rate to change to
-            :return: true if command is successfully sent, false otherwise
-            :rtype: bool
+            :param data: the encoded command frames
+            :param count: how many responses to wait for
+            :param timeout_ms: how long to wait for each response, in
+                milliseconds. Defaults to command_timeout_ms.
+            :param codes: the command code of each frame, to record
+                in the metrics
+            :return: the response bytes in order, None for any that
+                did not arrive before the timeout
+            :rtype: list
         """
-        if baud == 1200:
-            arg = '2'
-        elif baud == 2400:
-            arg = '3'
-        elif baud == 4800:
-            arg = '4'
-        elif baud == 9600:
-            arg = '5'
-        elif baud == 19200:
-            arg = '6'
-        elif baud == 38400:
-            arg = '7'
-        elif baud == 57600:
-            arg = '8'
-        else:   # Default at 115200 bps
-            arg = '9'
+        self._attach()
+        timeout = self._command_timeout(timeout_ms)
+        async with self._command_lock:
+            while not self._async_responses.empty():
+                self._async_responses.get_nowait()
+            self._write_command(data)
+            sent_at = time.monotonic()
+
+            responses = []
+            while len(responses) < count:
+                try:
+                    incoming = await asyncio.wait_for(self._async_responses.get(), timeout)
+                except asyncio.TimeoutError:
+                    self._expected_responses = 0
+                    break
+                if isinstance(incoming, Exception):
+                    raise incoming
+                if codes is not None:
+                    self._command_done(codes[len(responses)], self._command_result(incoming), sent_at)
+                responses.append(incoming)
+
+            if codes is not None:
+                for cmd in codes[len(responses):]:
+                    self._command_done(cmd, None, sent_at)
+            return responses + [None] * (count - len(responses))
 
-        return self.send_command(self.PROPERTY_BAUD_RATE, arg)
-    
     # --------------------------------------------------------
-    # change_buzzer_tone(tone)
+    # begin()
     #
-    # Change the beep frequency between low, med, and high
-    def change_buzzer_tone(self, tone):
+    # Initializes the device with basic settings.
+    async def begin(self):
         """
-            Change the buzzer frequency between low, med, and high
+            Initializes the device with basic settings. Awaits the
+            is_connected() function
 
-            :param tone: int that's 1 = low, 2 = med, 3 = high frequency
-            :return: true if command is successfully sent, false otherwise
+            :return: Returns true if initialization was successful
             :rtype: bool
         """
-        # Only change the frequency if a valid value is passes
-        if tone > 0 and tone < 4:
-            return self.send_command(self.PROPERTY_BUZZER_FREQ, str(tone))
-        return False
-    
+        if await self.is_connected() == False:
+            return False
+
+        self.hard_port.flush()
+        return True
+
     # --------------------------------------------------------
-    # enable_decode_beep()
+    # is_connected()
     #
-    # Enable buzzer beep on successful read
-    def enable_decode_beep(self):
+    # Ask for the firmware version to test the connection.
+    async def is_connected(self, timeout_ms = None):
         """
-            Enable beep on successful read
+            Ask the DE2120 for the firmware version.
 
-            :return: true if command is successfully sent, false otherwise
+            :param timeout_ms: how long to wait for the response, in
+                milliseconds. Defaults to command_timeout_ms.
+            :return: Returns true if the DE2120 responds with an ACK.
+            Returns false otherwise.
             :rtype: bool
         """
-        return self.send_command(self.PROPERTY_DECODE_BEEP, "1")
-    
+        write_string = "^_^" + chr(4) + "SPYFW."
+        incoming = await self._command(write_string.encode(), timeout_ms=timeout_ms)
+        return incoming[0] == self.DE2120_COMMAND_ACK
+
     # ---------------------------------------------------------
-    # disable_decode_beep()
+    # detect_baud(baud_rates, probe_timeout_ms)
     #
-    # Disable buzzer beep on successful read
-    def disable_decode_beep(self):
+    # Find the baud rate the module is set to.
+    async def detect_baud(self, baud_rates = None, probe_timeout_ms = 50):
         """
-            Disable beep on successful read
+            Find the module's baud rate. See
+            DE2120BarcodeScanner.detect_baud().
 
-            :return: true if command is successfully sent, false otherwise
-            :rtype: bool
+            :return: the detected baud rate, or None if the module did
+                not answer at any of them
+            :rtype: int
         """
-        return self.send_command(self.PROPERTY_DECODE_BEEP, "0")
+        port = self.hard_port
+        original = port.baudrate
+        for rate in self._probe_order(baud_rates):
+            if await self._probe(rate, probe_timeout_ms):
+                return rate
 
-    # --------------------------------------------------------
-    # enable_boot_beep
+        port.baudrate = original
+        self._reset_input()
+        return None
+
+    # ---------------------------------------------------------
+    # upgrade_baud(target, probe_timeout_ms)
     #
-    # Enable buzzer beep on module startup
-    def enable_boot_beep(self):
+    # Move both the module and the port to a new baud rate.
+    async def upgrade_baud(self, target = 115200, probe_timeout_ms = 50):
         """
-            Enable beep on module startup
+            Switch the module and this end of the link to a new baud
+            rate together. See DE2120BarcodeScanner.upgrade_baud().
 
-            :return: true if command is successfully sent, false otherwise
+            :return: true if the link works at the target rate, false
+                if the change was refused or rolled back
             :rtype: bool
         """
-        return self.send_command(self.PROPERTY_BOOT_BEEP, "1")
-    
+        if target not in self._BAUD_RATE_ARGS:
+            raise ValueError("unsupported baud rate: %r" % (target,))
+
+        port = self.hard_port
+        old = port.baudrate
+        if old == target:
+            return await self._probe(target, probe_timeout_ms)
+
+        if not await self.change_baud_rate(target):
+            return False
+
+        if await self._probe(target, probe_timeout_ms):
+            return True
+
+        if await self._probe(old, probe_timeout_ms):
+            self._remember(self.PROPERTY_BAUD_RATE, self._BAUD_RATE_ARGS.get(old, ""))
+            return False
+
+        port.baudrate = target
+        self._reset_input()
+        if old in self._BAUD_RATE_ARGS:
+            await self.change_baud_rate(old)
+        if not await self._probe(old, probe_timeout_ms):
+            await self.detect_baud(probe_timeout_ms=probe_timeout_ms)
+        return False
+
     # --------------------------------------------------------
-    # disable_boot_beep
+    # enable_auto_reconnect(max_backoff, max_attempts)
     #
-    # Disable buzzer beep on module  startup
-    def disable_boot_beep(self):
+    # Not available on the asyncio scanner.
+    def enable_auto_reconnect(self, max_backoff = 5.0, max_attempts = None):
         """
-            Disable beep on module startup
+            Reconnecting blocks while it probes the module and replays
+            the settings, so it is only available on
+            DE2120BarcodeScanner. A lost port fails the pending
+            read_barcode() and commands; close the scanner and open a
+            new one.
 
-            :return: true if command successfully sent, false otherwise
-            :rtype: bool
+            :raises NotImplementedError: always
         """
-        return self.send_command(self.PROPERTY_BOOT_BEEP, "0")
-    
-    # ---------------------------------------------------------
-    # light_on()
+        raise NotImplementedError("auto reconnect is not available on AsyncDE2120BarcodeScanner")
+
+    # --------------------------------------------------------
+    # reconnect(max_attempts)
     #
-    # Turn white illumination LED on
-    def light_on(self):
+    # Not available on the asyncio scanner.
+    def reconnect(self, max_attempts = None, stop_event = None):
         """
-            Turn white illumination LED on
+            See enable_auto_reconnect().
 
-            :return: true if command successfully sent, false otherwise
-            :rtype: bool
+            :raises NotImplementedError: always
         """
-        return self.send_command(self.PROPERTY_FLASH_LIGHT, "1")
-    
+        raise NotImplementedError("reconnect() is not available on AsyncDE2120BarcodeScanner")
+
     # ---------------------------------------------------------
-    # light_off()
+    # _probe(rate, probe_timeout_ms)
     #
-    # Turn white illumination LED off
-    def light_off(self):
-        """
-            Turn white illumination LED off
+    # Check whether the module answers at a baud rate.
+    async def _probe(self, rate, probe_timeout_ms):
+        port = self.hard_port
+        if port.baudrate != rate:
+            port.baudrate = rate
+        self._reset_input()
+
+        if not await self.is_connected(self._probe_timeout(rate, probe_timeout_ms)):
+            return False
+
+        _last_known_baud[getattr(port, "port", None)] = rate
+        self._reset_input()
+        return True
 
-            :return: true if command successfully sent, false otherwise
-            :rtype: bool
-        """
-        return self.send_command(self.PROPERTY_FLASH_LIGHT, "0")
-        
     # ---------------------------------------------------------
-    # reticle_on()
+    # open_auto(port, baud_rates, probe_timeout_ms, timeout)
     #
-    # Turn red scan line on
-    def reticle_on(self):
+    # Open a port at whatever baud rate the module is set to.
+    @classmethod
+    async def open_auto(cls, port = "/dev/ttyACM0", baud_rates = None, probe_timeout_ms = 50, timeout = 1,
+                        **kwargs):
         """
-            Turn red scan line on
+            Open a serial port and detect the module's baud rate. See
+            DE2120BarcodeScanner.open_auto().
 
-            :return: true if command successfully sent, false otherwise
-            :rtype: bool
+            :return: the scanner, or None if the module did not answer
+                at any rate
+            :rtype: AsyncDE2120BarcodeScanner
         """
-        return self.send_command(self.PROPERTY_AIM_LIGHT, "1")
-    
-    # ---------------------------------------------------------
-    # reticle_off()
+        hard_port = serial.Serial(port, _last_known_baud.get(port, 115200), timeout=timeout)
+        scanner = cls(hard_port, **kwargs)
+        if await scanner.detect_baud(baud_rates, probe_timeout_ms) is None:
+            scanner.close()
+            hard_port.close()
+            return None
+        return scanner
+
+    # --------------------------------------------------------
+    # send_command(cmd, arg, timeout_ms)
     #
-    # Turn red scan line off
-    def reticle_off(self):
+    # Construct a command/parameter and send it to the module.
+    async def send_command(self, cmd, arg = "", timeout_ms = None):
         """
-            Turn red scan line off
+            Create command string and send to DE2120 over serial
+            port. Wait for the response without blocking the event
+            loop.
 
-            :return true if command successfully sent, false otherwise
+            :param cmd: The command name
+            :param arg: The command variation, if there is one
+            :param timeout_ms: how long to wait for the response, in
+                milliseconds. Defaults to command_timeout_ms.
+            :return: True if the response from DE2120 contains the
+            ACK character, false otherwise. None if there was no
+            response before the timeout.
             :rtype: bool
         """
-        return self.send_command(self.PROPERTY_AIM_LIGHT, "0")
-    
-    # ---------------------------------------------------------
-    # change_reading_area()
+        incoming = await self._command(self._command_frame(cmd, arg), timeout_ms=timeout_ms, codes=[cmd])
+        result = self._command_result(incoming[0])
+        if result:
+            self._remember(cmd, arg)
+        return result
+
+    # --------------------------------------------------------
+    # send_commands(commands)
     #
-    # Change the percentage of the frame to scan for barcodes
-    def change_reading_area(self, percent):
+    # Send several commands back to back and collect the responses.
+    async def send_commands(self, commands, timeout_ms = None):
         """
-            Change the percentage of the frame to scan for barcodes
+            Send a batch of commands with as few waits as possible.
+            See DE2120BarcodeScanner.send_commands().
 
-            :param percent: Percentage of frame to scan. Valid values
-                are 100, 80, 60, 40, 20 as stated in the DE2120 Scan
-                Setting Manual
-            :return: true if command successfully sent, false otherwise
-            :rtype: bool
+            :param commands: a CommandBatch, or an iterable of command
+                names or (command, argument) tuples
+            :param timeout_ms: how long to wait for each response, in
+                milliseconds. Defaults to command_timeout_ms.
+            :return: one result per command, in order: True if the
+                module ACKed it, false otherwise, None if it timed out
+                or was not sent
+            :rtype: list
         """
-        if percent == 80:
-            arg = '1'
-        elif percent == 60:
-            arg = '2'
-        elif percent == 40:
-            arg = '3'
-        elif percent == 20:
-            arg = '4'
-        else:   # Default to scanning 100% of the area
-            arg = '0'
-            
-        return self.send_command(self.PROPERTY_READING_AREA, arg)
-    
-    # ---------------------------------------------------------
-    # enable_image_flipping()
+        results = []
+        for data, segment, settle in self._batch_segments(commands):
+            if None in results:
+                results.extend([None] * len(segment))
+                continue
+
+            responses = await self._command(data, len(segment), timeout_ms,
+                                            [cmd for cmd, arg in segment])
+            for (cmd, arg), incoming in zip(segment, responses):
+                result = self._command_result(incoming)
+                if result:
+                    self._remember(cmd, arg)
+                results.append(result)
+            if settle:
+                await asyncio.sleep(settle)
+
+        return results
+
+    # --------------------------------------------------------
+    # apply_profile(profile, force)
     #
-    # Enable mirror image reading as defined in the DE2120 Settings Manual
-    def enable_image_flipping(self):
+    # Bring the module's settings in line with a profile.
+    async def apply_profile(self, profile, force = False):
         """
-            Enable mirror image reading
+            Apply a ScannerProfile, sending only the settings that
+            changed. See DE2120BarcodeScanner.apply_profile().
 
-            :return: true if the command successfully sent, false otherwise
-            :rtype: bool
+            :return: the result of each command sent, keyed by
+                property code
+            :rtype: dict
         """
-        return self.send_command(self.PROPERTY_MIRROR_FLIP, "1")
-    
+        commands = self._profile_changes(profile, force)
+        if not commands:
+            return {}
+
+        results = await self.send_commands(commands)
+        return dict(zip([cmd for cmd, arg in commands], results))
+
     # --------------------------------------------------------
-    # disable_image_flipping()
+    # read_barcode(timeout)
     #
-    # Disable mirror image reading as defined in the DE2120 Settings Manual
-    def disable_image_flipping(self):
+    # Wait for the next barcode from the module.
+    async def read_barcode(self, timeout = None):
         """
-            Disable mirror image reading
+            Wait for the next barcode.
 
-            :return: true if the command is successfully sent, false otherwise
-            :rtype: bool
+            :param timeout: seconds to wait, or None to wait forever
+            :return: the barcode string, or false if none arrived
+                before the timeout
+            :rtype: str
         """
-        return self.send_command(self.PROPERTY_MIRROR_FLIP, "0")
-    
-    # ---------------------------------------------------------
-    # USB_mode(mode)
+        self._attach()
+        try:
+            barcode = await asyncio.wait_for(self._barcodes.get(), timeout)
+        except asyncio.TimeoutError:
+            return False
+
+        if isinstance(barcode, Exception):
+            raise barcode
+        return barcode
+
+    # --------------------------------------------------------
+    # scans()
     #
-    # Enable USB communication and set the mode
-    # THIS WILL MAKE THE MODULE UNRESPONSIVE ON TTL
-    def USB_mode(self, mode):
+    # Iterate over barcodes as they arrive.
+    async def scans(self):
         """
-            Enable USB communication and set the mode. THIS WILL
-            MAKE THE MODULE UNRESPONSIVE ON COM PORT
+            Async iterator over barcodes as they arrive::
 
-            :param mode: string defining what USB mode to set the 
-                module in. Valid arguments are "KBD", "HID", "232".
-            :return: true if the command is successfully sent, false otherwise
-            :rtype: bool
+                async for scan in scanner.scans():
+                    ...
         """
-        if mode == "KBD" or mode == "HID" or mode == "232":
-            return self.send_command(self.PROPERTY_COMM_MODE, mode)
-        
-        return False
-    
-    # ----------------------------------------------------------
+        while True:
+            yield await self.read_barcode()
+
+    # --------------------------------------------------------
     # enable_continuous_read(repeat_interval)
     #
     # Enable continuous reading mode and set the interval for same-code reads
-    def enable_continuous_read(self, repeat_interval = 2):
+    async def enable_continuous_read(self, repeat_interval = 2):
         """
             Enable continuous reading of barcodes and set the time
-            interval for same-code reads
+            interval for same-code reads. See
+            DE2120BarcodeScanner.enable_continuous_read().
 
-            :param repeat_interval: int parameter.
-                0: same code output 1 times
-                1: continuous output with same code without interval
-                2: continuous output with same code, 0.5 second interval (default)
-                3: continuous output with same code, 1 second interval
             :return: true if the command is successfully sent, false otherwise
             :rtype: bool
         """
         if repeat_interval < 4 and repeat_interval >= 0:
-            self.send_command(self.PROPERTY_READING_MODE, "CNT")
-            
-            # Wait for command to take effect
-            time.sleep(0.01)
-            
-            return self.send_command(self.PROPERTY_CONTINUOUS_MODE_INTERVAL, str(repeat_interval))
-        
+            results = await self.send_commands([
+                (self.PROPERTY_READING_MODE, "CNT"),
+                (self.PROPERTY_CONTINUOUS_MODE_INTERVAL, str(repeat_interval)),
+            ])
+            return results[-1]
+
         return False
-    
-    # ---------------------------------------------------------
+
+    # --------------------------------------------------------
     # enable_motion_sense(sensitivity)
     #
     # Enable the motion sensitive read mode.
-    def enable_motion_sense(self, sensitivity = 20):
+    async def enable_motion_sense(self, sensitivity = 20):
         """
-            Enable the motion sensitive read mode and set sensitivity level
+            Enable the motion sensitive read mode and set sensitivity
+            level. See DE2120BarcodeScanner.enable_motion_sense().
 
-            :param sensitivity: int value. The smaller the sensitivity, the
-                more sensitive. Values are taken from the DE2120 settings manual.
-                Valid arguments are: 15 (very high), 20 (high/default), 30 (little high), 
-                50 (general), 100 (low sensitivity)
             :return: true if command is successfully sent, false otherwise
             :rtype: bool
         """
-        # Reject invalid sensitivity values
         if sensitivity == 15 or sensitivity == 20 or sensitivity == 30 or sensitivity == 50 or sensitivity == 100:
             sense = str(sensitivity)
 
-            self.send_command(self.PROPERTY_READING_MODE, "MDH")
-            
-            # Wait for command to take effect
-            time.sleep(0.01)
-            
-            return self.send_command(self.PROPERTY_COMM_MODE, sense)
+            results = await self.send_commands([
+                (self.PROPERTY_READING_MODE, "MDH"),
+                (self.PROPERTY_MOTION_SENSITIVITY, sense),
+            ])
+            return results[-1]
 
         return False
 
-    # ---------------------------------------------------------
-    # enable_manual_trigger()
-    # 
-    # Disable the motion sensitive and continuous read mode.
-    # Return to the default trigger mode.
-    def enable_manual_trigger(self):
+    # --------------------------------------------------------
+    # change_serial_data_format(data_format)
+    #
+    # Change the character encoding the module uses on the serial port
+    async def change_serial_data_format(self, data_format):
         """
-            Disable the motioin sensitive and continuous read mode.
-            Return to the default trigger mode.
+            Change the character encoding of barcodes sent on the
+            serial port. See
+            DE2120BarcodeScanner.change_serial_data_format().
 
-            :return: true if the command is successfully sent, false otherwise
+            :return: true if command is successfully sent, false otherwise
             :rtype: bool
         """
-        return self.send_command(self.PROPERTY_READING_MODE, "MAN")
+        if data_format >= 0 and data_format < 4:
+            return await self.send_command(self.PROPERTY_SERIAL_DATA_FORMAT, str(data_format))
+        return False
 
-    # ---------------------------------------------------------
-    # enable_all_1D()
-    # 
-    # Enable decoding of all 1D symbologies
-    def enable_all_1D(self):
+    # --------------------------------------------------------
+    # change_buzzer_tone(tone)
+    #
+    # Change the beep frequency between low, med, and high
+    async def change_buzzer_tone(self, tone):
         """
-            Enable decoding of all 1D symbologies
+            Change the buzzer frequency. See
+            DE2120BarcodeScanner.change_buzzer_tone().
 
-            :return: true if the command is successfully sent, false otherwise
+            :return: true if command is successfully sent, false otherwise
             :rtype: bool
         """
-        return self.send_command(self.PROPERTY_ENABLE_ALL_1D)
-    
-    # ---------------------------------------------------------
-    # disable_all_1D()
+        if tone > 0 and tone < 4:
+            return await self.send_command(self.PROPERTY_BUZZER_FREQ, str(tone))
+        return False
+
+    # --------------------------------------------------------
+    # USB_mode(mode)
     #
-    # Disable decoding of all 1D symbologies
-    def disable_all_1D(self):
+    # Enable USB communication and set the mode
+    async def USB_mode(self, mode):
         """
-            Disable decoding of all 1D symbologies
+            Enable USB communication and set the mode. See
+            DE2120BarcodeScanner.USB_mode().
 
             :return: true if the command is successfully sent, false otherwise
             :rtype: bool
         """
-        return self.send_command(self.PROPERTY_DISABLE_ALL_1D)
+        if mode == "KBD" or mode == "HID" or mode == "232":
+            return await self.send_command(self.PROPERTY_COMM_MODE, mode)
+        return False
 
-    # ---------------------------------------------------------
-    # enable_all_2D()
+class ScannerHub(object):
+    """
+    ScannerHub
+
+    Read barcodes from many DE2120BarcodeScanner objects on a single
+    thread. Every scanner's serial port is registered with one
+    selectors.DefaultSelector (epoll on Linux), so the hub costs no
+    CPU while the scanners are idle. While a scanner belongs to a hub,
+    do not call its read_barcode(). Its send_command() and setters keep
+    working when called from another thread than the one running the
+    hub.
+
+    :return:            The ScannerHub object.
+    :rtype:             Object
+    """
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._scanners = {}
+
+        # Lost ports are reopened on their own threads, so a slow
+        # reconnect never stalls the other scanners. scanner_id: (stop
+        # event, thread); finished attempts are queued in _reconnected
+        # and the hub woken through the pipe.
+        self._reconnects = {}
+        self._reconnected = collections.deque()
+
+        # Errors of scanners dropped from the hub, raised by poll()
+        # once the barcodes read with them have been returned
+        self._errors = collections.deque()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+
+    # --------------------------------------------------------
+    # add(scanner, scanner_id)
     #
-    # Enable decoding of all 2D symbologies
-    def enable_all_2D(self):
+    # Start reading barcodes from a scanner.
+    def add(self, scanner, scanner_id = None):
         """
-            Enable decoding of all 2D symbologies
+            Add a scanner to the hub. Its port must provide fileno(),
+            as serial.Serial does on POSIX systems.
 
-            :return: true if the command is successfully sent, false otherwise
-            :rtype: bool
+            :param scanner: the DE2120BarcodeScanner to read from
+            :param scanner_id: the id reported with each of this
+                scanner's barcodes. Defaults to the port name.
+            :return: the scanner id
         """
-        return self.send_command(self.PROPERTY_ENABLE_ALL_2D)
-    
+        if scanner._rx_owner is not None:
+            raise ValueError("scanner is already being read by another reader")
+
+        if scanner_id is None:
+            scanner_id = getattr(scanner.hard_port, "port", None) or len(self._scanners)
+        if scanner_id in self._scanners:
+            raise ValueError("duplicate scanner id: %r" % (scanner_id,))
+
+        self._selector.register(scanner.hard_port.fileno(), selectors.EVENT_READ,
+                                (scanner_id, scanner))
+        scanner._rx_owner = self
+        self._scanners[scanner_id] = scanner
+        return scanner_id
+
     # --------------------------------------------------------
-    # disable_all_2D()
+    # remove(scanner_id)
     #
-    # Disable decoding of all 2D symbologies
-    def disable_all_2D(self):
+    # Stop reading barcodes from a scanner.
+    def remove(self, scanner_id):
         """
-            Disable decoding of all 2D symbologies
+            Remove a scanner from the hub.
 
-            :return: true if the command is successfully sent, false otherwise
-            :rtype: bool
+            :param scanner_id: the id returned by add()
+            :return: the removed scanner
         """
-        return self.send_command(self.PROPERTY_DISABLE_ALL_2D)
-    
-    # ---------------------------------------------------------
-    # start_scan()
-    # 
-    # Start reading when in trigger mode (default)
-    def start_scan(self):
+        scanner = self._scanners.pop(scanner_id)
+        reconnect = self._reconnects.pop(scanner_id, None)
+        if reconnect is None:
+            self._selector.unregister(scanner.hard_port.fileno())
+        else:
+            # Let a running attempt finish before handing the port back
+            stop, thread = reconnect
+            stop.set()
+            thread.join()
+        scanner._rx_owner = None
+        return scanner
+
+    # --------------------------------------------------------
+    # scanners()
+    #
+    # The scanners in the hub, keyed by id.
+    def scanners(self):
         """
-            Start reading when in trigger mode (default)
+            :return: a dict of the scanners in the hub, keyed by id
+            :rtype: dict
+        """
+        return dict(self._scanners)
 
-            :return: true if the command is successfully sent, false otherwise
-            :rtype: bool
+    # --------------------------------------------------------
+    # poll(timeout)
+    #
+    # Wait for barcodes from any scanner in the hub.
+    def poll(self, timeout = None):
         """
-        return self.send_command(self.COMMAND_START_SCAN)
-    
-    # ----------------------------------------------------------
-    # stop_scan()
+            Wait until at least one scanner has data, then read it.
+
+            When a scanner's port fails and it is not reconnected, the
+            scanner is removed from the hub and the error is raised.
+            Barcodes already read from other scanners are returned
+            first; the error is then raised by the next call.
+
+            :param timeout: seconds to wait, or None to wait forever
+            :return: a list of (scanner_id, barcode) tuples, empty if
+                the timeout expired
+            :rtype: list
+            :raises serial.SerialException, OSError: the error of a
+                port that was lost
+        """
+        if self._errors:
+            raise self._errors.popleft()
+
+        deadline = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+
+        events = []
+        while True:
+            # Wake up for ACK/NACK bytes left undecided, see _feed()
+            wait = None if deadline is None else max(deadline - time.monotonic(), 0)
+            settling = [(scanner_id, scanner) for scanner_id, scanner in self._scanners.items()
+                        if not scanner._reconnecting and scanner._settle_wait() is not None]
+            for scanner_id, scanner in settling:
+                settle = scanner._settle_wait()
+                if wait is None or settle < wait:
+                    wait = settle
+
+            for key, mask in self._selector.select(wait):
+                if key.data is None:
+                    events.extend(self._finish_reconnects())
+                    continue
+
+                scanner_id, scanner = key.data
+                try:
+                    data = os.read(key.fd, 4096)
+                    if not data:
+                        raise serial.SerialException("device disconnected")
+                except BlockingIOError:
+                    continue
+                except (serial.SerialException, OSError) as exc:
+                    self._port_lost(key.fd, scanner_id, scanner, exc)
+                    continue
+
+                for barcode in scanner._feed(data):
+                    events.append((scanner_id, barcode))
+
+            for scanner_id, scanner in settling:
+                if scanner._settle_wait() == 0:
+                    for barcode in scanner._feed(b""):
+                        events.append((scanner_id, barcode))
+
+            if events or self._errors:
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            if not settling:
+                break
+
+        if not events and self._errors:
+            raise self._errors.popleft()
+        return events
+
+    # --------------------------------------------------------
+    # _port_lost(fd, scanner_id, scanner, exc)
     #
-    # Stop reading when in trigger mode. Module will automatically
-    # stop reading after a few seconds
-    def stop_scan(self):
+    # Stop watching a dead port and schedule its reconnect.
+    def _port_lost(self, fd, scanner_id, scanner, exc):
         """
-            Stop reading when in trigger mode. Module will
-            automatically stop reading after a few seconds
+            Unregister a port that failed. Scanners with auto reconnect
+            enabled are reopened with backoff on a thread of their own,
+            so the other scanners keep being read. Others are removed
+            from the hub and the error is queued for poll() to raise.
+        """
+        self._selector.unregister(fd)
+        if scanner._trace_dump is not None:
+            scanner._dump_trace("port error: %s" % (exc,))
+        if not scanner._auto_reconnect:
+            del self._scanners[scanner_id]
+            scanner._rx_owner = None
+            self._errors.append(exc)
+            return
 
-            :return: true if the command is successfully sent, false otherwise
-            :rtype: bool
+        stop = threading.Event()
+        thread = threading.Thread(target=self._reconnect_loop, args=(scanner_id, scanner, exc, stop),
+                                  name="ScannerHub reconnect %s" % (scanner_id,))
+        thread.daemon = True
+        self._reconnects[scanner_id] = (stop, thread)
+        thread.start()
+
+    # --------------------------------------------------------
+    # _reconnect_loop(scanner_id, scanner, exc, stop)
+    #
+    # Reconnect thread: reopen a lost port with backoff.
+    def _reconnect_loop(self, scanner_id, scanner, exc, stop):
+        backoff = scanner._INITIAL_BACKOFF
+        attempts = 0
+        while not stop.is_set():
+            attempts += 1
+            if scanner._reopen():
+                exc = None
+                break
+            if scanner._max_reconnect_attempts is not None and attempts >= scanner._max_reconnect_attempts:
+                break
+            if stop.wait(backoff):
+                return
+            backoff = min(backoff * 2, scanner._max_backoff)
+        else:
+            return
+
+        self._reconnected.append((scanner_id, scanner, exc))
+        try:
+            os.write(self._wake_w, b"\0")
+        except BlockingIOError:
+            # The hub already has a wake-up pending
+            pass
+
+    # --------------------------------------------------------
+    # _finish_reconnects()
+    #
+    # Resume reading reopened ports; queue the errors of ports given
+    # up on. Returns the barcodes read while a port was reopened.
+    def _finish_reconnects(self):
+        events = []
+        try:
+            while os.read(self._wake_r, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+        while self._reconnected:
+            scanner_id, scanner, exc = self._reconnected.popleft()
+            reconnect = self._reconnects.get(scanner_id)
+            if reconnect is None or self._scanners.get(scanner_id) is not scanner:
+                # Removed from the hub meanwhile
+                continue
+            reconnect[1].join()
+            del self._reconnects[scanner_id]
+
+            if exc is not None:
+                del self._scanners[scanner_id]
+                scanner._rx_owner = None
+                self._errors.append(exc)
+                continue
+            self._selector.register(scanner.hard_port.fileno(), selectors.EVENT_READ,
+                                    (scanner_id, scanner))
+
+            # Read while the settings were restored
+            while scanner._rx_barcodes:
+                events.append((scanner_id, scanner._rx_barcodes.popleft()))
+        return events
+
+    # --------------------------------------------------------
+    # events(timeout)
+    #
+    # Generator over (scanner_id, barcode) events.
+    def events(self, timeout = None):
         """
-        return self.send_command(self.COMMAND_STOP_SCAN)
+            Yield (scanner_id, barcode) tuples as they arrive.
+
+            :param timeout: stop after this many seconds without a
+                barcode, or None to run forever
+        """
+        if timeout is None:
+            while True:
+                for event in self.poll():
+                    yield event
+
+        # poll() also returns nothing for data that finished no frame,
+        # such as part of a long barcode or an ACK, so time the silence
+        # from the last barcode rather than from the last poll()
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            events = self.poll(remaining)
+            if events:
+                deadline = time.monotonic() + timeout
+            for event in events:
+                yield event
+
+    # --------------------------------------------------------
+    # close()
+    #
+    # Release every scanner and the selector.
+    def close(self):
+        """
+            Remove every scanner from the hub and close the selector.
+            The serial ports are left open.
+        """
+        for scanner_id in list(self._scanners):
+            self.remove(scanner_id)
+        self._selector.close()
+        os.close(self._wake_r)
+        os.close(self._wake_w)
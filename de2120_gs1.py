@@ -0,0 +1,419 @@
+#-----------------------------------------------------------------------------
+# de2120_gs1.py
+#
+# Parse GS1 element strings (Application Identifiers) from barcodes read
+# by the DE2120 Barcode Scanner.
+#
+#------------------------------------------------------------------------
+# Written by SparkFun Electronics, October 2026
+#
+# Do you like this library? Help support SparkFun. Buy a board!
+#==================================================================================
+# Copyright (c) 2026 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#==================================================================================
+
+
+"""
+de2120_gs1
+============
+Parse GS1 element strings, as carried by GS1 DataMatrix, GS1 QR Code,
+GS1-128 and GS1 DataBar, into a dict of Application Identifier (AI) to
+value::
+
+    parse_gs1("]d2010950600013435217261231" "10ABC123\x1d21XYZ")
+    # {"01": "09506000134352", "17": "261231", "10": "ABC123", "21": "XYZ"}
+
+Or have the scanner parse every scan that is marked as GS1::
+
+    my_scanner.enable_scan_results(gs1=True)
+    result = my_scanner.read_barcode()
+    if result and result.gs1:
+        gtin = result.gs1.get("01")
+
+"""
+#-----------------------------------------------------------------------------------
+
+# FNC1 inside a barcode is transmitted as the ASCII group separator
+GS = "\x1d"
+
+# AIM symbology identifiers of GS1 symbols
+GS1_AIM_IDS = ("]C1", "]e0", "]d2", "]Q3", "]J1")
+
+# Code ID symbologies that always carry element strings
+GS1_SYMBOLOGIES = ("GS1-128", "GS1 DataBar")
+
+# AIs whose first two digits are listed here have a predefined length
+# and are not followed by FNC1 (GS1 General Specifications 5.10.1)
+PREDEFINED_PREFIXES = ("00", "01", "02", "03", "04", "11", "12", "13", "14", "15",
+                       "16", "17", "18", "19", "20", "31", "32", "33", "34", "35",
+                       "36", "41")
+
+# (AI, shortest value, longest value, all digits, title). A trailing
+# "n" stands for the ten AIs with a decimal point position digit.
+AI_TABLE = (
+    ("00", 18, 18, True, "SSCC"),
+    ("01", 14, 14, True, "GTIN"),
+    ("02", 14, 14, True, "CONTENT"),
+    ("03", 14, 14, True, "MTO GTIN"),
+    ("10", 1, 20, False, "BATCH/LOT"),
+    ("11", 6, 6, True, "PROD DATE"),
+    ("12", 6, 6, True, "DUE DATE"),
+    ("13", 6, 6, True, "PACK DATE"),
+    ("15", 6, 6, True, "BEST BEFORE or BEST BY"),
+    ("16", 6, 6, True, "SELL BY"),
+    ("17", 6, 6, True, "USE BY OR EXPIRY"),
+    ("20", 2, 2, True, "VARIANT"),
+    ("21", 1, 20, False, "SERIAL"),
+    ("22", 1, 20, False, "CPV"),
+    ("235", 1, 28, False, "TPX"),
+    ("240", 1, 30, False, "ADDITIONAL ID"),
+    ("241", 1, 30, False, "CUST. PART No."),
+    ("242", 1, 6, True, "MTO VARIANT"),
+    ("243", 1, 20, False, "PCN"),
+    ("250", 1, 30, False, "SECONDARY SERIAL"),
+    ("251", 1, 30, False, "REF. TO SOURCE"),
+    ("253", 13, 30, False, "GDTI"),
+    ("254", 1, 20, False, "GLN EXTENSION COMPONENT"),
+    ("255", 13, 25, True, "GCN"),
+    ("30", 1, 8, True, "VAR. COUNT"),
+    ("310n", 6, 6, True, "NET WEIGHT (kg)"),
+    ("311n", 6, 6, True, "LENGTH (m)"),
+    ("312n", 6, 6, True, "WIDTH (m)"),
+    ("313n", 6, 6, True, "HEIGHT (m)"),
+    ("314n", 6, 6, True, "AREA (m2)"),
+    ("315n", 6, 6, True, "NET VOLUME (l)"),
+    ("316n", 6, 6, True, "NET VOLUME (m3)"),
+    ("320n", 6, 6, True, "NET WEIGHT (lb)"),
+    ("321n", 6, 6, True, "LENGTH (in)"),
+    ("322n", 6, 6, True, "LENGTH (ft)"),
+    ("323n", 6, 6, True, "LENGTH (yd)"),
+    ("324n", 6, 6, True, "WIDTH (in)"),
+    ("325n", 6, 6, True, "WIDTH (ft)"),
+    ("326n", 6, 6, True, "WIDTH (yd)"),
+    ("327n", 6, 6, True, "HEIGHT (in)"),
+    ("328n", 6, 6, True, "HEIGHT (ft)"),
+    ("329n", 6, 6, True, "HEIGHT (yd)"),
+    ("330n", 6, 6, True, "GROSS WEIGHT (kg)"),
+    ("331n", 6, 6, True, "LENGTH (m), log"),
+    ("332n", 6, 6, True, "WIDTH (m), log"),
+    ("333n", 6, 6, True, "HEIGHT (m), log"),
+    ("334n", 6, 6, True, "AREA (m2), log"),
+    ("335n", 6, 6, True, "VOLUME (l), log"),
+    ("336n", 6, 6, True, "VOLUME (m3), log"),
+    ("337n", 6, 6, True, "KG PER m2"),
+    ("340n", 6, 6, True, "GROSS WEIGHT (lb)"),
+    ("341n", 6, 6, True, "LENGTH (in), log"),
+    ("342n", 6, 6, True, "LENGTH (ft), log"),
+    ("343n", 6, 6, True, "LENGTH (yd), log"),
+    ("344n", 6, 6, True, "WIDTH (in), log"),
+    ("345n", 6, 6, True, "WIDTH (ft), log"),
+    ("346n", 6, 6, True, "WIDTH (yd), log"),
+    ("347n", 6, 6, True, "HEIGHT (in), log"),
+    ("348n", 6, 6, True, "HEIGHT (ft), log"),
+    ("349n", 6, 6, True, "HEIGHT (yd), log"),
+    ("350n", 6, 6, True, "AREA (in2)"),
+    ("351n", 6, 6, True, "AREA (ft2)"),
+    ("352n", 6, 6, True, "AREA (yd2)"),
+    ("353n", 6, 6, True, "AREA (in2), log"),
+    ("354n", 6, 6, True, "AREA (ft2), log"),
+    ("355n", 6, 6, True, "AREA (yd2), log"),
+    ("356n", 6, 6, True, "NET WEIGHT (t oz)"),
+    ("357n", 6, 6, True, "NET VOLUME (oz)"),
+    ("360n", 6, 6, True, "NET VOLUME (qt)"),
+    ("361n", 6, 6, True, "NET VOLUME (gal.)"),
+    ("362n", 6, 6, True, "VOLUME (qt), log"),
+    ("363n", 6, 6, True, "VOLUME (gal.), log"),
+    ("364n", 6, 6, True, "VOLUME (in3)"),
+    ("365n", 6, 6, True, "VOLUME (ft3)"),
+    ("366n", 6, 6, True, "VOLUME (yd3)"),
+    ("367n", 6, 6, True, "VOLUME (in3), log"),
+    ("368n", 6, 6, True, "VOLUME (ft3), log"),
+    ("369n", 6, 6, True, "VOLUME (yd3), log"),
+    ("37", 1, 8, True, "COUNT"),
+    ("390n", 1, 15, True, "AMOUNT"),
+    ("391n", 4, 18, True, "AMOUNT"),
+    ("392n", 1, 15, True, "PRICE"),
+    ("393n", 4, 18, True, "PRICE"),
+    ("394n", 4, 4, True, "PRCNT OFF"),
+    ("395n", 6, 6, True, "PRICE/UoM"),
+    ("400", 1, 30, False, "ORDER NUMBER"),
+    ("401", 1, 30, False, "GINC"),
+    ("402", 17, 17, True, "GSIN"),
+    ("403", 1, 30, False, "ROUTE"),
+    ("410", 13, 13, True, "SHIP TO LOC"),
+    ("411", 13, 13, True, "BILL TO"),
+    ("412", 13, 13, True, "PURCHASE FROM"),
+    ("413", 13, 13, True, "SHIP FOR LOC"),
+    ("414", 13, 13, True, "LOC No."),
+    ("415", 13, 13, True, "PAY TO"),
+    ("416", 13, 13, True, "PROD/SERV LOC"),
+    ("417", 13, 13, True, "PARTY"),
+    ("420", 1, 20, False, "SHIP TO POST"),
+    ("421", 4, 12, False, "SHIP TO POST"),
+    ("422", 3, 3, True, "ORIGIN"),
+    ("423", 3, 15, True, "COUNTRY - INITIAL PROCESS."),
+    ("424", 3, 3, True, "COUNTRY - PROCESS."),
+    ("425", 3, 15, True, "COUNTRY - DISASSEMBLY"),
+    ("426", 3, 3, True, "COUNTRY - FULL PROCESS"),
+    ("427", 1, 3, False, "ORIGIN SUBDIVISION"),
+    ("7001", 13, 13, True, "NSN"),
+    ("7002", 1, 30, False, "MEAT CUT"),
+    ("7003", 10, 10, True, "EXPIRY TIME"),
+    ("7004", 1, 4, True, "ACTIVE POTENCY"),
+    ("7005", 1, 12, False, "CATCH AREA"),
+    ("7006", 6, 6, True, "FIRST FREEZE DATE"),
+    ("7007", 6, 12, True, "HARVEST DATE"),
+    ("7008", 1, 3, False, "AQUATIC SPECIES"),
+    ("7009", 1, 10, False, "FISHING GEAR TYPE"),
+    ("7010", 1, 2, False, "PROD METHOD"),
+    ("7020", 1, 20, False, "REFURB LOT"),
+    ("7021", 1, 20, False, "FUNC STAT"),
+    ("7022", 1, 20, False, "REV STAT"),
+    ("7023", 1, 30, False, "GIAI - ASSEMBLY"),
+    ("703n", 4, 30, False, "PROCESSOR #"),
+    ("710", 1, 20, False, "NHRN PZN"),
+    ("711", 1, 20, False, "NHRN CIP"),
+    ("712", 1, 20, False, "NHRN CN"),
+    ("713", 1, 20, False, "NHRN DRN"),
+    ("714", 1, 20, False, "NHRN AIM"),
+    ("715", 1, 20, False, "NHRN NDC"),
+    ("7240", 1, 20, False, "PROTOCOL"),
+    ("8001", 14, 14, True, "DIMENSIONS"),
+    ("8002", 1, 20, False, "CMT No."),
+    ("8003", 15, 30, False, "GRAI"),
+    ("8004", 1, 30, False, "GIAI"),
+    ("8005", 6, 6, True, "PRICE PER UNIT"),
+    ("8006", 18, 18, True, "ITIP"),
+    ("8007", 1, 34, False, "IBAN"),
+    ("8008", 8, 12, True, "PROD TIME"),
+    ("8009", 1, 50, False, "OPTSEN"),
+    ("8010", 1, 30, False, "CPID"),
+    ("8011", 1, 12, True, "CPID SERIAL"),
+    ("8012", 1, 20, False, "VERSION"),
+    ("8013", 1, 25, False, "GMN"),
+    ("8017", 18, 18, True, "GSRN - PROVIDER"),
+    ("8018", 18, 18, True, "GSRN - RECIPIENT"),
+    ("8019", 1, 10, True, "SRIN"),
+    ("8020", 1, 25, False, "REF No."),
+    ("8026", 18, 18, True, "ITIP CONTENT"),
+    ("8110", 1, 70, False, "-"),
+    ("8111", 4, 4, True, "POINTS"),
+    ("8112", 1, 70, False, "-"),
+    ("8200", 1, 70, False, "PRODUCT URL"),
+    ("90", 1, 30, False, "INTERNAL"),
+    ("91", 1, 90, False, "INTERNAL"),
+    ("92", 1, 90, False, "INTERNAL"),
+    ("93", 1, 90, False, "INTERNAL"),
+    ("94", 1, 90, False, "INTERNAL"),
+    ("95", 1, 90, False, "INTERNAL"),
+    ("96", 1, 90, False, "INTERNAL"),
+    ("97", 1, 90, False, "INTERNAL"),
+    ("98", 1, 90, False, "INTERNAL"),
+    ("99", 1, 90, False, "INTERNAL"),
+)
+
+class GS1Parser(object):
+    """
+    GS1Parser
+
+    Parse GS1 element strings in one pass over the payload. The AI
+    table is compiled into a prefix trie keyed by digit, so each AI is
+    found with two to four dict lookups. Values of predefined length
+    AIs are sliced off directly; other values run to the next FNC1
+    (GS) or the end of the payload, and their length is checked
+    against the table.
+
+    :param extra:       More (AI, shortest, longest, all digits, title)
+                        entries, for AIs missing from AI_TABLE. An entry
+                        replaces the AI_TABLE entry with the same AI.
+
+    :return:            The GS1Parser object.
+    :rtype:             Object
+    """
+    def __init__(self, extra = ()):
+        entries = {}
+        for ai, min_length, max_length, numeric, title in tuple(AI_TABLE) + tuple(extra):
+            if ai.endswith("n"):
+                for digit in "0123456789":
+                    entries[ai[:-1] + digit] = (min_length, max_length, numeric, title)
+            else:
+                entries[ai] = (min_length, max_length, numeric, title)
+
+        self._titles = {}
+        self._trie = {}
+        for ai, (min_length, max_length, numeric, title) in entries.items():
+            if not (2 <= len(ai) <= 4 and ai.isdigit()):
+                raise ValueError("invalid Application Identifier: %r" % (ai,))
+            predefined = ai[:2] in PREDEFINED_PREFIXES
+            if predefined and min_length != max_length:
+                raise ValueError("AI (%s) has a predefined length" % ai)
+
+            node = self._trie
+            for digit in ai[:-1]:
+                node = node.setdefault(digit, {})
+                if node.__class__ is tuple:
+                    raise ValueError("AI (%s) starts with another AI" % ai)
+            if ai[-1] in node:
+                raise ValueError("AI (%s) is a prefix of another AI" % ai)
+            node[ai[-1]] = (ai, min_length, max_length, numeric, predefined)
+            self._titles[ai] = title
+
+    # --------------------------------------------------------
+    # parse(payload)
+    #
+    # Split a payload into its element strings.
+    def parse(self, payload):
+        """
+            :param payload: a str or bytes holding GS1 element strings,
+                optionally after a GS1 AIM symbology identifier (such
+                as "]d2") or a leading FNC1, and before a line ending
+            :return: AI to value, in the order they appear
+            :rtype: dict
+            :raises ValueError: if the payload is not valid GS1 element
+                strings
+        """
+        if isinstance(payload, (bytes, bytearray)):
+            payload = payload.decode("latin-1")
+
+        end = len(payload)
+        while end and payload[end - 1] in "\r\n":
+            end -= 1
+        pos = 3 if payload[:3] in GS1_AIM_IDS else 0
+        if payload[pos:pos + 1] == GS:
+            pos += 1
+        if pos >= end:
+            raise ValueError("no element strings")
+
+        trie = self._trie
+        elements = {}
+        while pos < end:
+            # Walk the trie to the AI; AIs are two to four digits
+            start = pos
+            node = trie
+            while True:
+                node = node.get(payload[pos]) if pos < end else None
+                if node is None:
+                    raise ValueError("unknown Application Identifier %r at position %d" % (
+                        payload[start:start + 4], start))
+                pos += 1
+                if node.__class__ is tuple:
+                    break
+            ai, min_length, max_length, numeric, predefined = node
+
+            if predefined:
+                value_end = pos + max_length
+                if value_end > end:
+                    raise ValueError("AI (%s) needs %d characters" % (ai, max_length))
+                value = payload[pos:value_end]
+                pos = value_end
+
+                # FNC1 after a predefined length value is allowed
+                if pos < end and payload[pos] == GS:
+                    pos += 1
+            else:
+                value_end = payload.find(GS, pos, end)
+                if value_end < 0:
+                    value_end = end
+                value = payload[pos:value_end]
+                pos = value_end + 1
+                if not min_length <= len(value) <= max_length:
+                    raise ValueError("AI (%s) takes %d to %d characters, got %d" % (
+                        ai, min_length, max_length, len(value)))
+
+            if numeric and not (value.isdigit() and value.isascii()):
+                raise ValueError("AI (%s) takes digits only, got %r" % (ai, value))
+            if elements.setdefault(ai, value) != value:
+                raise ValueError("AI (%s) appears twice with different values" % ai)
+        return elements
+
+    # --------------------------------------------------------
+    # parse_scan(barcode)
+    #
+    # Parse a scan if it is marked as GS1.
+    def parse_scan(self, barcode):
+        """
+            Parse a barcode when it carries a GS1 marker: a GS1 AIM
+            symbology identifier, an FNC1 (GS) anywhere in the
+            payload, or a GS1-128 or GS1 DataBar Code ID. Other
+            barcodes, such as a plain EAN-13 that happens to start
+            with a valid AI, are left alone; call parse() for those.
+
+            :param barcode: a str, bytes or ScanResult
+            :return: AI to value, or None if the barcode is not
+                marked as GS1 or does not parse
+            :rtype: dict
+        """
+        payload = getattr(barcode, "payload", barcode)
+        if isinstance(payload, (bytes, bytearray)):
+            payload = payload.decode("latin-1")
+
+        if (payload[:3] not in GS1_AIM_IDS and GS not in payload and
+                getattr(barcode, "symbology", None) not in GS1_SYMBOLOGIES):
+            return None
+        try:
+            return self.parse(payload)
+        except ValueError:
+            return None
+
+    # --------------------------------------------------------
+    # title(ai)
+    #
+    # The GS1 data title of an AI.
+    def title(self, ai):
+        """
+            :param ai: an Application Identifier, such as "01"
+            :return: its data title, such as "GTIN", or None if it is
+                not in the table
+            :rtype: str
+        """
+        return self._titles.get(ai)
+
+_PARSER = GS1Parser()
+
+# --------------------------------------------------------
+# parse_gs1(payload)
+#
+# Split a payload into its element strings with the standard table.
+def parse_gs1(payload):
+    """
+        See GS1Parser.parse().
+
+        :param payload: a str or bytes holding GS1 element strings
+        :return: AI to value, in the order they appear
+        :rtype: dict
+        :raises ValueError: if the payload is not valid GS1 element
+            strings
+    """
+    return _PARSER.parse(payload)
+
+# --------------------------------------------------------
+# parse_scan(barcode)
+#
+# Parse a scan with the standard table if it is marked as GS1.
+def parse_scan(barcode):
+    """
+        See GS1Parser.parse_scan().
+
+        :param barcode: a str, bytes or ScanResult
+        :return: AI to value, or None
+        :rtype: dict
+    """
+    return _PARSER.parse_scan(barcode)
@@ -0,0 +1,402 @@
+#-----------------------------------------------------------------------------
+# de2120_lookup_cache.py
+#
+# Cache product lookups for barcodes read by the DE2120 Barcode Scanner,
+# with LRU eviction, expiry and single-flight misses.
+#
+#------------------------------------------------------------------------
+# Written by SparkFun Electronics, October 2026
+#
+# Do you like this library? Help support SparkFun. Buy a board!
+#==================================================================================
+# Copyright (c) 2026 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#==================================================================================
+
+
+"""
+de2120_lookup_cache
+============
+Resolve scanned codes to product records through a bounded cache.
+
+::
+
+    resolver = SqliteResolver("products.db", "SELECT * FROM products WHERE code = ?")
+    cache = LookupCache(resolver, ttl=300)
+    cache.load_csv("products.csv", key="code")
+
+    processor = ScanProcessor(cache.get, callback=on_product, executor="thread")
+    my_scanner.start_listening(callback=processor)
+
+"""
+#-----------------------------------------------------------------------------------
+
+import collections
+import csv
+import sqlite3
+import threading
+import time
+
+# Entries inserted per lock hold while warming up
+_WARM_CHUNK = 1000
+
+def _code(barcode):
+    # The payload of a str, bytes or ScanResult, without the line
+    # ending. Other keys, such as INTEGER columns, go through str().
+    barcode = getattr(barcode, "payload", barcode)
+    if isinstance(barcode, (bytes, bytearray)):
+        barcode = barcode.decode("latin-1")
+    elif not isinstance(barcode, str):
+        barcode = str(barcode)
+    return barcode.rstrip("\r\n")
+
+class _Flight(object):
+    # One resolver call, which concurrent misses of its code wait on
+    __slots__ = ("done", "record", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.record = None
+        self.error = None
+
+class LookupCache(object):
+    """
+    LookupCache
+
+    Put a bounded cache in front of resolver, a function that takes a
+    code and returns its record, or None if there is no such product.
+    Records are kept for ttl seconds and "not found" answers for
+    negative_ttl seconds, so repeated scans of an unknown code do not
+    reach the resolver either. Past maxsize codes, the least recently
+    used is evicted.
+
+    Concurrent misses of one code share a single resolver call: the
+    first caller runs it and the others wait for its answer. If the
+    resolver raises, every waiting caller gets the exception and
+    nothing is cached.
+
+    The cache is callable, so it can be a stage on the scan stream:
+    called with a barcode, it looks the code up and passes (barcode,
+    record) to callback. Lookups run on the calling thread; to keep a
+    slow resolver away from the serial reader, run get() in a
+    de2120_pipeline.ScanProcessor with executor="thread".
+
+    :param resolver:        Called with the code, as a str, on a miss.
+                            Returns the record, or None if not found.
+    :param maxsize:         The most codes kept, found or not.
+    :param ttl:             How long a record is kept, in seconds. None
+                            keeps it until it is evicted.
+    :param negative_ttl:    How long a "not found" answer is kept, in
+                            seconds. 0 turns negative caching off.
+    :param callback:        Called with (barcode, record) when the cache
+                            is called as a stage.
+
+    :return:                The LookupCache object.
+    :rtype:                 Object
+    """
+    def __init__(self, resolver, maxsize = 10000, ttl = 300.0, negative_ttl = 30.0,
+                 callback = None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        self.resolver = resolver
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.callback = callback
+
+        # Counters, see stats()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.errors = 0
+
+        # code -> (record, expires_at), least recently used first
+        self._entries = collections.OrderedDict()
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, barcode):
+        record = self.get(barcode)
+        if self.callback is not None:
+            self.callback(barcode, record)
+        return record
+
+    def __len__(self):
+        return len(self._entries)
+
+    # --------------------------------------------------------
+    # get(barcode)
+    #
+    # Look a code up, calling the resolver on a miss.
+    def get(self, barcode):
+        """
+            :param barcode: the code, as a str, bytes or ScanResult; a
+                trailing line ending is ignored
+            :return: the record, or None if the resolver has none
+            :raises Exception: whatever the resolver raised
+        """
+        code = _code(barcode)
+        with self._lock:
+            entry = self._entries.get(code)
+            if entry is not None:
+                record, expires_at = entry
+                if expires_at is None or time.monotonic() < expires_at:
+                    self._entries.move_to_end(code)
+                    if record is None:
+                        self.negative_hits += 1
+                    else:
+                        self.hits += 1
+                    return record
+                del self._entries[code]
+                self.expirations += 1
+
+            flight = self._flights.get(code)
+            leader = flight is None
+            if leader:
+                flight = self._flights[code] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.record
+
+        try:
+            flight.record = self.resolver(code)
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                # invalidate() or clear() during the call drops the
+                # flight, and with it the stale answer
+                if self._flights.get(code) is flight:
+                    del self._flights[code]
+                    if flight.error is None:
+                        ttl = self.ttl if flight.record is not None else self.negative_ttl
+                        if ttl != 0:
+                            self._store(code, flight.record, ttl)
+                if flight.error is not None:
+                    self.errors += 1
+            flight.done.set()
+        return flight.record
+
+    # --------------------------------------------------------
+    # put(barcode, record)
+    #
+    # Cache a record without asking the resolver.
+    def put(self, barcode, record):
+        """
+            :param barcode: the code, as a str, bytes or ScanResult
+            :param record: its record; None caches "not found"
+        """
+        code = _code(barcode)
+        with self._lock:
+            self._store(code, record, self.ttl if record is not None else self.negative_ttl)
+
+    # --------------------------------------------------------
+    # warm(items)
+    #
+    # Bulk load records.
+    def warm(self, items):
+        """
+            Cache many records at once, for example the whole product
+            table at start-up. Records get the usual ttl. Past
+            maxsize, the first ones loaded are evicted.
+
+            :param items: an iterable of (code, record) pairs. Codes
+                that are not str, bytes or ScanResult are converted
+                with str().
+            :return: the number of records loaded
+            :rtype: int
+        """
+        count = 0
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) == _WARM_CHUNK:
+                count += self._warm_chunk(chunk)
+                chunk = []
+        return count + self._warm_chunk(chunk)
+
+    # --------------------------------------------------------
+    # load_csv(path, key, encoding)
+    #
+    # Bulk load records from a CSV file.
+    def load_csv(self, path, key = "code", encoding = "utf-8"):
+        """
+            Warm the cache from a CSV file with a header row. Each row
+            becomes a record: a dict of column name to value.
+
+            :param path: the CSV file
+            :param key: the column holding the code
+            :param encoding: the file encoding
+            :return: the number of records loaded
+            :rtype: int
+        """
+        with open(path, newline="", encoding=encoding) as f:
+            reader = csv.DictReader(f)
+            if key not in (reader.fieldnames or ()):
+                raise ValueError("no %r column in %s" % (key, path))
+            return self.warm((row[key], row) for row in reader)
+
+    # --------------------------------------------------------
+    # load_sqlite(path, query, key)
+    #
+    # Bulk load records from an SQLite database.
+    def load_sqlite(self, path, query = "SELECT * FROM products", key = "code"):
+        """
+            Warm the cache from an SQLite query. Each row becomes a
+            record: a dict of column name to value.
+
+            :param path: the database file
+            :param query: the query returning the records
+            :param key: the column holding the code
+            :return: the number of records loaded
+            :rtype: int
+        """
+        connection = sqlite3.connect(path)
+        try:
+            cursor = connection.execute(query)
+            columns = [column[0] for column in cursor.description]
+            if key not in columns:
+                raise ValueError("no %r column in the query result" % (key,))
+            index = columns.index(key)
+            return self.warm((row[index], dict(zip(columns, row))) for row in cursor)
+        finally:
+            connection.close()
+
+    # --------------------------------------------------------
+    # invalidate(barcode)
+    #
+    # Forget one code.
+    def invalidate(self, barcode):
+        """
+            Drop a code, so the next lookup asks the resolver again.
+            A resolver call already running for it is not cached.
+
+            :param barcode: the code, as a str, bytes or ScanResult
+        """
+        code = _code(barcode)
+        with self._lock:
+            self._entries.pop(code, None)
+            self._flights.pop(code, None)
+
+    # --------------------------------------------------------
+    # clear()
+    #
+    # Forget every code.
+    def clear(self):
+        """
+            Drop every cached code. Counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._flights.clear()
+
+    # --------------------------------------------------------
+    # stats()
+    #
+    # Counters for monitoring.
+    def stats(self):
+        """
+            :return: hits on records, hits on "not found" answers,
+                misses (resolver calls), lookups that waited on
+                another caller's miss, evictions, expirations,
+                resolver errors, the number of cached codes, and the
+                hit ratio over all lookups
+            :rtype: dict
+        """
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "errors": self.errors,
+                "size": len(self._entries),
+                "hit_ratio": (self.hits + self.negative_hits) / float(lookups) if lookups else 0.0,
+            }
+
+    def _warm_chunk(self, chunk):
+        with self._lock:
+            for code, record in chunk:
+                self._store(_code(code), record, self.ttl)
+        return len(chunk)
+
+    def _store(self, code, record, ttl):
+        # Called with the lock held
+        entries = self._entries
+        entries[code] = (record, None if ttl is None else time.monotonic() + ttl)
+        entries.move_to_end(code)
+        while len(entries) > self.maxsize:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+class SqliteResolver(object):
+    """
+    SqliteResolver
+
+    A LookupCache resolver that reads records from a local SQLite
+    database, for tests and small deployments. Each record is a dict
+    of column name to value. Lookups from several threads share one
+    connection and run one at a time.
+
+    :param path:            The database file.
+    :param query:           The query for one code, with a single ?
+                            parameter.
+
+    :return:                The SqliteResolver object.
+    :rtype:                 Object
+    """
+    def __init__(self, path, query = "SELECT * FROM products WHERE code = ?"):
+        self.path = path
+        self.query = query
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def __call__(self, code):
+        with self._lock:
+            cursor = self._connection.execute(self.query, (code,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([column[0] for column in cursor.description], row))
+
+    # --------------------------------------------------------
+    # close()
+    #
+    # Close the database.
+    def close(self):
+        """
+            Close the database connection.
+        """
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,424 @@
+#-----------------------------------------------------------------------------
+# de2120_pipeline.py
+#
+# Run CPU-heavy per-scan work for the DE2120 Barcode Scanner on a pool of
+# processes or threads, off the serial reader thread.
+#
+#------------------------------------------------------------------------
+# Written by SparkFun Electronics, October 2026
+#
+# Do you like this library? Help support SparkFun. Buy a board!
+#==================================================================================
+# Copyright (c) 2026 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#==================================================================================
+
+"""
+de2120_pipeline
+============
+Fan per-scan work out to a process or thread pool in micro-batches.
+
+::
+
+    def check(barcode):
+        ...  # CPU-heavy work; must be importable for a process pool
+
+    processor = ScanProcessor(check, callback=on_checked)
+    my_scanner.start_listening(callback=processor)
+    ...
+    my_scanner.stop_listening()
+    processor.close()
+
+"""
+#-----------------------------------------------------------------------------------
+
+import concurrent.futures
+import functools
+import queue
+import threading
+import time
+
+# ScanProcessor's queue parameter hides the module in __init__()
+_queue_module = queue
+
+def _run_batch(func, barcodes):
+    """
+        Worker side: apply func to each barcode of a batch.
+
+        :return: (started, finished, results) with monotonic times,
+            and one (ok, value) pair per barcode; value is the
+            exception when ok is false
+        :rtype: tuple
+    """
+    started = time.monotonic()
+    results = []
+    for barcode in barcodes:
+        try:
+            results.append((True, func(barcode)))
+        except Exception as exc:
+            results.append((False, exc))
+    return started, time.monotonic(), results
+
+class _StageTimer(object):
+    """
+    Count, total and largest of one pipeline stage's latencies.
+    """
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds, count = 1):
+        self.count += count
+        self.total += seconds * count
+        if seconds > self.max:
+            self.max = seconds
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+        }
+
+class ScanProcessor(object):
+    """
+    ScanProcessor
+
+    Run func on every barcode in a pool of worker processes (or
+    threads), keeping the serial reader free to read. put() only
+    queues the barcode. A dispatcher thread groups barcodes into
+    micro-batches of up to batch_size, or whatever arrived within
+    batch_interval seconds, and submits each batch as one task, so
+    the cost of sending work to another process is paid per batch
+    rather than per scan. A delivery thread hands each result to
+    callback, or puts it into queue, as (barcode, result).
+
+    At most max_in_flight batches are submitted or waiting to be
+    delivered at once, and at most max_pending barcodes wait to be
+    batched; beyond that put() blocks. With ordered on, results are
+    delivered in the order the barcodes were put; otherwise as soon
+    as each batch finishes.
+
+    If func, callback or the queue's put() raises, the barcode is
+    counted in stats()["errors"] and error_callback, if given, is
+    called with (barcode, exception). Exceptions from error_callback
+    itself are ignored, so delivery always carries on.
+
+    stats() reports mean and largest latency per stage, in seconds:
+    "queued" (put() to submit), "pool_wait" (submit to a worker
+    starting the batch), "work" (the batch running), "return" (the
+    batch finishing to its results reaching the delivery thread),
+    "reorder" (waiting behind earlier batches when ordered) and
+    "total" (put() to delivery).
+
+    With a process pool, func and the barcodes must be picklable:
+    define func at module level.
+
+    :param func:            The function to apply to each barcode.
+    :param callback:        Called with (barcode, result) from the
+                            delivery thread.
+    :param queue:           Object with a put() method that each
+                            (barcode, result) is put into.
+    :param executor:        "process" (default) or "thread" to create
+                            a pool, or a concurrent.futures.Executor
+                            to use. A pool passed in is not shut down
+                            by close().
+    :param workers:         Pool size for a pool created here. None
+                            lets concurrent.futures choose.
+    :param batch_size:      The most barcodes per batch.
+    :param batch_interval:  The longest a barcode waits for its batch
+                            to fill, in seconds.
+    :param max_in_flight:   The most batches submitted but not yet
+                            delivered.
+    :param max_pending:     The most barcodes waiting to be batched.
+    :param ordered:         Deliver results in put() order.
+    :param error_callback:  Called with (barcode, exception) when
+                            func raises.
+
+    :return:                The ScanProcessor object.
+    :rtype:                 Object
+    """
+    PROCESS = "process"
+    THREAD = "thread"
+
+    STAGES = ("queued", "pool_wait", "work", "return", "reorder", "total")
+
+    def __init__(self, func, callback = None, queue = None, executor = PROCESS, workers = None,
+                 batch_size = 32, batch_interval = 0.005, max_in_flight = None, max_pending = 10000,
+                 ordered = True, error_callback = None):
+        if executor == self.PROCESS:
+            executor = concurrent.futures.ProcessPoolExecutor(workers)
+            self._owns_executor = True
+        elif executor == self.THREAD:
+            executor = concurrent.futures.ThreadPoolExecutor(workers)
+            self._owns_executor = True
+        elif isinstance(executor, concurrent.futures.Executor):
+            self._owns_executor = False
+        else:
+            raise ValueError("executor must be \"process\", \"thread\" or an Executor")
+
+        if max_in_flight is None:
+            # Enough to keep every worker busy while results go out
+            max_in_flight = 2 * (getattr(executor, "_max_workers", None) or 4)
+
+        self.func = func
+        self.callback = callback
+        self.queue = queue
+        self.executor = executor
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.max_in_flight = max_in_flight
+        self.ordered = ordered
+        self.error_callback = error_callback
+
+        self.submitted = 0
+        self.delivered = 0
+        self.errors = 0
+        self.batches = 0
+        self._timers = dict((stage, _StageTimer()) for stage in self.STAGES)
+
+        self._input = _queue_module.Queue(max_pending)
+        self._done = _queue_module.Queue()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._in_flight = 0
+        self._idle = threading.Condition()
+        self._closed = False
+
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="ScanProcessor dispatch")
+        self._dispatcher.daemon = True
+        self._dispatcher.start()
+        self._deliverer = threading.Thread(target=self._deliver_loop, name="ScanProcessor delivery")
+        self._deliverer.daemon = True
+        self._deliverer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __call__(self, barcode):
+        self.put(barcode)
+
+    # --------------------------------------------------------
+    # put(barcode, block, timeout)
+    #
+    # Queue a barcode for processing.
+    def put(self, barcode, block = True, timeout = None):
+        """
+            :param barcode: the barcode to process
+            :param block: wait when max_pending barcodes are already
+                waiting
+            :param timeout: the longest to wait, in seconds
+            :raises queue.Full: if there was no room
+        """
+        if self._closed:
+            raise ValueError("the processor is closed")
+        with self._idle:
+            self.submitted += 1
+        try:
+            self._input.put((barcode, time.monotonic()), block, timeout)
+        except queue.Full:
+            with self._idle:
+                self.submitted -= 1
+                self._idle.notify_all()
+            raise
+
+    # --------------------------------------------------------
+    # flush(timeout)
+    #
+    # Wait until every barcode put so far is delivered.
+    def flush(self, timeout = None):
+        """
+            :param timeout: the longest to wait, in seconds
+            :return: true if everything was delivered
+            :rtype: bool
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self.delivered + self.errors >= self.submitted, timeout)
+
+    # --------------------------------------------------------
+    # close()
+    #
+    # Finish the queued work and stop.
+    def close(self):
+        """
+            Process and deliver every queued barcode, stop the
+            dispatcher and delivery threads and shut down the pool if
+            it was created here.
+        """
+        if self._closed:
+            return
+
+        self._closed = True
+        self._input.put(None)
+        self._dispatcher.join()
+        self._deliverer.join()
+        if self._owns_executor:
+            self.executor.shutdown()
+
+    # --------------------------------------------------------
+    # stats()
+    #
+    # Counters and per-stage latencies.
+    def stats(self):
+        """
+            :return: barcodes put, delivered and failed, batches run,
+                batches in flight, and "latency": count, mean and max
+                in seconds for each stage
+            :rtype: dict
+        """
+        return {
+            "submitted": self.submitted,
+            "delivered": self.delivered,
+            "errors": self.errors,
+            "batches": self.batches,
+            "in_flight": self._in_flight,
+            "pending": self._input.qsize(),
+            "latency": dict((stage, timer.snapshot()) for stage, timer in self._timers.items()),
+        }
+
+    # --------------------------------------------------------
+    # _dispatch_loop()
+    #
+    # Dispatcher thread: gather micro-batches and submit them.
+    def _dispatch_loop(self):
+        get = self._input.get
+        sequence = 0
+        stopping = False
+        while not stopping:
+            item = get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.batch_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = get(True, remaining) if remaining > 0 else get(False)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            # Bound the work in flight; blocks while the pool is behind
+            self._slots.acquire()
+            with self._idle:
+                self._in_flight += 1
+            submitted_at = time.monotonic()
+            queued = self._timers["queued"]
+            for barcode, put_at in batch:
+                queued.add(submitted_at - put_at)
+
+            try:
+                future = self.executor.submit(_run_batch, self.func, [barcode for barcode, put_at in batch])
+            except Exception as exc:
+                self._done.put((sequence, batch, submitted_at, None, exc, time.monotonic()))
+            else:
+                future.add_done_callback(functools.partial(self._batch_done, sequence, batch, submitted_at))
+            sequence += 1
+
+        self._done.put(("end", sequence))
+
+    def _batch_done(self, sequence, batch, submitted_at, future):
+        self._done.put((sequence, batch, submitted_at, future, None, time.monotonic()))
+
+    # --------------------------------------------------------
+    # _deliver_loop()
+    #
+    # Delivery thread: hand results over, in order if asked.
+    def _deliver_loop(self):
+        waiting = {}
+        next_sequence = 0
+        total = None
+        delivered_batches = 0
+        while total is None or delivered_batches < total:
+            entry = self._done.get()
+            if entry[0] == "end":
+                total = entry[1]
+                continue
+
+            if not self.ordered:
+                self._deliver_batch(entry)
+                delivered_batches += 1
+                continue
+
+            waiting[entry[0]] = entry
+            while next_sequence in waiting:
+                self._deliver_batch(waiting.pop(next_sequence))
+                next_sequence += 1
+                delivered_batches += 1
+
+    def _deliver_batch(self, entry):
+        sequence, batch, submitted_at, future, error, returned_at = entry
+        timers = self._timers
+        if error is None:
+            try:
+                started, finished, results = future.result()
+            except Exception as exc:
+                error = exc
+
+        if error is None:
+            timers["pool_wait"].add(started - submitted_at)
+            timers["work"].add(finished - started)
+            timers["return"].add(returned_at - finished)
+        else:
+            # The whole batch failed, for example a broken pool
+            results = [(False, error)] * len(batch)
+
+        delivered = 0
+        errors = 0
+        now = time.monotonic()
+        timers["reorder"].add(now - returned_at)
+        try:
+            for (barcode, put_at), (ok, value) in zip(batch, results):
+                if ok:
+                    try:
+                        if self.callback is not None:
+                            self.callback(barcode, value)
+                        if self.queue is not None:
+                            self.queue.put((barcode, value))
+                    except Exception as exc:
+                        # A failing consumer must not stop the delivery thread
+                        ok, value = False, exc
+                if ok:
+                    delivered += 1
+                else:
+                    errors += 1
+                    if self.error_callback is not None:
+                        try:
+                            self.error_callback(barcode, value)
+                        except Exception:
+                            pass
+                timers["total"].add(time.monotonic() - put_at)
+        finally:
+            with self._idle:
+                self.delivered += delivered
+                self.errors += errors
+                self.batches += 1
+                self._in_flight -= 1
+                self._idle.notify_all()
+            self._slots.release()
@@ -0,0 +1,633 @@
+#-----------------------------------------------------------------------------
+# de2120_simulator.py
+#
+# A simulated DE2120 Barcode Scanner on a pseudo-terminal, for testing
+# and load generation without hardware.
+#
+#------------------------------------------------------------------------
+# Written by SparkFun Electronics, October 2026
+#
+# Do you like this library? Help support SparkFun. Buy a board!
+#==================================================================================
+# Copyright (c) 2026 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#==================================================================================
+
+"""
+de2120_simulator
+============
+A simulated DE2120 Barcode Scanner for tests and benchmarks.
+
+The simulator opens a pseudo-terminal and answers on it the way the
+module answers on its serial port, so DE2120BarcodeScanner can be
+pointed at it unchanged. Linux and macOS only.
+
+Run it on its own with::
+
+    python -m de2120_simulator --rate 10 --link /tmp/de2120
+
+"""
+#-----------------------------------------------------------------------------------
+
+import argparse
+import collections
+import heapq
+import os
+import random
+import select
+import sys
+import termios
+import threading
+import time
+import tty
+
+import serial
+
+from de2120_barcode_scanner import DE2120BarcodeScanner
+
+_Scanner = DE2120BarcodeScanner
+
+class DE2120Simulator(object):
+    """
+    DE2120Simulator
+
+    A DE2120 on a pseudo-terminal. Open the port named by port_name,
+    or call port(), and talk to it as you would the module.
+
+    Command frames ("^_^" + command + argument + ".") are ACKed when
+    the command is known and its argument valid, and NACKed otherwise.
+    Accepted settings are kept in properties; DEFALT restores the
+    defaults, including 115200 baud. The connection probe is ACKed.
+
+    Barcodes are presented to the simulated imager rate times a
+    second, each interval shifted by up to +/- jitter seconds, and
+    written latency seconds after they are presented. SCAN presents
+    one more barcode and resumes the stream; SLEEP pauses it. scan()
+    presents a barcode directly. Output follows the 232UTF and CIDENA
+    settings.
+
+    The simulator runs at the baud rate set with 232BAD. When the
+    host's port is set to a different rate, commands go unanswered
+    and barcodes arrive as garbage, as on a real link. With pace on,
+    output is held to the line rate: 10 bits per byte at the current
+    baud rate.
+
+    :param barcodes:    The barcodes to present, cycled. Each item is
+                        a str, or a (code_id, str) tuple. Defaults to
+                        numbered codes, "SIM00000001" and up.
+    :param rate:        Barcodes presented per second. 0 (default)
+                        presents them only on SCAN or scan().
+    :param jitter:      Largest shift of each interval, in seconds.
+    :param latency:     Delay from presenting a barcode to writing it,
+                        in seconds.
+    :param baud:        The module's baud rate at start.
+    :param pace:        Hold output to the line rate.
+    :param code_id:     Code ID sent with plain str barcodes when
+                        CIDENA is on. Default "j" (Code 128).
+    :param suffix:      The bytes sent after each barcode.
+    :param properties:  Settings to start from, as
+                        {command: argument}, over the defaults.
+    :param nack:        Commands to NACK regardless, for testing
+                        error paths.
+    :param on_emit:     Called as on_emit(data, written_at) after each
+                        barcode is written, with written_at from
+                        time.monotonic().
+    :param on_command:  Called as on_command(command, argument, acked)
+                        for each command frame. command is None if it
+                        was not recognised.
+    :param seed:        Seed for the jitter, for repeatable runs.
+
+    :return:            The DE2120Simulator object.
+    :rtype:             Object
+    """
+    # Module settings after DEFALT
+    DEFAULTS = {
+        _Scanner.PROPERTY_BUZZER_FREQ: "2",
+        _Scanner.PROPERTY_DECODE_BEEP: "1",
+        _Scanner.PROPERTY_BOOT_BEEP: "1",
+        _Scanner.PROPERTY_FLASH_LIGHT: "1",
+        _Scanner.PROPERTY_AIM_LIGHT: "1",
+        _Scanner.PROPERTY_READING_AREA: "0",
+        _Scanner.PROPERTY_MIRROR_FLIP: "0",
+        _Scanner.PROPERTY_USB_DATA_FORMAT: "0",
+        _Scanner.PROPERTY_SERIAL_DATA_FORMAT: "0",
+        _Scanner.PROPERTY_INVOICE_MODE: "0",
+        _Scanner.PROPERTY_VIRTUAL_KEYBOARD: "1",
+        _Scanner.PROPERTY_COMM_MODE: "232",
+        _Scanner.PROPERTY_BAUD_RATE: "9",
+        _Scanner.PROPERTY_READING_MODE: "MAN",
+        _Scanner.PROPERTY_CONTINUOUS_MODE_INTERVAL: "1",
+        _Scanner.PROPERTY_MOTION_SENSITIVITY: "20",
+        _Scanner.PROPERTY_TRANSFER_CODE_ID: "0",
+        _Scanner.PROPERTY_KBD_CASE_CONVERSION: "0",
+    }
+
+    # Arguments each property accepts. Properties not listed take any
+    # non-empty argument.
+    VALID_ARGS = {
+        _Scanner.PROPERTY_BUZZER_FREQ: ("0", "1", "2", "3"),
+        _Scanner.PROPERTY_DECODE_BEEP: ("0", "1"),
+        _Scanner.PROPERTY_BOOT_BEEP: ("0", "1"),
+        _Scanner.PROPERTY_FLASH_LIGHT: ("0", "1"),
+        _Scanner.PROPERTY_AIM_LIGHT: ("0", "1"),
+        _Scanner.PROPERTY_READING_AREA: ("0", "1", "2", "3", "4"),
+        _Scanner.PROPERTY_MIRROR_FLIP: ("0", "1"),
+        _Scanner.PROPERTY_USB_DATA_FORMAT: ("0", "1"),
+        _Scanner.PROPERTY_SERIAL_DATA_FORMAT: ("0", "1", "2", "3"),
+        _Scanner.PROPERTY_INVOICE_MODE: ("0", "1"),
+        _Scanner.PROPERTY_VIRTUAL_KEYBOARD: ("0", "1"),
+        _Scanner.PROPERTY_COMM_MODE: ("KBD", "HID", "VIC", "232"),
+        _Scanner.PROPERTY_BAUD_RATE: tuple(_Scanner._BAUD_RATE_ARGS.values()),
+        _Scanner.PROPERTY_READING_MODE: ("MAN", "CNT", "MDH"),
+        _Scanner.PROPERTY_CONTINUOUS_MODE_INTERVAL: ("0", "1", "2", "3"),
+        _Scanner.PROPERTY_TRANSFER_CODE_ID: ("0", "1"),
+        _Scanner.PROPERTY_KBD_CASE_CONVERSION: ("0", "1", "2", "3"),
+    }
+
+    # Commands that take no argument. "\x04SPYFW" is the connection
+    # probe sent by is_connected().
+    COMMANDS = (
+        _Scanner.COMMAND_START_SCAN,
+        _Scanner.COMMAND_STOP_SCAN,
+        _Scanner.COMMAND_SET_DEFAULTS,
+        _Scanner.COMMAND_GET_VERSION,
+        chr(4) + "SPYFW",
+        _Scanner.PROPERTY_ENABLE_ALL_1D,
+        _Scanner.PROPERTY_DISABLE_ALL_1D,
+        _Scanner.PROPERTY_ENABLE_ALL_2D,
+        _Scanner.PROPERTY_DISABLE_ALL_2D,
+    )
+
+    # Longest names first, so a command is never matched by a prefix
+    # of a longer one
+    _NAMES = sorted(set(COMMANDS) | set(DEFAULTS) | set(VALID_ARGS), key=len, reverse=True)
+
+    _BAUD_RATES = dict((arg, rate) for rate, arg in _Scanner._BAUD_RATE_ARGS.items())
+
+    # termios speed constant for each baud rate
+    _SPEEDS = dict((getattr(termios, "B%d" % rate), rate) for rate in _Scanner.BAUD_RATES)
+
+    def __init__(self, barcodes = None, rate = 0, jitter = 0, latency = 0, baud = 115200,
+                 pace = True, code_id = "j", suffix = b"\r\n", properties = None, nack = (),
+                 on_emit = None, on_command = None, seed = None):
+        if baud not in _Scanner._BAUD_RATE_ARGS:
+            raise ValueError("unsupported baud rate: %r" % (baud,))
+
+        self.rate = rate
+        self.jitter = jitter
+        self.latency = latency
+        self.pace = pace
+        self.code_id = code_id
+        self.suffix = bytes(suffix)
+        self.nack = set(nack)
+        self.on_emit = on_emit
+        self.on_command = on_command
+
+        self.properties = dict(self.DEFAULTS)
+        self.properties[_Scanner.PROPERTY_BAUD_RATE] = _Scanner._BAUD_RATE_ARGS[baud]
+        if properties:
+            self.properties.update((cmd, str(arg)) for cmd, arg in properties.items())
+
+        # Counters, and the most recent commands as (command, argument)
+        self.commands = collections.deque(maxlen=1000)
+        self.acked = 0
+        self.nacked = 0
+        self.ignored = 0
+        self.emitted = 0
+
+        if barcodes is None:
+            self._barcodes = ("SIM%08d" % n for n in self._count())
+        else:
+            barcodes = list(barcodes)
+            if not barcodes:
+                raise ValueError("barcodes is empty")
+            self._barcodes = self._cycle(barcodes)
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._sequence = 0
+        self._streaming = rate > 0
+        self._next_present = None
+        self._rx = bytearray()
+        self._tx_free_at = 0.0
+        self._closed = False
+
+        # The slave end stays open here too, so reads on the master
+        # do not fail while no host has the port open
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self._set_host_baud(baud)
+        os.set_blocking(self._master, False)
+        self.port_name = os.ttyname(self._slave)
+
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+
+        self._thread = threading.Thread(target=self._run, name="DE2120Simulator")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # --------------------------------------------------------
+    # baud
+    #
+    # The module's current baud rate.
+    @property
+    def baud(self):
+        """
+            :return: the baud rate the simulated module is running at
+            :rtype: int
+        """
+        return self._BAUD_RATES[self.properties[_Scanner.PROPERTY_BAUD_RATE]]
+
+    # --------------------------------------------------------
+    # port(baud, timeout, **kwargs)
+    #
+    # Open the host side of the simulator.
+    def port(self, baud = None, timeout = 1, **kwargs):
+        """
+            Open a serial.Serial on the simulator.
+
+            :param baud: the host baud rate, default the module's
+            :param timeout: read timeout in seconds
+            :return: the open port
+            :rtype: serial.Serial
+        """
+        if baud is None:
+            baud = self.baud
+        return serial.Serial(self.port_name, baud, timeout=timeout, **kwargs)
+
+    # --------------------------------------------------------
+    # scan(barcode)
+    #
+    # Present a barcode to the simulated imager.
+    def scan(self, barcode = None):
+        """
+            Present a barcode now. It is written latency seconds
+            later.
+
+            :param barcode: a str or (code_id, str) tuple, or None for
+                the next of the simulator's barcodes
+        """
+        with self._lock:
+            self._present(time.monotonic(), barcode)
+        self._wake()
+
+    # --------------------------------------------------------
+    # close()
+    #
+    # Unplug the simulated module.
+    def close(self):
+        """
+            Stop the simulator and close the pseudo-terminal. A host
+            that still has the port open sees the device go away.
+        """
+        if self._closed:
+            return
+
+        self._closed = True
+        self._wake()
+        self._thread.join()
+        for fd in (self._master, self._slave, self._wake_r, self._wake_w):
+            os.close(fd)
+
+    # --------------------------------------------------------
+    # _run()
+    #
+    # Simulator thread: answer commands and write barcodes on time.
+    def _run(self):
+        while not self._closed:
+            with self._lock:
+                self._schedule_stream(time.monotonic())
+                timeout = self._next_deadline()
+            if timeout is not None:
+                timeout = max(0, timeout - time.monotonic())
+
+            readable = select.select([self._master, self._wake_r], [], [], timeout)[0]
+            if self._wake_r in readable:
+                self._clear_wake()
+            if self._closed:
+                break
+            if self._master in readable:
+                self._receive()
+
+            self._emit_due()
+
+    # --------------------------------------------------------
+    # _receive()
+    #
+    # Read and answer command frames from the host.
+    def _receive(self):
+        try:
+            data = os.read(self._master, 4096)
+        except (BlockingIOError, OSError):
+            return
+
+        if self._host_baud() != self.baud:
+            # The module cannot make sense of bytes at the wrong rate
+            self.ignored += 1
+            return
+
+        rx = self._rx
+        rx += data
+        while True:
+            start = rx.find(b"^_^")
+            if start < 0:
+                # Keep a possible partial header
+                del rx[:max(0, len(rx) - 2)]
+                return
+            end = rx.find(b".", start + 3)
+            if end < 0:
+                del rx[:start]
+                return
+
+            frame = bytes(rx[start + 3:end]).decode("latin-1")
+            del rx[:end + 1]
+            self._handle(frame)
+
+    # --------------------------------------------------------
+    # _handle(frame)
+    #
+    # Act on one command and send the ACK or NACK.
+    def _handle(self, frame):
+        cmd, arg = self._split(frame)
+        self.commands.append((cmd, arg))
+
+        acked = cmd is not None and cmd not in self.nack and self._valid(cmd, arg)
+        if self.on_command is not None:
+            self.on_command(cmd, arg, acked)
+
+        if not acked:
+            self.nacked += 1
+            self._write(bytes([_Scanner.DE2120_COMMAND_NACK]))
+            return
+
+        self.acked += 1
+        self._write(bytes([_Scanner.DE2120_COMMAND_ACK]))
+
+        # Settings change after the ACK goes out, so it is sent at
+        # the old baud rate
+        with self._lock:
+            if cmd == _Scanner.COMMAND_SET_DEFAULTS:
+                self.properties = dict(self.DEFAULTS)
+            elif cmd == _Scanner.COMMAND_START_SCAN:
+                self._streaming = self.rate > 0
+                self._present(time.monotonic(), None)
+            elif cmd == _Scanner.COMMAND_STOP_SCAN:
+                self._streaming = False
+                self._next_present = None
+            elif cmd in self.COMMANDS:
+                pass
+            else:
+                self.properties[cmd] = arg
+
+    # --------------------------------------------------------
+    # _split(frame)
+    #
+    # Split a frame into (command, argument); command is None if it
+    # is not recognised.
+    def _split(self, frame):
+        for name in self._NAMES:
+            if frame.startswith(name):
+                return name, frame[len(name):]
+        return None, frame
+
+    # --------------------------------------------------------
+    # _valid(cmd, arg)
+    #
+    # Check a command's argument.
+    def _valid(self, cmd, arg):
+        if cmd in self.COMMANDS:
+            return arg == ""
+        allowed = self.VALID_ARGS.get(cmd)
+        if allowed is None:
+            return arg != ""
+        return arg in allowed
+
+    # --------------------------------------------------------
+    # _present(now, barcode)
+    #
+    # Queue a barcode to be written latency seconds from now. Call
+    # with the lock held.
+    def _present(self, now, barcode):
+        if barcode is None:
+            barcode = next(self._barcodes)
+        self._sequence += 1
+        heapq.heappush(self._pending, (now + self.latency, self._sequence, barcode))
+
+    # --------------------------------------------------------
+    # _schedule_stream(now)
+    #
+    # Present every stream barcode that is due. Call with the lock
+    # held.
+    def _schedule_stream(self, now):
+        if not self._streaming or self.rate <= 0:
+            return
+
+        if self._next_present is None or self._next_present < now - 1.0:
+            # Starting, or too far behind to catch up
+            self._next_present = now
+
+        interval = 1.0 / self.rate
+        while self._next_present <= now:
+            self._present(self._next_present, None)
+            shift = self._random.uniform(-self.jitter, self.jitter) if self.jitter else 0
+            self._next_present += max(0.0, interval + shift)
+
+    # --------------------------------------------------------
+    # _next_deadline()
+    #
+    # When the thread next has work, or None to wait for commands.
+    def _next_deadline(self):
+        deadline = None
+        if self._pending:
+            deadline = self._pending[0][0]
+        if self._streaming and self._next_present is not None:
+            if deadline is None or self._next_present < deadline:
+                deadline = self._next_present
+        return deadline
+
+    # --------------------------------------------------------
+    # _emit_due()
+    #
+    # Write every barcode whose time has come.
+    def _emit_due(self):
+        while True:
+            with self._lock:
+                if not self._pending or self._pending[0][0] > time.monotonic():
+                    return
+                barcode = heapq.heappop(self._pending)[2]
+                data = self._encode(barcode)
+
+            if self._host_baud() != self.baud:
+                # Framing errors: the host reads nonsense, with no
+                # terminators
+                data = b"\xff" * len(data)
+            if not self._write(data):
+                return
+
+            self.emitted += 1
+            if self.on_emit is not None:
+                self.on_emit(data, time.monotonic())
+
+    # --------------------------------------------------------
+    # _encode(barcode)
+    #
+    # The bytes the module sends for a barcode. Call with the lock
+    # held.
+    def _encode(self, barcode):
+        if isinstance(barcode, tuple):
+            code_id, text = barcode
+        else:
+            code_id, text = self.code_id, barcode
+
+        if self.properties.get(_Scanner.PROPERTY_TRANSFER_CODE_ID) == "1" and code_id:
+            text = code_id + text
+
+        codec = _Scanner._DATA_FORMAT_CODECS[self.properties[_Scanner.PROPERTY_SERIAL_DATA_FORMAT]]
+        suffix = self.suffix
+        if codec.startswith("utf-16"):
+            suffix = suffix.decode("latin-1").encode(codec)
+        return text.encode(codec) + suffix
+
+    # --------------------------------------------------------
+    # _write(data)
+    #
+    # Write to the host, paced to the line rate.
+    def _write(self, data):
+        """
+            :return: false if the simulator closed before the data
+                was written
+            :rtype: bool
+        """
+        if self.pace:
+            # The host has the data once its last byte is on the wire
+            self._tx_free_at = max(self._tx_free_at, time.monotonic()) + len(data) * 10.0 / self.baud
+            if self._sleep_until(self._tx_free_at):
+                return False
+
+        view = memoryview(data)
+        while view:
+            try:
+                written = os.write(self._master, view)
+            except BlockingIOError:
+                # The host is not reading; wait for room
+                select.select([self._wake_r], [self._master], [])
+                if self._closed:
+                    return False
+                continue
+            except OSError:
+                return False
+            view = view[written:]
+        return True
+
+    # --------------------------------------------------------
+    # _sleep_until(deadline)
+    #
+    # Wait, waking early on close(). Returns true if closed.
+    def _sleep_until(self, deadline):
+        while not self._closed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if select.select([self._wake_r], [], [], remaining)[0]:
+                self._clear_wake()
+        return self._closed
+
+    def _wake(self):
+        try:
+            os.write(self._wake_w, b"\0")
+        except (BlockingIOError, OSError):
+            pass
+
+    def _clear_wake(self):
+        try:
+            while os.read(self._wake_r, 4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def _host_baud(self):
+        return self._SPEEDS.get(termios.tcgetattr(self._master)[4])
+
+    def _set_host_baud(self, baud):
+        attributes = termios.tcgetattr(self._slave)
+        attributes[4] = attributes[5] = getattr(termios, "B%d" % baud)
+        termios.tcsetattr(self._slave, termios.TCSANOW, attributes)
+
+    @staticmethod
+    def _count():
+        n = 0
+        while True:
+            n += 1
+            yield n
+
+    @staticmethod
+    def _cycle(items):
+        while True:
+            for item in items:
+                yield item
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="Simulate a DE2120 Barcode Scanner on a pseudo-terminal.")
+    parser.add_argument("--rate", type=float, default=1.0, help="barcodes per second (default 1, 0 for SCAN only)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="largest interval shift in seconds")
+    parser.add_argument("--latency", type=float, default=0.0, help="delay before each barcode is written, in seconds")
+    parser.add_argument("--baud", type=int, default=115200, help="starting baud rate")
+    parser.add_argument("--no-pace", action="store_true", help="write as fast as the host reads")
+    parser.add_argument("--barcode", action="append", help="a barcode to send, repeat for several")
+    parser.add_argument("--link", help="also make the port available at this path")
+    parser.add_argument("--verbose", action="store_true", help="print commands as they arrive")
+    args = parser.parse_args(argv)
+
+    on_command = None
+    if args.verbose:
+        on_command = lambda cmd, arg, acked: print("%s %r %r" % ("ACK " if acked else "NACK", cmd, arg))
+
+    simulator = DE2120Simulator(barcodes=args.barcode, rate=args.rate, jitter=args.jitter,
+                                latency=args.latency, baud=args.baud, pace=not args.no_pace,
+                                on_command=on_command)
+    if args.link:
+        if os.path.lexists(args.link):
+            os.remove(args.link)
+        os.symlink(simulator.port_name, args.link)
+    print("DE2120 simulator on %s" % (args.link or simulator.port_name))
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.close()
+        if args.link and os.path.islink(args.link):
+            os.remove(args.link)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
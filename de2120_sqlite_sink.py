@@ -0,0 +1,270 @@
+#-----------------------------------------------------------------------------
+# de2120_sqlite_sink.py
+#
+# Store scans from the DE2120 Barcode Scanner in SQLite, in batches, on a
+# background thread.
+#
+#------------------------------------------------------------------------
+# Written by SparkFun Electronics, October 2026
+#
+# Do you like this library? Help support SparkFun. Buy a board!
+#==================================================================================
+# Copyright (c) 2026 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#==================================================================================
+
+"""
+de2120_sqlite_sink
+============
+Write scans to an SQLite database in batched transactions.
+
+::
+
+    sink = SqliteScanSink("scans.db")
+    my_scanner.start_listening(callback=sink)
+    ...
+    my_scanner.stop_listening()
+    sink.close()
+
+"""
+#-----------------------------------------------------------------------------------
+
+import queue
+import sqlite3
+import threading
+import time
+
+from de2120_barcode_scanner import ScanResult
+
+class SqliteScanSink(object):
+    """
+    SqliteScanSink
+
+    Take scans from a scanner and insert them into an SQLite table on
+    a background thread. Rows are grouped into one transaction per
+    batch_size rows or per flush_interval seconds, whichever comes
+    first, and inserted with a single executemany() of one prepared
+    statement. The database runs in WAL mode, so readers are not
+    blocked while a batch commits.
+
+    Scans wait in a queue of at most max_pending entries. When the
+    database falls that far behind, put() blocks (or raises
+    queue.Full if block is false) instead of letting memory grow.
+
+    The sink is callable, so it can be passed straight to
+    DE2120BarcodeScanner.start_listening(callback=...). With
+    ScannerHub, call put(barcode, scanner_id) for each event.
+
+    Each row holds the wall clock time put() was called (scanned_at,
+    seconds since the epoch), the scanner id, the payload, and the
+    symbology and Code ID when the scan is a ScanResult.
+
+    :param path:            The database file.
+    :param table:           The table to insert into. It is created
+                            if it does not exist.
+    :param batch_size:      The most rows per transaction.
+    :param flush_interval:  The longest a scan waits before its batch
+                            is committed, in seconds.
+    :param max_pending:     The most scans waiting to be written.
+    :param synchronous:     The SQLite synchronous setting. NORMAL is
+                            safe with WAL; FULL also survives power
+                            loss of the last transactions.
+
+    :return:                The SqliteScanSink object.
+    :rtype:                 Object
+    """
+    def __init__(self, path, table = "scans", batch_size = 500, flush_interval = 0.1,
+                 max_pending = 10000, synchronous = "NORMAL"):
+        if not table.isidentifier():
+            raise ValueError("invalid table name: %r" % (table,))
+        if synchronous.upper() not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+            raise ValueError("invalid synchronous setting: %r" % (synchronous,))
+
+        self.path = path
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.synchronous = synchronous.upper()
+
+        # Counters, updated by the writer thread
+        self.rows_written = 0
+        self.batches_written = 0
+
+        self._queue = queue.Queue(max_pending)
+        self._error = None
+        self._closed = False
+        self._ready = threading.Event()
+
+        self._thread = threading.Thread(target=self._run, name="SqliteScanSink")
+        self._thread.daemon = True
+        self._thread.start()
+
+        # Surface connection and schema errors here rather than later
+        self._ready.wait()
+        self._check()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __call__(self, barcode):
+        self.put(barcode)
+
+    # --------------------------------------------------------
+    # put(barcode, scanner_id, block, timeout)
+    #
+    # Queue a scan to be written.
+    def put(self, barcode, scanner_id = None, block = True, timeout = None):
+        """
+            Queue a scan for the writer thread.
+
+            :param barcode: a str, bytes or ScanResult
+            :param scanner_id: stored with the scan, for example a
+                ScannerHub id
+            :param block: wait for room when max_pending scans are
+                already queued
+            :param timeout: the longest to wait for room, in seconds
+            :raises queue.Full: if there was no room
+        """
+        if self._closed:
+            raise ValueError("the sink is closed")
+        self._check()
+        self._queue.put((time.time(), scanner_id, barcode), block, timeout)
+
+    # --------------------------------------------------------
+    # flush()
+    #
+    # Wait until every queued scan is in the database.
+    def flush(self):
+        """
+            Block until every scan queued so far is committed.
+        """
+        self._queue.join()
+        self._check()
+
+    # --------------------------------------------------------
+    # close()
+    #
+    # Write what is queued and stop the writer thread.
+    def close(self):
+        """
+            Commit every queued scan, then stop the writer thread and
+            close the database.
+        """
+        if self._closed:
+            return
+
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._check()
+
+    # --------------------------------------------------------
+    # pending()
+    #
+    # Scans waiting to be written.
+    def pending(self):
+        """
+            :return: the number of scans queued but not yet committed
+            :rtype: int
+        """
+        return self._queue.qsize()
+
+    def _check(self):
+        if self._error is not None:
+            raise self._error
+
+    # --------------------------------------------------------
+    # _run()
+    #
+    # Writer thread: gather batches and commit them.
+    def _run(self):
+        try:
+            connection = self._connect()
+        except sqlite3.Error as exc:
+            self._error = exc
+            self._ready.set()
+            return
+        self._ready.set()
+
+        insert = ("INSERT INTO %s (scanned_at, scanner, payload, symbology, code_id) "
+                  "VALUES (?, ?, ?, ?, ?)" % self.table)
+        get = self._queue.get
+        try:
+            stopping = False
+            while not stopping:
+                item = get()
+                if item is None:
+                    self._queue.task_done()
+                    break
+
+                batch = [self._row(item)]
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    try:
+                        item = get(True, remaining) if remaining > 0 else get(False)
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(self._row(item))
+
+                try:
+                    with connection:
+                        connection.executemany(insert, batch)
+                    self.rows_written += len(batch)
+                    self.batches_written += 1
+                except sqlite3.Error as exc:
+                    # Keep draining so flush() and close() return, and
+                    # report the failure to the caller
+                    self._error = exc
+                finally:
+                    for i in range(len(batch) + stopping):
+                        self._queue.task_done()
+        finally:
+            connection.close()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=%s" % self.synchronous)
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS %s ("
+                "id INTEGER PRIMARY KEY, "
+                "scanned_at REAL NOT NULL, "
+                "scanner TEXT, "
+                "payload, "
+                "symbology TEXT, "
+                "code_id TEXT)" % self.table)
+        return connection
+
+    @staticmethod
+    def _row(item):
+        scanned_at, scanner_id, barcode = item
+        if scanner_id is not None:
+            scanner_id = str(scanner_id)
+        if isinstance(barcode, ScanResult):
+            return (scanned_at, scanner_id, barcode.payload, barcode.symbology, barcode.code_id)
+        return (scanned_at, scanner_id, barcode, None, None)
@@ -0,0 +1,289 @@
+#-----------------------------------------------------------------------------
+# de2120_validation.py
+#
+# Check digit validation for barcodes read by the DE2120 Barcode Scanner,
+# one code at a time or in NumPy-vectorized batches.
+#
+#------------------------------------------------------------------------
+# Written by SparkFun Electronics, October 2026
+#
+# Do you like this library? Help support SparkFun. Buy a board!
+#==================================================================================
+# Copyright (c) 2026 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#==================================================================================
+
+"""
+de2120_validation
+============
+Check digit validation for 1D barcodes.
+
+GS1 mod 10 covers EAN-8, UPC-A, EAN-13, ITF-14/GTIN-14 and SSCC-18.
+Mod 43 covers Code 39 with its optional check character. The batch
+functions use NumPy when it is installed (pip install numpy) and fall
+back to pure Python otherwise::
+
+    valid_gs1("4006381333931")                      # True
+    validate_gs1_batch(["4006381333931", "4006381333932"])
+
+To drop misreads before they reach the application::
+
+    my_scanner.add_scan_filter(CheckDigitFilter())
+
+"""
+#-----------------------------------------------------------------------------------
+
+from de2120_barcode_scanner import ScanResult
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Code lengths that carry a GS1 mod 10 check digit
+GS1_LENGTHS = (8, 12, 13, 14, 17, 18)
+
+# Code 39 characters in check value order
+CODE39_CHARSET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ-. $/+%"
+
+_CODE39_VALUES = dict((char, value) for value, char in enumerate(CODE39_CHARSET))
+
+if numpy is not None:
+    _CODE39_TABLE = numpy.full(256, -1, dtype=numpy.int16)
+    for _value, _char in enumerate(CODE39_CHARSET):
+        _CODE39_TABLE[ord(_char)] = _value
+
+def _text(code):
+    # The payload of a str, bytes or ScanResult, without the line ending
+    if isinstance(code, ScanResult):
+        code = code.payload
+    if isinstance(code, (bytes, bytearray)):
+        code = code.decode("latin-1")
+    return code.rstrip("\r\n")
+
+# --------------------------------------------------------
+# gs1_check_digit(digits)
+#
+# The GS1 mod 10 check digit for a string of digits.
+def gs1_check_digit(digits):
+    """
+        :param digits: the code without its check digit
+        :return: the check digit
+        :rtype: int
+    """
+    total = 3 * sum(map(int, digits[::-2])) + sum(map(int, digits[-2::-2]))
+    return -total % 10
+
+# --------------------------------------------------------
+# valid_gs1(code, lengths)
+#
+# Check one code's GS1 mod 10 check digit.
+def valid_gs1(code, lengths = GS1_LENGTHS):
+    """
+        :param code: a str, bytes or ScanResult; a trailing line
+            ending is ignored
+        :param lengths: the code lengths accepted
+        :return: true if the code is all digits, one of lengths long,
+            and its last digit is the right check digit
+        :rtype: bool
+    """
+    code = _text(code)
+    if len(code) not in lengths or not (code.isascii() and code.isdigit()):
+        return False
+    total = 3 * sum(map(int, code[-2::-2])) + sum(map(int, code[-1::-2]))
+    return total % 10 == 0
+
+# --------------------------------------------------------
+# valid_mod43(code)
+#
+# Check one Code 39 code's mod 43 check character.
+def valid_mod43(code):
+    """
+        :param code: a str, bytes or ScanResult, without start and
+            stop characters
+        :return: true if the last character is the mod 43 check
+            character of the others
+        :rtype: bool
+    """
+    code = _text(code)
+    if len(code) < 2:
+        return False
+    try:
+        values = [_CODE39_VALUES[char] for char in code]
+    except KeyError:
+        return False
+    return sum(values[:-1]) % 43 == values[-1]
+
+# --------------------------------------------------------
+# validate_gs1_batch(codes, lengths)
+#
+# Check many codes' GS1 mod 10 check digits at once.
+def validate_gs1_batch(codes, lengths = GS1_LENGTHS):
+    """
+        Validate a batch of codes. With NumPy, codes of each length
+        are packed into one fixed width uint8 array of digits and
+        checked with a single weighted sum.
+
+        :param codes: an iterable of str, bytes or ScanResult
+        :param lengths: the code lengths accepted
+        :return: one bool per code, as a NumPy bool array when NumPy
+            is installed and a list otherwise
+    """
+    codes = [_text(code) for code in codes]
+    if numpy is None:
+        return [valid_gs1(code, lengths) for code in codes]
+
+    result = numpy.zeros(len(codes), dtype=bool)
+    for length, indexes in _by_length(codes, lengths).items():
+        digits = _pack(codes, indexes, length) - 48
+
+        # Bytes below "0" wrap round to large values
+        numeric = (digits <= 9).all(axis=1)
+
+        # Weight 1 on the check digit, then 3, 1, 3, ... to the left
+        weights = numpy.where(numpy.arange(length)[::-1] % 2 == 1, 3, 1).astype(numpy.int32)
+        totals = digits.astype(numpy.int32) @ weights
+        result[indexes] = numeric & (totals % 10 == 0)
+    return result
+
+# --------------------------------------------------------
+# validate_mod43_batch(codes)
+#
+# Check many Code 39 mod 43 check characters at once.
+def validate_mod43_batch(codes):
+    """
+        Validate a batch of Code 39 codes. With NumPy, codes of each
+        length are mapped to check values through a 256 entry lookup
+        table and summed in one step.
+
+        :param codes: an iterable of str, bytes or ScanResult
+        :return: one bool per code, as a NumPy bool array when NumPy
+            is installed and a list otherwise
+    """
+    codes = [_text(code) for code in codes]
+    if numpy is None:
+        return [valid_mod43(code) for code in codes]
+
+    result = numpy.zeros(len(codes), dtype=bool)
+    for length, indexes in _by_length(codes, None).items():
+        if length < 2:
+            continue
+        values = _CODE39_TABLE[_pack(codes, indexes, length)]
+        known = (values >= 0).all(axis=1)
+        checks = values[:, :-1].astype(numpy.int32).sum(axis=1) % 43
+        result[indexes] = known & (checks == values[:, -1])
+    return result
+
+def _by_length(codes, lengths):
+    groups = {}
+    for index, code in enumerate(codes):
+        length = len(code)
+        if lengths is None or length in lengths:
+            groups.setdefault(length, []).append(index)
+    return groups
+
+def _pack(codes, indexes, length):
+    # One row of bytes per code; other characters become "?", which
+    # fails both checks
+    packed = "".join([codes[index] for index in indexes]).encode("ascii", "replace")
+    return numpy.frombuffer(packed, dtype=numpy.uint8).reshape(len(indexes), length)
+
+class CheckDigitFilter(object):
+    """
+    CheckDigitFilter
+
+    A scan filter for DE2120BarcodeScanner.add_scan_filter() that
+    drops barcodes whose check digit is wrong.
+
+    With Code ID transfer on and scan results enabled, the symbology
+    decides the check: GS1 mod 10 for EAN-8, EAN-13, UPC-A and 14
+    digit Interleaved 2 of 5 (ITF-14), and mod 43 for Code 39 when
+    code39_check is on. Other symbologies pass unchecked.
+
+    Without a symbology, infer decides: all-digit codes of a GS1
+    length are checked with mod 10, everything else passes. Turn it
+    off if you read numeric codes that are not GTINs.
+
+    :param code39_check:    The module sends Code 39 with its mod 43
+                            check character.
+    :param infer:           Check numeric codes of GS1 lengths when the
+                            symbology is unknown.
+    :param on_reject:       Called with each rejected barcode.
+
+    :return:                The CheckDigitFilter object.
+    :rtype:                 Object
+    """
+    GS1_SYMBOLOGIES = ("EAN-8", "EAN-13", "UPC-A")
+
+    def __init__(self, code39_check = False, infer = True, on_reject = None):
+        self.code39_check = code39_check
+        self.infer = infer
+        self.on_reject = on_reject
+        self.passed = 0
+        self.rejected = 0
+        self.unchecked = 0
+
+    def __call__(self, barcode):
+        check = self._check_for(barcode)
+        if check is None:
+            self.unchecked += 1
+            return True
+
+        if check(barcode):
+            self.passed += 1
+            return True
+
+        self.rejected += 1
+        if self.on_reject is not None:
+            self.on_reject(barcode)
+        return False
+
+    # --------------------------------------------------------
+    # stats()
+    #
+    # Counters for monitoring.
+    def stats(self):
+        """
+            :return: the number of barcodes that passed their check,
+                failed it, and had no check to run
+            :rtype: dict
+        """
+        return {
+            "passed": self.passed,
+            "rejected": self.rejected,
+            "unchecked": self.unchecked,
+        }
+
+    def _check_for(self, barcode):
+        symbology = getattr(barcode, "symbology", None)
+        if symbology is not None:
+            if symbology in self.GS1_SYMBOLOGIES:
+                return valid_gs1
+            if symbology == "Interleaved 2 of 5" and len(_text(barcode)) == 14:
+                return valid_gs1
+            if symbology == "Code 39" and self.code39_check:
+                return valid_mod43
+            return None
+
+        if self.infer:
+            code = _text(barcode)
+            if len(code) in GS1_LENGTHS and code.isascii() and code.isdigit():
+                return valid_gs1
+        return None
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+#-----------------------------------------------------------------------------
+# de2120_ex5_asyncio.py
+#------------------------------------------------------------------------
+#
+# Written by SparkFun Electronics, October 2026
+#
+# This example demonstrates how to use the scanner from an asyncio program.
+# The serial port is watched by the event loop, so waiting for a barcode
+# does not block any thread.
+# 
+# NOTE: you must put the module into COM mode by scanning the PORVIC barcode 
+# in the datasheet. This will put the module in the correct mode to receive 
+# and transmit serial.
+#
+# This package has been developed on a Raspberry Pi 4. Connect the DE2120 Barcode
+# Scanner Breakout directly to your Pi using a USB-C cable
+#  
+# Do you like this library? Help support SparkFun. Buy a board!
+#
+#==================================================================================
+# Copyright (c) 2026 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy 
+# of this software and associated documentation files (the "Software"), to deal 
+# in the Software without restriction, including without limitation the rights 
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell 
+# copies of the Software, and to permit persons to whom the Software is 
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all 
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, 
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE 
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER 
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, 
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE 
+# SOFTWARE.
+#==================================================================================
+# Example 5
+
+import de2120_barcode_scanner
+import asyncio
+import sys
+
+async def run_example():
+
+    print("\nSparkFun DE2120 Barcode Scanner Breakout Example 5")
+    my_scanner = de2120_barcode_scanner.AsyncDE2120BarcodeScanner()
+
+    if await my_scanner.begin() == False:
+        print("\nThe Barcode Scanner module isn't connected correctly to the system. Please check wiring", \
+            file=sys.stderr)
+        return
+    print("\nScanner ready!")
+
+    # Configuration calls are awaited just like send_command()
+    await my_scanner.light_on()
+
+    async for scan_buffer in my_scanner.scans():
+        print("\nCode found: " + str(scan_buffer))
+    
+if __name__ == '__main__':
+    try:
+        asyncio.run(run_example())
+    except(KeyboardInterrupt, SystemExit) as exErr:
+        print("\nEnding Example 5")
+        sys.exit(0)
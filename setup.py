@@ -81,9 +81,6 @@ setup(
 
         # Specify the Python versions you support here. In particular, ensure
         # that you indicate whether you support Python 2, Python 3 or both. 
-        'Programming Language :: Python :: 2.7',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
         
     ],
@@ -91,8 +88,12 @@ setup(
     # What does your project relate to?
     keywords='electronics, maker',
 
+    python_requires='>=3.7',
+
     # You can just specify the packages manually here if your project is
     # simple. Or you can use find_packages().
-    py_modules=["de2120_barcode_scanner"],
+    py_modules=["de2120_barcode_scanner", "de2120_simulator", "de2120_sqlite_sink",
+                "de2120_pipeline", "de2120_validation", "de2120_gs1",
+                "de2120_lookup_cache"],
 
 )
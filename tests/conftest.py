@@ -0,0 +1,76 @@
+# Shared fixtures: every test runs against de2120_simulator, so no
+# hardware is needed. Linux/macOS only (needs os.openpty()).
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import de2120_barcode_scanner
+import de2120_simulator
+
+
+@pytest.fixture
+def simulator():
+    """
+        Factory for DE2120Simulator objects, closed after the test.
+    """
+    simulators = []
+
+    def make(**kwargs):
+        kwargs.setdefault("pace", False)
+        sim = de2120_simulator.DE2120Simulator(**kwargs)
+        simulators.append(sim)
+        return sim
+
+    yield make
+    for sim in simulators:
+        sim.close()
+
+
+@pytest.fixture
+def scanner(simulator):
+    """
+        Factory for (DE2120BarcodeScanner, DE2120Simulator) pairs.
+        port_baud opens the port at another rate than the
+        simulator's. Listeners are stopped and ports closed after the
+        test.
+    """
+    scanners = []
+
+    def make(timeout = 0.5, command_timeout_ms = 500, port_baud = None, **kwargs):
+        sim = simulator(**kwargs)
+        scanner = de2120_barcode_scanner.DE2120BarcodeScanner(sim.port(port_baud, timeout=timeout))
+        scanner.command_timeout_ms = command_timeout_ms
+        scanners.append(scanner)
+        return scanner, sim
+
+    yield make
+    for scanner in scanners:
+        if scanner.is_listening():
+            scanner.stop_listening()
+        scanner.hard_port.close()
+
+
+def wait_for(predicate, timeout = 2.0):
+    """
+        Poll predicate until it is true or the timeout passes.
+
+        :return: the last value of predicate()
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        value = predicate()
+        if value or time.monotonic() > deadline:
+            return value
+        time.sleep(0.01)
+
+
+def read_one(scanner, timeout = 2.0):
+    """
+        read_barcode() until a barcode arrives or the timeout passes.
+    """
+    return wait_for(scanner.read_barcode, timeout)
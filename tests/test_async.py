@@ -0,0 +1,142 @@
+# AsyncDE2120BarcodeScanner, run with asyncio.run() so no pytest
+# plugin is needed.
+
+import asyncio
+
+import pytest
+
+from de2120_barcode_scanner import AsyncDE2120BarcodeScanner, ScannerProfile
+
+from conftest import wait_for
+
+
+@pytest.fixture
+def async_scanner(simulator):
+    """
+        Factory for (AsyncDE2120BarcodeScanner, DE2120Simulator) pairs.
+    """
+    pairs = []
+
+    def make(port_baud = None, **kwargs):
+        sim = simulator(**kwargs)
+        scanner = AsyncDE2120BarcodeScanner(sim.port(port_baud, timeout=0.5), command_timeout_ms=300)
+        pairs.append(scanner)
+        return scanner, sim
+
+    yield make
+    for scanner in pairs:
+        scanner.close()
+        scanner.hard_port.close()
+
+
+def test_commands(async_scanner):
+    scanner, sim = async_scanner(nack=[AsyncDE2120BarcodeScanner.PROPERTY_AIM_LIGHT])
+
+    async def main():
+        assert await scanner.begin()
+        assert await scanner.light_on() is True
+        assert await scanner.send_command(AsyncDE2120BarcodeScanner.PROPERTY_AIM_LIGHT, "0") is False
+        assert await scanner.send_commands([
+            (AsyncDE2120BarcodeScanner.PROPERTY_DECODE_BEEP, "0"),
+            (AsyncDE2120BarcodeScanner.PROPERTY_AIM_LIGHT, "1"),
+        ]) == [True, False]
+
+    asyncio.run(main())
+
+
+def test_timeout(async_scanner):
+    scanner, sim = async_scanner(baud=9600, port_baud=115200)
+
+    async def main():
+        assert await scanner.send_command(AsyncDE2120BarcodeScanner.PROPERTY_FLASH_LIGHT, "0") is None
+        assert not await scanner.is_connected()
+
+    asyncio.run(main())
+
+
+def test_read_barcode(async_scanner):
+    scanner, sim = async_scanner()
+
+    async def main():
+        assert await scanner.read_barcode(0.05) is False
+        sim.scan("ASYNC1")
+        assert await scanner.read_barcode(2) == "ASYNC1\r\n"
+
+        # Barcodes and ACKs share the port
+        sim.scan("ASYNC2")
+        assert await scanner.light_off()
+        assert await scanner.read_barcode(2) == "ASYNC2\r\n"
+
+    asyncio.run(main())
+
+
+def test_profile_diffing(async_scanner):
+    scanner, sim = async_scanner()
+    profile = ScannerProfile({AsyncDE2120BarcodeScanner.PROPERTY_READING_AREA: 1})
+
+    async def main():
+        assert await scanner.apply_profile(profile) == {AsyncDE2120BarcodeScanner.PROPERTY_READING_AREA: True}
+        assert await scanner.apply_profile(profile) == {}
+
+    asyncio.run(main())
+    assert wait_for(lambda: sim.properties[AsyncDE2120BarcodeScanner.PROPERTY_READING_AREA] == "1")
+
+
+def test_detect_and_upgrade_baud(async_scanner):
+    scanner, sim = async_scanner(baud=9600, port_baud=115200)
+
+    async def main():
+        assert await scanner.detect_baud() == 9600
+        assert await scanner.upgrade_baud(57600)
+        assert await scanner.is_connected()
+
+    asyncio.run(main())
+    assert wait_for(lambda: sim.baud == 57600)
+
+
+def test_no_auto_reconnect(async_scanner):
+    scanner, sim = async_scanner()
+    with pytest.raises(NotImplementedError):
+        scanner.enable_auto_reconnect()
+
+
+def test_setters_reject_invalid_arguments(async_scanner):
+    scanner, sim = async_scanner()
+
+    async def main():
+        assert await scanner.change_buzzer_tone(7) is False
+        assert await scanner.USB_mode("x") is False
+        assert await scanner.enable_continuous_read(9) is False
+        assert await scanner.enable_motion_sense(7) is False
+        assert await scanner.change_buzzer_tone(3) is True
+
+    asyncio.run(main())
+    assert [cmd for cmd, arg in sim.commands] == [AsyncDE2120BarcodeScanner.PROPERTY_BUZZER_FREQ]
+
+
+def test_change_serial_data_format(async_scanner):
+    scanner, sim = async_scanner()
+
+    async def main():
+        assert await scanner.change_serial_data_format(9) is False
+        assert await scanner.change_serial_data_format(1) is True
+        sim.scan("café")
+        assert await scanner.read_barcode(2) == "café\r\n"
+
+    asyncio.run(main())
+
+
+def test_utf16_responses_do_not_block_the_loop(async_scanner, monkeypatch):
+    # U+0415 starts with an ACK byte value in UTF-16 little endian
+    scanner, sim = async_scanner(barcodes=["Еда-42"])
+
+    async def main():
+        assert await scanner.change_serial_data_format(3) is True
+        monkeypatch.setattr(scanner, "_wait_readable", None)
+        for i in range(10):
+            sim.scan()
+            assert await scanner.send_command(AsyncDE2120BarcodeScanner.PROPERTY_DECODE_BEEP, str(i % 2)) is True
+        for i in range(10):
+            assert await scanner.read_barcode(2) == "Еда-42\r\n"
+
+    asyncio.run(main())
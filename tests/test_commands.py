@@ -0,0 +1,110 @@
+# Commands, batches and profile diffing against the simulator.
+
+import de2120_barcode_scanner
+from de2120_barcode_scanner import CommandBatch, DE2120BarcodeScanner, ScannerProfile
+
+from conftest import read_one, wait_for
+
+
+def test_ack(scanner):
+    scanner, sim = scanner()
+    assert scanner.begin()
+    assert scanner.is_connected()
+    assert scanner.send_command(DE2120BarcodeScanner.PROPERTY_FLASH_LIGHT, "0") is True
+    # The simulator changes the setting just after the ACK
+    assert wait_for(lambda: sim.properties[DE2120BarcodeScanner.PROPERTY_FLASH_LIGHT] == "0")
+
+
+def test_nack(scanner):
+    scanner, sim = scanner(nack=[DE2120BarcodeScanner.PROPERTY_FLASH_LIGHT])
+    assert scanner.send_command(DE2120BarcodeScanner.PROPERTY_FLASH_LIGHT, "0") is False
+    assert scanner.send_command(DE2120BarcodeScanner.PROPERTY_READING_AREA, "9") is False
+    assert sim.nacked == 2
+    assert DE2120BarcodeScanner.PROPERTY_FLASH_LIGHT not in scanner.device_state()
+
+
+def test_timeout(scanner):
+    # The module runs at 9600 baud and the port at 115200, so nothing
+    # it hears is a command
+    scanner, sim = scanner(baud=9600, port_baud=115200, command_timeout_ms=100)
+    assert scanner.send_command(DE2120BarcodeScanner.PROPERTY_FLASH_LIGHT, "0") is None
+    assert not scanner.is_connected()
+
+
+def test_barcode_before_ack_is_kept(scanner):
+    scanner, sim = scanner()
+    sim.scan("BEFORE")
+    assert scanner.light_on()
+    assert read_one(scanner) == "BEFORE\r\n"
+
+
+def test_batch(scanner):
+    scanner, sim = scanner(nack=[DE2120BarcodeScanner.PROPERTY_AIM_LIGHT])
+    batch = (CommandBatch()
+             .add(DE2120BarcodeScanner.PROPERTY_FLASH_LIGHT, 0)
+             .add(DE2120BarcodeScanner.PROPERTY_AIM_LIGHT, 0)
+             .add(DE2120BarcodeScanner.PROPERTY_DECODE_BEEP, 0))
+    assert scanner.send_commands(batch) == [True, False, True]
+    assert scanner.send_commands([DE2120BarcodeScanner.COMMAND_START_SCAN]) == [True]
+    assert [cmd for cmd, arg in sim.commands][-4:] == [
+        DE2120BarcodeScanner.PROPERTY_FLASH_LIGHT,
+        DE2120BarcodeScanner.PROPERTY_AIM_LIGHT,
+        DE2120BarcodeScanner.PROPERTY_DECODE_BEEP,
+        DE2120BarcodeScanner.COMMAND_START_SCAN,
+    ]
+
+
+def test_batch_stops_after_timeout(scanner):
+    scanner, sim = scanner(baud=9600, port_baud=115200, command_timeout_ms=100)
+    results = scanner.send_commands([(DE2120BarcodeScanner.PROPERTY_FLASH_LIGHT, "0"),
+                                     (DE2120BarcodeScanner.PROPERTY_AIM_LIGHT, "0")])
+    assert results == [None, None]
+
+
+def test_profile_sends_only_changes(scanner):
+    scanner, sim = scanner()
+    profile = ScannerProfile({
+        DE2120BarcodeScanner.PROPERTY_DECODE_BEEP: 0,
+        DE2120BarcodeScanner.PROPERTY_READING_AREA: 2,
+    })
+    assert scanner.apply_profile(profile) == {
+        DE2120BarcodeScanner.PROPERTY_DECODE_BEEP: True,
+        DE2120BarcodeScanner.PROPERTY_READING_AREA: True,
+    }
+    sent = len(sim.commands)
+
+    assert scanner.apply_profile(profile) == {}
+    assert len(sim.commands) == sent
+
+    profile[DE2120BarcodeScanner.PROPERTY_READING_AREA] = 3
+    assert scanner.apply_profile(profile) == {DE2120BarcodeScanner.PROPERTY_READING_AREA: True}
+    assert wait_for(lambda: sim.properties[DE2120BarcodeScanner.PROPERTY_READING_AREA] == "3")
+
+    assert len(scanner.apply_profile(profile, force=True)) == 2
+    assert scanner.device_state() == profile
+
+
+def test_seeded_state_is_not_resent(scanner):
+    scanner, sim = scanner()
+    scanner.seed_state_cache({DE2120BarcodeScanner.PROPERTY_DECODE_BEEP: 1})
+    assert scanner.apply_profile({DE2120BarcodeScanner.PROPERTY_DECODE_BEEP: 1}) == {}
+    assert not sim.commands
+
+
+def test_read_barcode(scanner):
+    scanner, sim = scanner()
+    assert scanner.read_barcode() is False
+    sim.scan("4006381333931")
+    assert read_one(scanner) == "4006381333931\r\n"
+
+
+def test_scan_results_with_code_id(scanner):
+    scanner, sim = scanner()
+    scanner.enable_scan_results()
+    assert scanner.send_command(DE2120BarcodeScanner.PROPERTY_TRANSFER_CODE_ID, "1")
+    sim.scan(("d", "4006381333931"))
+
+    result = read_one(scanner)
+    assert isinstance(result, de2120_barcode_scanner.ScanResult)
+    assert result.symbology == "EAN-13"
+    assert result.payload == "4006381333931"
@@ -0,0 +1,73 @@
+# de2120_gs1: parsing GS1 element strings, standalone and on scans.
+
+import pytest
+
+from de2120_barcode_scanner import DE2120BarcodeScanner, ScanResult
+from de2120_gs1 import GS, GS1Parser, parse_gs1, parse_scan
+
+from conftest import read_one
+
+
+def test_parse_element_strings():
+    elements = parse_gs1("]d2010950600013435217261231" "10ABC123\x1d21XYZ")
+    assert elements == {"01": "09506000134352", "17": "261231", "10": "ABC123", "21": "XYZ"}
+    assert list(elements) == ["01", "17", "10", "21"]
+
+    # Leading FNC1, FNC1 after a predefined length, 4 digit AIs, bytes
+    assert parse_gs1(GS + "0109506000134352" + GS + "3103001250") == {
+        "01": "09506000134352", "3103": "001250"}
+    assert parse_gs1(b"70032612312359\x1d3012\r\n") == {"7003": "2612312359", "30": "12"}
+
+
+@pytest.mark.parametrize("payload", [
+    "",
+    "]C1",
+    "9A123",                        # unknown AI
+    "01095060001343",               # predefined length cut short
+    "10" + "A" * 21,                # variable length too long
+    "30ABC",                        # digits only
+    "10A\x1d10B",                   # same AI, different values
+])
+def test_parse_rejects(payload):
+    with pytest.raises(ValueError):
+        parse_gs1(payload)
+
+
+def test_parse_scan_needs_a_gs1_marker():
+    # A plain EAN-13 can start with a valid AI
+    assert parse_scan("0109506000134") is None
+    assert parse_scan("]C10109506000134352") == {"01": "09506000134352"}
+    assert parse_scan(b"0109506000134352\x1d10A") == {"01": "09506000134352", "10": "A"}
+    assert parse_scan(ScanResult("0109506000134352", "GS1-128")) == {"01": "09506000134352"}
+    assert parse_scan(ScanResult("0109506000134352", "EAN-13")) is None
+    assert parse_scan("]C1not gs1") is None
+
+
+def test_custom_table():
+    parser = GS1Parser(extra=[("91", 1, 4, True, "COMPANY"), ("10", 1, 3, False, "SHORT LOT")])
+    assert parser.parse("911234" + GS + "10ABC") == {"91": "1234", "10": "ABC"}
+    with pytest.raises(ValueError):
+        parser.parse("10ABCD")
+    assert parser.title("91") == "COMPANY"
+    assert parser.title("3105") == "NET WEIGHT (kg)"
+    assert parser.title("1") is None
+
+    with pytest.raises(ValueError):
+        GS1Parser(extra=[("9", 1, 4, False, "TOO SHORT")])
+    with pytest.raises(ValueError):
+        GS1Parser(extra=[("01", 1, 14, True, "GTIN")])
+    with pytest.raises(ValueError):
+        GS1Parser(extra=[("100", 1, 4, False, "UNDER 10")])
+
+
+def test_scan_results_carry_gs1_elements(scanner):
+    scanner, sim = scanner()
+    scanner.enable_scan_results(gs1=True)
+    assert scanner.send_command(DE2120BarcodeScanner.PROPERTY_TRANSFER_CODE_ID, "1")
+    sim.scan(("I", "0109506000134352" "17261231" "10ABC123"))
+    sim.scan(("d", "4006381333931"))
+
+    result = read_one(scanner)
+    assert result.symbology == "GS1-128"
+    assert result.gs1 == {"01": "09506000134352", "17": "261231", "10": "ABC123"}
+    assert read_one(scanner).gs1 is None
@@ -0,0 +1,138 @@
+# ScannerHub reading several simulators on one thread.
+
+import threading
+import time
+
+import pytest
+
+from de2120_barcode_scanner import DE2120BarcodeScanner, ScannerHub
+
+from conftest import read_one
+
+
+@pytest.fixture
+def hub():
+    hub = ScannerHub()
+    yield hub
+    hub.close()
+
+
+def collect(hub, count, timeout = 2.0):
+    events = []
+    for event in hub.events(timeout):
+        events.append(event)
+        if len(events) == count:
+            break
+    return events
+
+
+def test_reads_every_scanner(scanner, hub):
+    first, first_sim = scanner()
+    second, second_sim = scanner()
+    assert hub.add(first, "first") == "first"
+    hub.add(second, "second")
+    assert sorted(hub.scanners()) == ["first", "second"]
+
+    first_sim.scan("A1")
+    second_sim.scan("B1")
+    first_sim.scan("A2")
+    events = collect(hub, 3)
+    assert sorted(events) == [("first", "A1\r\n"), ("first", "A2\r\n"), ("second", "B1\r\n")]
+
+
+def test_add_rejects_duplicates_and_owned_scanners(scanner, hub):
+    first, sim = scanner()
+    hub.add(first, "first")
+    with pytest.raises(ValueError):
+        hub.add(first, "again")
+
+    second, sim = scanner()
+    with pytest.raises(ValueError):
+        hub.add(second, "first")
+
+
+def test_commands_from_another_thread(scanner, hub):
+    first, sim = scanner()
+    hub.add(first, "first")
+    results = []
+    thread = threading.Thread(target=lambda: results.append(first.light_on()))
+    thread.start()
+
+    # The hub routes the ACK, so keep it polling until the command ends
+    sim.scan("DURING")
+    events = []
+    while thread.is_alive():
+        events.extend(hub.poll(0.05))
+    thread.join()
+    events.extend(hub.poll(0.05))
+    assert results == [True]
+    assert events == [("first", "DURING\r\n")]
+
+
+def test_utf16_commands_do_not_block_the_hub(scanner, hub, monkeypatch):
+    # U+0415 starts with an ACK byte value in UTF-16 little endian
+    first, sim = scanner(barcodes=["Еда-42"])
+    assert first.change_serial_data_format(3)
+    hub.add(first, "first")
+    monkeypatch.setattr(first, "_wait_readable", None)
+
+    results = []
+
+    def send():
+        for i in range(10):
+            sim.scan()
+            results.append(first.send_command(first.PROPERTY_DECODE_BEEP, str(i % 2)))
+
+    thread = threading.Thread(target=send)
+    thread.start()
+    events = []
+    while thread.is_alive():
+        events.extend(hub.poll(0.05))
+    thread.join()
+    if len(events) < 10:
+        events.extend(collect(hub, 10 - len(events)))
+    assert results == [True] * 10
+    assert events == [("first", "Еда-42\r\n")] * 10
+
+
+def test_events_stop_after_silence(scanner, hub):
+    first, sim = scanner()
+    hub.add(first, "first")
+    assert list(hub.events(0.05)) == []
+
+
+def test_remove_hands_the_port_back(scanner, hub):
+    first, sim = scanner()
+    hub.add(first, "first")
+    assert hub.remove("first") is first
+    assert not hub.scanners()
+
+    sim.scan("AFTER")
+    assert first.send_command(DE2120BarcodeScanner.PROPERTY_FLASH_LIGHT, "1")
+    assert read_one(first) == "AFTER\r\n"
+
+
+def test_lost_port_without_reconnect_raises(scanner, hub):
+    first, sim = scanner()
+    hub.add(first, "first")
+    sim.close()
+    with pytest.raises(OSError):
+        hub.poll(1)
+    assert not hub.scanners()
+
+
+def test_lost_port_keeps_other_scanners_barcodes(scanner, hub):
+    kept, kept_sim = scanner()
+    lost, lost_sim = scanner()
+    hub.add(kept, "kept")
+    hub.add(lost, "lost")
+
+    # Both ports are readable by the time poll() looks
+    kept_sim.scan("KEEPME")
+    time.sleep(0.1)
+    lost_sim.close()
+
+    assert hub.poll(1) == [("kept", "KEEPME\r\n")]
+    with pytest.raises(OSError):
+        hub.poll(1)
+    assert list(hub.scanners()) == ["kept"]
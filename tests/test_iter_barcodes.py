@@ -0,0 +1,54 @@
+# iter_barcodes(): the generator over barcodes and its limits.
+
+import time
+
+import pytest
+
+from conftest import read_one
+
+
+def test_max_count(scanner):
+    scanner, sim = scanner()
+    for barcode in ("A1", "A2", "A3"):
+        sim.scan(barcode)
+
+    assert list(scanner.iter_barcodes(timeout=2, max_count=2)) == ["A1\r\n", "A2\r\n"]
+    assert read_one(scanner) == "A3\r\n"
+
+
+def test_idle_timeout_ends_after_silence(scanner):
+    scanner, sim = scanner()
+    sim.scan("B1")
+    sim.scan("B2")
+
+    started = time.monotonic()
+    assert list(scanner.iter_barcodes(timeout=5, idle_timeout=0.2)) == ["B1\r\n", "B2\r\n"]
+    assert 0.15 <= time.monotonic() - started < 2
+
+
+def test_idle_timeout_ignores_time_spent_by_the_caller(scanner):
+    scanner, sim = scanner()
+    sim.scan("C1")
+    sim.scan("C2")
+
+    received = []
+    for barcode in scanner.iter_barcodes(timeout=5, idle_timeout=0.1):
+        received.append(barcode)
+        time.sleep(0.3)
+    assert received == ["C1\r\n", "C2\r\n"]
+
+
+def test_timeout_ends_a_steady_stream(scanner):
+    scanner, sim = scanner(barcodes=["D"], rate=50)
+
+    started = time.monotonic()
+    received = list(scanner.iter_barcodes(timeout=0.3, idle_timeout=1))
+    assert 0.25 <= time.monotonic() - started < 1.5
+    assert received and set(received) == {"D\r\n"}
+
+
+def test_refuses_a_port_read_by_the_listener(scanner):
+    scanner, sim = scanner()
+    scanner.start_listening()
+    with pytest.raises(RuntimeError):
+        next(scanner.iter_barcodes(timeout=1))
@@ -0,0 +1,75 @@
+# The background reader thread started by start_listening().
+
+import queue
+
+from conftest import wait_for
+
+
+def test_delivers_to_callback_and_queue(scanner):
+    scanner, sim = scanner()
+    received = []
+    scans = queue.Queue()
+    assert scanner.start_listening(received.append, scans)
+    assert not scanner.start_listening()
+
+    sim.scan("4006381333931")
+    sim.scan("CODE39")
+    assert wait_for(lambda: len(received) == 2)
+    assert received == ["4006381333931\r\n", "CODE39\r\n"]
+    assert scans.get(timeout=1) == "4006381333931\r\n"
+
+    # Commands still get their ACKs through the reader
+    assert scanner.light_on()
+    assert scanner.stop_listening()
+    assert not scanner.is_listening()
+    assert scanner.listener_error() is None
+
+
+def test_failing_consumers_do_not_stop_the_reader(scanner):
+    scanner, sim = scanner()
+    errors = []
+
+    def callback(barcode):
+        if barcode.startswith("BAD"):
+            raise ValueError(barcode)
+
+    class FullQueue(object):
+        def put(self, barcode):
+            raise RuntimeError("full")
+
+    scanner.start_listening(callback, FullQueue(), error_callback=lambda *args: errors.append(args))
+    sim.scan("BAD1")
+    sim.scan("GOOD")
+    assert wait_for(lambda: len(errors) == 3)
+
+    assert [(barcode, type(exc)) for barcode, exc in errors] == [
+        ("BAD1\r\n", ValueError), ("BAD1\r\n", RuntimeError), ("GOOD\r\n", RuntimeError)]
+    assert scanner.is_listening()
+    assert scanner.light_off()
+
+
+def test_errors_without_error_callback_are_printed(scanner, monkeypatch):
+    scanner, sim = scanner()
+    printed = []
+    monkeypatch.setattr("sys.excepthook", lambda *exc_info: printed.append(exc_info[1]))
+
+    def callback(barcode):
+        raise KeyError(barcode)
+
+    scanner.start_listening(callback)
+    sim.scan("A")
+    assert wait_for(lambda: printed)
+    assert isinstance(printed[0], KeyError)
+    assert scanner.is_listening()
+
+
+def test_port_error_stops_the_reader(scanner):
+    scanner, sim = scanner()
+    errors = []
+    scanner.start_listening(lambda barcode: None, error_callback=lambda *args: errors.append(args))
+    sim.close()
+
+    assert wait_for(lambda: not scanner.is_listening())
+    assert errors and errors[0][0] is None
+    assert scanner.listener_error() is errors[0][1]
+    assert not scanner.stop_listening()
@@ -0,0 +1,95 @@
+# LookupCache against an SQLite stand-in resolver.
+
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import de2120_lookup_cache
+
+
+@pytest.fixture
+def products(tmp_path):
+    path = str(tmp_path / "products.db")
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE products (code TEXT PRIMARY KEY, name TEXT)")
+    connection.executemany("INSERT INTO products VALUES (?, ?)",
+                           [("%013d" % i, "item %d" % i) for i in range(20)])
+    connection.execute("CREATE TABLE numbered (code INTEGER PRIMARY KEY, name TEXT)")
+    connection.executemany("INSERT INTO numbered VALUES (?, ?)", [(i, "item %d" % i) for i in range(5)])
+    connection.commit()
+    connection.close()
+    return path
+
+
+def test_hits_misses_and_negative_caching(products):
+    resolver = de2120_lookup_cache.SqliteResolver(products)
+    cache = de2120_lookup_cache.LookupCache(resolver, maxsize=2)
+
+    assert cache.get("0000000000001\r\n")["name"] == "item 1"
+    assert cache.get(b"0000000000001")["name"] == "item 1"
+    assert cache.get("missing") is None
+    assert cache.get("missing") is None
+    cache.get("0000000000002")
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["negative_hits"], stats["misses"]) == (1, 1, 3)
+    assert stats["evictions"] == 1
+    assert stats["size"] == 2
+    resolver.close()
+
+
+def test_expiry():
+    cache = de2120_lookup_cache.LookupCache(lambda code: code, ttl=0.05)
+    cache.get("a")
+    time.sleep(0.1)
+    cache.get("a")
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_single_flight():
+    calls = []
+
+    def slow(code):
+        calls.append(code)
+        time.sleep(0.1)
+        return code
+
+    cache = de2120_lookup_cache.LookupCache(slow)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("a"))) for i in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["a"]
+    assert results == ["a"] * 5
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_resolver_errors_not_cached():
+    def broken(code):
+        raise KeyError(code)
+
+    cache = de2120_lookup_cache.LookupCache(broken)
+    with pytest.raises(KeyError):
+        cache.get("a")
+    assert cache.stats()["errors"] == 1
+    assert len(cache) == 0
+
+
+def test_warm_up_with_integer_keys(products, tmp_path):
+    cache = de2120_lookup_cache.LookupCache(lambda code: None)
+    assert cache.load_sqlite(products, "SELECT * FROM numbered") == 5
+    assert cache.get("3")["name"] == "item 3"
+
+    assert cache.warm([(7, "seven")]) == 1
+    assert cache.get("7") == "seven"
+
+    csv_path = tmp_path / "products.csv"
+    csv_path.write_text("code,name\n4006381333931,widget\n")
+    assert cache.load_csv(str(csv_path)) == 1
+    assert cache.get("4006381333931\r\n")["name"] == "widget"
@@ -0,0 +1,37 @@
+# Metrics served over HTTP by serve_metrics().
+
+import urllib.error
+import urllib.request
+
+import pytest
+
+from conftest import read_one
+
+
+def test_scrape_metrics(scanner):
+    scanner, sim = scanner()
+    scanner.enable_metrics(labels={"port": "sim"})
+    assert scanner.light_on() is True
+    sim.scan("SCRAPED")
+    assert read_one(scanner) == "SCRAPED\r\n"
+
+    server = scanner.serve_metrics(0)
+    try:
+        address, port = server.server_address[:2]
+        assert address == "127.0.0.1"
+        url = "http://127.0.0.1:%d/metrics" % port
+        with urllib.request.urlopen(url, timeout=2) as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            text = response.read().decode("utf-8")
+
+        lines = text.splitlines()
+        assert 'de2120_commands_total{command="LAMENA",port="sim"} 1' in lines
+        assert 'de2120_command_responses_total{command="LAMENA",port="sim",result="ack"} 1' in lines
+        assert 'de2120_scans_total{port="sim"} 1' in lines
+
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen("http://127.0.0.1:%d/other" % port, timeout=2)
+        assert excinfo.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
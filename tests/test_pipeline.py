@@ -0,0 +1,54 @@
+# ScanProcessor delivery, on a thread pool so the tests stay fast.
+
+import de2120_pipeline
+
+
+def double(barcode):
+    if barcode == "fail":
+        raise ValueError(barcode)
+    return barcode * 2
+
+
+def test_results_in_order():
+    results = []
+    with de2120_pipeline.ScanProcessor(double, callback=lambda b, r: results.append(r),
+                                       executor="thread", batch_size=3) as processor:
+        for i in range(20):
+            processor.put(str(i))
+        assert processor.flush(timeout=2)
+    assert results == [str(i) * 2 for i in range(20)]
+
+
+def test_func_errors_reported():
+    errors = []
+    with de2120_pipeline.ScanProcessor(double, executor="thread",
+                                       error_callback=lambda b, e: errors.append(b)) as processor:
+        for barcode in ("a", "fail", "b"):
+            processor.put(barcode)
+        assert processor.flush(timeout=2)
+        assert processor.stats()["errors"] == 1
+    assert errors == ["fail"]
+
+
+def test_failing_callbacks_do_not_stop_delivery():
+    errors = []
+
+    def callback(barcode, result):
+        if barcode == "3":
+            raise RuntimeError("callback failed")
+
+    def error_callback(barcode, exc):
+        errors.append(barcode)
+        raise RuntimeError("error callback failed")
+
+    processor = de2120_pipeline.ScanProcessor(double, callback=callback, executor="thread",
+                                              error_callback=error_callback, batch_size=2)
+    for i in range(10):
+        processor.put(str(i))
+    processor.put("fail")
+
+    assert processor.flush(timeout=2)
+    stats = processor.stats()
+    assert (stats["delivered"], stats["errors"]) == (9, 2)
+    assert errors == ["3", "fail"]
+    processor.close()
@@ -0,0 +1,261 @@
+# Auto reconnect. The scanner opens the simulator through a symlink,
+# which is pointed at a new simulator once the old one is closed, as
+# a USB scanner comes back under a new device node.
+
+import os
+import threading
+import time
+
+import pytest
+import serial
+
+from de2120_barcode_scanner import DE2120BarcodeScanner, ScannerHub
+
+from conftest import wait_for
+
+
+@pytest.fixture
+def link(tmp_path):
+    path = str(tmp_path / "ttyDE2120")
+
+    # With no simulator the link is removed, so a reopen can never
+    # reach another pty that took the old device name
+    def point(sim = None):
+        if os.path.lexists(path):
+            os.remove(path)
+        if sim is not None:
+            os.symlink(sim.port_name, path)
+        return path
+
+    return point
+
+
+@pytest.fixture
+def supervised(simulator, link):
+    """
+        Factory for a scanner with auto reconnect on, opened through
+        the link.
+    """
+    scanners = []
+
+    def make(**kwargs):
+        sim = simulator()
+        scanner = DE2120BarcodeScanner(serial.Serial(link(sim), 115200, timeout=0.2),
+                                       command_timeout_ms=300)
+        kwargs.setdefault("max_backoff", 0.05)
+        scanner.enable_auto_reconnect(**kwargs)
+        scanners.append(scanner)
+        return scanner, sim
+
+    yield make
+    for scanner in scanners:
+        if scanner.is_listening():
+            scanner.stop_listening()
+        scanner.hard_port.close()
+
+
+def replace_later(simulator, link, old, delay = 0.2):
+    """
+        Close old now and point the link at a new simulator after
+        delay seconds.
+
+        :return: a list that holds the new simulator once it is up
+    """
+    new = []
+
+    def run():
+        time.sleep(delay)
+        sim = simulator()
+        link(sim)
+        new.append(sim)
+
+    old.close()
+    link()
+    threading.Thread(target=run).start()
+    return new
+
+
+def test_read_reconnects_and_replays_settings(supervised, simulator, link):
+    scanner, sim = supervised()
+    assert scanner.send_command(DE2120BarcodeScanner.PROPERTY_READING_AREA, "2")
+
+    new = replace_later(simulator, link, sim)
+    assert wait_for(lambda: scanner.read_barcode() is False and new, 3)
+
+    assert wait_for(lambda: new[0].properties[DE2120BarcodeScanner.PROPERTY_READING_AREA] == "2")
+    new[0].scan("BACK")
+    assert wait_for(scanner.read_barcode) == "BACK\r\n"
+
+
+def test_command_is_retried(supervised, simulator, link):
+    scanner, sim = supervised()
+    new = replace_later(simulator, link, sim)
+    assert scanner.send_command(DE2120BarcodeScanner.PROPERTY_FLASH_LIGHT, "0")
+    assert wait_for(lambda: new[0].properties[DE2120BarcodeScanner.PROPERTY_FLASH_LIGHT] == "0")
+
+
+def test_gives_up_after_max_attempts(supervised, link):
+    scanner, sim = supervised(max_attempts=2)
+    sim.close()
+    link()
+    with pytest.raises(OSError):
+        scanner.read_barcode()
+
+
+def test_listener_keeps_delivering(supervised, simulator, link):
+    scanner, sim = supervised()
+    received = []
+    scanner.start_listening(received.append)
+    sim.scan("BEFORE")
+    assert wait_for(lambda: received)
+
+    # A reopen flushes stale input, so scan once the probe is answered
+    new = replace_later(simulator, link, sim)
+    assert wait_for(lambda: new and new[0].acked, 3)
+    new[0].scan("AFTER")
+    assert wait_for(lambda: len(received) == 2, 5)
+    assert received == ["BEFORE\r\n", "AFTER\r\n"]
+    assert scanner.is_listening()
+
+
+def scan_after_probe(simulator, barcode):
+    """
+        A simulator that scans barcode once it has answered the first
+        command, so it arrives while the settings are restored.
+    """
+    new = []
+
+    def on_command(cmd, arg, acked):
+        if len(new[0].commands) == 1:
+            new[0].scan(barcode)
+
+    new.append(simulator(on_command=on_command))
+    return new[0]
+
+
+def test_listener_keeps_barcodes_read_while_restoring(supervised, simulator, link):
+    scanner, sim = supervised()
+    assert scanner.send_command(DE2120BarcodeScanner.PROPERTY_READING_AREA, "2")
+    received = []
+    scanner.start_listening(received.append)
+
+    sim.close()
+    link()
+    time.sleep(0.1)
+    new = scan_after_probe(simulator, "RESTORING")
+    link(new)
+    assert wait_for(lambda: received, 5)
+    assert received == ["RESTORING\r\n"]
+    assert new.properties[DE2120BarcodeScanner.PROPERTY_READING_AREA] == "2"
+
+
+def test_hub_keeps_barcodes_read_while_restoring(supervised, simulator, link):
+    lost, sim = supervised()
+    assert lost.send_command(DE2120BarcodeScanner.PROPERTY_READING_AREA, "2")
+    hub = ScannerHub()
+    try:
+        hub.add(lost, "lost")
+        sim.close()
+        link()
+        assert hub.poll(0.2) == []
+
+        link(scan_after_probe(simulator, "RESTORING"))
+        events = []
+        deadline = time.monotonic() + 5
+        while not events and time.monotonic() < deadline:
+            events = hub.poll(0.2)
+        assert events == [("lost", "RESTORING\r\n")]
+    finally:
+        hub.close()
+
+
+def test_hub_reconnects_without_stalling_others(supervised, simulator, link, scanner):
+    lost, sim = supervised()
+    lost.command_timeout_ms = 1500
+    healthy, healthy_sim = scanner()
+    hub = ScannerHub()
+    try:
+        hub.add(lost, "lost")
+        hub.add(healthy, "healthy")
+
+        # A module at another baud rate never answers the probe, so
+        # each reconnect attempt waits out the command timeout
+        sim.close()
+        link(simulator(baud=9600))
+        assert hub.poll(0.2) == []
+
+        # The attempts run on their own thread
+        healthy_sim.scan("H1")
+        started = time.monotonic()
+        assert hub.poll(2) == [("healthy", "H1\r\n")]
+        assert time.monotonic() - started < 1.0
+
+        # The pty holds the barcode until the hub watches the port again
+        new = simulator()
+        link(new)
+        assert wait_for(lambda: new.acked, 5)
+        new.scan("L1")
+        events = []
+        deadline = time.monotonic() + 5
+        while not events and time.monotonic() < deadline:
+            events = hub.poll(0.2)
+        assert events == [("lost", "L1\r\n")]
+    finally:
+        hub.close()
+
+
+def test_hub_gives_up_without_losing_barcodes(supervised, link, scanner):
+    lost, sim = supervised(max_attempts=1)
+    healthy, healthy_sim = scanner()
+    hub = ScannerHub()
+    try:
+        hub.add(lost, "lost")
+        hub.add(healthy, "healthy")
+        sim.close()
+        link()
+        assert hub.poll(0.5) == []
+
+        # The failed attempt wakes the hub while a barcode is waiting
+        healthy_sim.scan("KEEPME")
+        time.sleep(0.3)
+        assert hub.poll(1) == [("healthy", "KEEPME\r\n")]
+        with pytest.raises(OSError):
+            hub.poll(2)
+        assert list(hub.scanners()) == ["healthy"]
+    finally:
+        hub.close()
+
+
+def test_stop_listening_while_reconnecting(supervised, link):
+    # Long enough that a plain sleep between attempts would show
+    scanner, sim = supervised(max_backoff=2.0)
+    scanner.start_listening(lambda barcode: None)
+    sim.close()
+    link()
+    time.sleep(0.5)
+
+    started = time.monotonic()
+    assert scanner.stop_listening()
+    assert time.monotonic() - started < 1.0
+    assert scanner.listener_error() is None
+
+
+def test_command_retried_once_per_recovery(supervised, monkeypatch):
+    scanner, sim = supervised()
+    writes = []
+
+    # Every reopen "succeeds" and every write fails
+    def write(data):
+        writes.append(data)
+        raise serial.SerialException("write failed")
+
+    monkeypatch.setattr(scanner, "_reopen", lambda: True)
+    monkeypatch.setattr(scanner.hard_port, "write", write)
+    with pytest.raises(serial.SerialException):
+        scanner.send_command(DE2120BarcodeScanner.PROPERTY_FLASH_LIGHT, "0")
+    assert len(writes) == 2
+
+    del writes[:]
+    with pytest.raises(serial.SerialException):
+        scanner.send_commands([DE2120BarcodeScanner.PROPERTY_ENABLE_ALL_1D])
+    assert len(writes) == 2
@@ -0,0 +1,53 @@
+# ScanQueue overflow policies, fed by a listening scanner.
+
+import pytest
+
+from de2120_barcode_scanner import AsyncDE2120BarcodeScanner, ScanQueue
+
+from conftest import wait_for
+
+
+def test_pause_stops_and_restarts_the_module(scanner):
+    scanner, sim = scanner()
+    scans = ScanQueue(maxsize=4, policy=ScanQueue.PAUSE, scanner=scanner, high_water=3, low_water=1)
+    scanner.start_listening(queue=scans)
+    try:
+        for i in range(3):
+            sim.scan("B%d" % i)
+        assert wait_for(lambda: scans.stats()["paused"])
+        assert wait_for(lambda: (scanner.COMMAND_STOP_SCAN, "") in sim.commands)
+
+        assert scans.get(timeout=1) == "B0\r\n"
+        assert scans.get(timeout=1) == "B1\r\n"
+        assert wait_for(lambda: (scanner.COMMAND_START_SCAN, "") in sim.commands)
+
+        stats = scans.stats()
+        assert not stats["paused"]
+        assert (stats["pauses"], stats["resumes"], stats["dropped"]) == (1, 1, 0)
+        assert scans.get(timeout=1) == "B2\r\n"
+    finally:
+        scans.close()
+
+
+def test_pause_rejects_async_scanners(simulator):
+    sim = simulator()
+    port = sim.port()
+    try:
+        with pytest.raises(ValueError):
+            ScanQueue(policy=ScanQueue.PAUSE, scanner=AsyncDE2120BarcodeScanner(port))
+        with pytest.raises(ValueError):
+            ScanQueue(policy=ScanQueue.PAUSE)
+    finally:
+        port.close()
+
+
+def test_drop_policies():
+    oldest = ScanQueue(maxsize=2, policy=ScanQueue.DROP_OLDEST)
+    newest = ScanQueue(maxsize=2, policy=ScanQueue.DROP_NEWEST)
+    for barcode in ("A", "B", "C"):
+        oldest.put(barcode)
+        newest.put(barcode)
+
+    assert [oldest.get(False), oldest.get(False)] == ["B", "C"]
+    assert [newest.get(False), newest.get(False)] == ["A", "B"]
+    assert oldest.stats()["dropped_oldest"] == newest.stats()["dropped_newest"] == 1
@@ -0,0 +1,31 @@
+# ScanResult parsing and formatting.
+
+import de2120_barcode_scanner
+from de2120_barcode_scanner import ScanResult
+
+from conftest import read_one
+
+
+def test_from_frame_splits_code_id():
+    result = ScanResult.from_frame(b"d4006381333931\r\n", "d4006381333931\r\n", code_id=True)
+    assert result.payload == "4006381333931"
+    assert result.symbology == "EAN-13"
+    assert result.code_id == "d"
+    assert str(result) == "4006381333931"
+
+
+def test_str_of_bytes_payload():
+    result = ScanResult.from_frame(b"caf\xe9\r\n", b"caf\xe9\r\n")
+    assert result.payload == b"caf\xe9"
+    assert str(result) == "caf\xe9"
+
+
+def test_bytes_mode_scan(scanner):
+    scanner, sim = scanner()
+    scanner.set_data_format(de2120_barcode_scanner.DE2120BarcodeScanner.DATA_FORMAT_BYTES)
+    scanner.enable_scan_results()
+    sim.scan("ABC-123")
+
+    result = read_one(scanner)
+    assert result.payload == b"ABC-123"
+    assert str(result) == "ABC-123"
@@ -0,0 +1,41 @@
+# UTF-16 framing: labels whose first byte has an ACK or NACK value must
+# not be taken for command responses.
+
+import pytest
+
+from conftest import wait_for, read_one
+
+# Labels starting with 0x15 or 0x06 in the byte order used
+LABELS = [
+    (3, "Еда-42"),      # U+0415, little endian 15 04
+    (3, "Ćevapi"),      # U+0106, little endian 06 01
+    (2, "مرحبا"),       # U+0645, big endian 06 45
+    (2, "ASCII-1"),
+]
+
+
+@pytest.mark.parametrize("data_format, label", LABELS)
+def test_label_read_without_command(scanner, data_format, label):
+    scanner, sim = scanner(barcodes=[label])
+    assert scanner.change_serial_data_format(data_format)
+    assert scanner.frame_parser.unit == 2
+
+    sim.scan()
+    assert read_one(scanner) == label + "\r\n"
+    assert scanner._responses.empty()
+
+
+@pytest.mark.parametrize("data_format, label", LABELS)
+def test_label_and_commands_interleaved(scanner, data_format, label):
+    scanner, sim = scanner(barcodes=[label])
+    assert scanner.change_serial_data_format(data_format)
+
+    received = []
+    scanner.start_listening(callback=received.append)
+    for i in range(20):
+        sim.scan()
+        assert scanner.send_command(scanner.PROPERTY_DECODE_BEEP, str(i % 2)) is True
+
+    assert wait_for(lambda: len(received) == 20)
+    assert received == [label + "\r\n"] * 20
+    assert scanner._responses.empty()
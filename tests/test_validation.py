@@ -0,0 +1,78 @@
+# de2120_validation: check digits, the batch functions with and
+# without NumPy, and CheckDigitFilter on a scanner.
+
+import pytest
+
+import de2120_validation
+from de2120_barcode_scanner import DE2120BarcodeScanner, ScanResult
+from de2120_validation import (CheckDigitFilter, gs1_check_digit, valid_gs1, valid_mod43,
+                               validate_gs1_batch, validate_mod43_batch)
+
+from conftest import read_one
+
+GS1_CODES = [
+    "4006381333931",        # EAN-13
+    "4006381333932",        # wrong check digit
+    "96385074",             # EAN-8
+    "036000291452",         # UPC-A
+    "10614141000415",       # GTIN-14
+    "106141410004151",      # no GS1 length
+    "40063813339A1",        # not all digits
+    "٤٠٠٦٣٨١٣٣٣٩٣١",        # Arabic-Indic digits
+    "",
+]
+GS1_VALID = [True, False, True, True, True, False, False, False, False]
+
+MOD43_CODES = ["CODE39W", "CODE39X", "A", "code39W", "-. $/+%F", "AB"]
+MOD43_VALID = [True, False, False, False, True, False]
+
+
+def test_single_codes():
+    assert gs1_check_digit("400638133393") == 1
+    assert [valid_gs1(code) for code in GS1_CODES] == GS1_VALID
+    assert valid_gs1(b"4006381333931\r\n")
+    assert valid_gs1(ScanResult("4006381333931"))
+    assert not valid_gs1("4006381333931", lengths=(8,))
+    assert [valid_mod43(code) for code in MOD43_CODES] == MOD43_VALID
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_batches_match_single_codes(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(de2120_validation, "numpy", None)
+
+    assert list(validate_gs1_batch(GS1_CODES)) == GS1_VALID
+    assert list(validate_gs1_batch([code + "\r\n" for code in GS1_CODES[:5]])) == GS1_VALID[:5]
+    assert list(validate_mod43_batch(MOD43_CODES)) == MOD43_VALID
+    assert list(validate_gs1_batch([])) == []
+
+
+def test_filter_drops_misreads(scanner):
+    scanner, sim = scanner()
+    rejected = []
+    check = CheckDigitFilter(on_reject=rejected.append)
+    scanner.add_scan_filter(check)
+    for barcode in ("4006381333932", "4006381333931", "HELLO"):
+        sim.scan(barcode)
+
+    assert read_one(scanner) == "4006381333931\r\n"
+    assert read_one(scanner) == "HELLO\r\n"
+    assert rejected == ["4006381333932\r\n"]
+    assert check.stats() == {"passed": 1, "rejected": 1, "unchecked": 1}
+
+
+def test_filter_checks_by_symbology(scanner):
+    scanner, sim = scanner()
+    scanner.enable_scan_results()
+    assert scanner.send_command(DE2120BarcodeScanner.PROPERTY_TRANSFER_CODE_ID, "1")
+    scanner.add_scan_filter(CheckDigitFilter(code39_check=True))
+
+    # A numeric Code 128 label is not a GTIN, and Code 39 is mod 43
+    for scan in (("d", "4006381333932"), ("j", "4006381333932"), ("b", "CODE39X"), ("b", "CODE39W")):
+        sim.scan(scan)
+
+    assert read_one(scanner).payload == "4006381333932"
+    assert read_one(scanner).payload == "CODE39W"
+    assert scanner.read_barcode() is False
@@ -0,0 +1,73 @@
+# Wire trace ring buffer: enable_wire_trace(), dump_wire_trace() and
+# the dump written when a command fails.
+
+import io
+
+import pytest
+
+from de2120_barcode_scanner import DE2120BarcodeScanner, WireTrace
+
+from conftest import read_one
+
+
+def test_records_commands_and_barcodes(scanner):
+    scanner, sim = scanner()
+    assert scanner.dump_wire_trace() == ""
+
+    trace = scanner.enable_wire_trace()
+    assert scanner.light_on() is True
+    sim.scan("TRACED")
+    assert read_one(scanner) == "TRACED\r\n"
+
+    entries = trace.entries()
+    assert entries[0][2] == "TX" and b"LAMENA" in entries[0][4]
+    received = b"".join(data for sequence, timestamp, direction, length, data in entries if direction == "RX")
+    assert received == b"\x06TRACED\r\n"
+    assert [entry[0] for entry in entries] == list(range(len(entries)))
+
+    text = scanner.dump_wire_trace()
+    assert text.startswith("# DE2120 wire trace: %d events" % len(entries))
+    assert "|TRACED..|" in text
+
+    scanner.disable_wire_trace()
+    assert scanner.dump_wire_trace() == ""
+
+
+def test_dump_on_nack(scanner):
+    scanner, sim = scanner(nack=[DE2120BarcodeScanner.PROPERTY_AIM_LIGHT])
+    dump = io.StringIO()
+    scanner.enable_wire_trace(dump_on_error=dump)
+
+    assert scanner.light_on() is True
+    assert dump.getvalue() == ""
+    assert scanner.send_command(DE2120BarcodeScanner.PROPERTY_AIM_LIGHT, "1") is False
+
+    text = dump.getvalue()
+    assert "NACKed" in text
+    assert "# DE2120 wire trace: 4 events" in text
+    assert "RX 1 bytes" in text
+
+
+def test_ring_buffer_overwrites_oldest():
+    trace = WireTrace(events=3, data_bytes=8)
+    for data in (b"one", b"two", b"three", b"four"):
+        trace.record(WireTrace.TX, data)
+    trace.record(WireTrace.RX, b"0123456789")
+
+    entries = trace.entries()
+    assert len(trace) == 3
+    assert [entry[0] for entry in entries] == [2, 3, 4]
+    assert [entry[2] for entry in entries] == ["TX", "TX", "RX"]
+
+    # The last chunk is cut to data_bytes and overwrote the others
+    assert [entry[4] for entry in entries] == [None, None, b"01234567"]
+    assert entries[2][3] == 10
+
+    text = trace.dump()
+    assert "(bytes overwritten)" in text
+    assert "(2 more bytes not kept)" in text
+
+    trace.clear()
+    assert len(trace) == 0 and trace.entries() == []
+    with pytest.raises(ValueError):
+        WireTrace(events=0)